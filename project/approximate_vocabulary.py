@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+"""
+Approximate vocabulary of a corpus larger than memory
+
+Words are counted with the Space-Saving algorithm, which monitors at most a fixed number of words. When a word
+not monitored arrives and all counters are in use, the word with the smallest count is replaced and the new word
+inherits that count. The count of a monitored word is overestimated by at most
+(number of words in the stream) / capacity, and every word occurring more often than that is monitored, so
+the top vocabulary is exact for corpora with a skewed word distribution.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import math
+import heapq
+
+from project.text_to_id import DEFAULT_FILTERS
+from project.text_to_id import iterate_word_lists
+from project.text_to_id import map_word_count_to_vocabulary
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+class SpaceSavingCounter():
+    """
+    Bounded-memory counter of the most frequent words.
+    """
+
+    def __init__(self, capacity):
+        """
+        Initialize a counter.
+
+        Parameters
+        ----------
+        capacity: int
+            Maximum number of words to monitor.
+
+        Raises
+        ------
+        ValueError
+            If capacity is less than 1.
+        """
+        if capacity < 1:
+            raise ValueError("capacity needs to be 1 or greater.")
+
+        self.capacity = capacity
+        self.total = 0  # Number of words in the stream
+        self.counts = dict()  # Estimated count of monitored words
+        self.errors = dict()  # Maximum overestimation of the count of monitored words
+        self.first_seen = dict()  # Position in the stream where each monitored word started to be monitored
+        self.heap = list()  # (count, first_seen, word). Entries are updated lazily when popped.
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _pop_min(self):
+        """
+        Remove the monitored word with the smallest count.
+
+        Returns
+        -------
+        (word, count): tuple
+            Removed word and its estimated count
+        """
+        while True:
+            count, first_seen, word = heapq.heappop(self.heap)
+            current = self.counts.get(word)
+            if current is None or self.first_seen[word] != first_seen:  # Entry of a replaced word
+                continue
+            if current != count:  # Count increased since this entry was pushed
+                heapq.heappush(self.heap, (current, first_seen, word))
+                continue
+
+            del self.counts[word]
+            del self.errors[word]
+            del self.first_seen[word]
+            return word, count
+
+    def update(self, word_list):
+        """
+        Count words.
+
+        Parameters
+        ----------
+        word_list: iterable of str
+            Words
+        """
+        counts = self.counts
+
+        for w in word_list:
+            self.total += 1
+
+            if w in counts:
+                counts[w] += 1
+                continue
+
+            if len(counts) < self.capacity:
+                count = 1
+                error = 0
+            else:
+                _, min_count = self._pop_min()
+                count = min_count + 1
+                error = min_count
+
+            counts[w] = count
+            self.errors[w] = error
+            self.first_seen[w] = self.total
+            heapq.heappush(self.heap, (count, self.total, w))
+
+    @property
+    def error_bound(self):
+        """
+        Maximum overestimation of the count of any monitored word.
+        """
+        return self.total / self.capacity
+
+    def word_count(self):
+        """
+        Get estimated counts of monitored words.
+
+        Returns
+        -------
+        word_count: dict
+            Word to estimated count mapping in the order each word started to be monitored.
+            For a stream with no more distinct words than capacity, the counts are exact and the order is the
+            order of first occurrence.
+        """
+        return {w: self.counts[w] for w in sorted(self.counts, key=lambda w: self.first_seen[w])}
+
+    def guaranteed_count(self, word):
+        """
+        Get the lower bound of the count of a word.
+
+        Parameters
+        ----------
+        word: str
+            Word
+
+        Returns
+        -------
+        count: int
+            Lower bound of the count. 0 if the word is not monitored.
+        """
+        if word not in self.counts:
+            return 0
+
+        return self.counts[word] - self.errors[word]
+
+
+def _compute_capacity(top_vocabulary_size, capacity, error_rate):
+    """
+    Compute the number of words to monitor.
+
+    Parameters
+    ----------
+    top_vocabulary_size: int
+        Size of top vocabulary
+    capacity: int
+        Number of words to monitor. Takes precedence over error_rate.
+    error_rate: float
+        Maximum overestimation of counts relative to the number of words in the stream.
+
+    Returns
+    -------
+    capacity: int
+        Number of words to monitor. 10 times top_vocabulary_size if neither capacity nor error_rate is specified.
+
+    Raises
+    ------
+    ValueError
+        If capacity is smaller than top_vocabulary_size or error_rate is not between 0 and 1.
+    """
+    if capacity is None:
+        if error_rate is not None:
+            if error_rate <= 0 or error_rate > 1:
+                raise ValueError("error_rate needs to be greater than 0 and 1 or less.")
+            capacity = max(math.ceil(1.0 / error_rate), top_vocabulary_size)
+        else:
+            capacity = top_vocabulary_size * 10
+
+    if capacity < top_vocabulary_size:
+        raise ValueError("capacity (%d) needs to be top_vocabulary_size (%d) or greater." % (capacity,
+                                                                                             top_vocabulary_size))
+
+    return capacity
+
+
+def map_word_stream_to_approximate_vocabulary(word_stream, top_vocabulary_size, capacity=None, error_rate=None):
+    """
+    Select the top vocabulary from a stream of words using bounded memory, and returns word to id map as well as
+    id to word map for the vocabulary in the same format as map_word_list_to_vocabulary.
+
+    Parameters
+    ----------
+    word_stream: iterable of str
+        Words. Can be a generator.
+    top_vocabulary_size: int
+        Size of top vocabulary
+    capacity: int
+        Number of words to monitor. Memory use is proportional to this.
+    error_rate: float
+        Maximum overestimation of counts relative to the number of words in the stream. Used to compute capacity
+        if capacity is not specified.
+
+    Returns
+    -------
+    vocabulary: list
+        Monitored words in the descending order of estimated count
+    vocabulary_size: int
+        Number of monitored words
+    top_vocabulary: list
+        Top vocabulary list
+    top_vocabulary_size: int
+        Size of the top vocabulary
+    reserved_word_size: int
+        Size of reserved word list
+    word_to_id: dict
+        Word to id to top vocabulary mapping
+    id_to_word: dict
+        Index to top vocabulary to word mapping
+
+    Raises
+    ------
+    ValueError
+        If capacity is smaller than top_vocabulary_size or error_rate is not between 0 and 1.
+    """
+    counter = SpaceSavingCounter(_compute_capacity(top_vocabulary_size, capacity, error_rate))
+    counter.update(word_stream)
+    log.info("Counted %d words with error bound %f" % (counter.total, counter.error_bound))
+
+    return map_word_count_to_vocabulary(counter.word_count(), top_vocabulary_size)
+
+
+def build_approximate_vocabulary(text_list, top_vocabulary_size, filters=DEFAULT_FILTERS, separator_list=None,
+                                 capacity=None, error_rate=None):
+    """
+    Build the top vocabulary from text using bounded memory. Text is tokenized one at a time, so text_list can
+    be a generator, a Corpus or a LazyDocumentList.
+
+    Parameters
+    ----------
+    text_list: iterable of str or Corpus
+        Text
+    top_vocabulary_size: int
+        Size of top vocabulary
+    filters: string
+        A string specifying characters to remove.  Each character will be removed from output.
+    separator_list: list of strings
+        A list of strings containing one or more separators
+        if not specified, ["\n", " "] will be used.
+    capacity: int
+        Number of words to monitor. Memory use is proportional to this.
+    error_rate: float
+        Maximum overestimation of counts relative to the number of words in the stream. Used to compute capacity
+        if capacity is not specified.
+
+    Returns
+    -------
+    Same as map_word_stream_to_approximate_vocabulary
+
+    Raises
+    ------
+    ValueError
+        If capacity is smaller than top_vocabulary_size or error_rate is not between 0 and 1.
+    """
+    word_stream = (w for word_list in iterate_word_lists(text_list, filters=filters, separator_list=separator_list)
+                   for w in word_list)
+
+    return map_word_stream_to_approximate_vocabulary(word_stream, top_vocabulary_size, capacity=capacity,
+                                                     error_rate=error_rate)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+"""
+Compact corpus backed by a contiguous byte buffer
+
+Text of all documents is stored in one uint8 buffer encoded in UTF-8. Start and end offsets of each document
+and labels are stored in numpy arrays. Text is decoded only when a document is accessed, and slicing shares
+the buffer instead of copying text.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+class Corpus():
+    """
+    Sequence of documents backed by a contiguous byte buffer.
+    """
+
+    def __init__(self, buffer, starts, ends, labels=None):
+        """
+        Initialize a corpus.
+
+        Parameters
+        ----------
+        buffer: ndarray
+            uint8 array containing text encoded in UTF-8. A memory-mapped array can be used.
+        starts: ndarray
+            int64 array of the start offset of each document in buffer.
+        ends: ndarray
+            int64 array of the end offset of each document in buffer.
+        labels: ndarray
+            Label or label ID of each document. None if the corpus is not labeled.
+        """
+        self.buffer = buffer
+        self.starts = starts
+        self.ends = ends
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        """
+        Get a document or a subset of the corpus.
+
+        Parameters
+        ----------
+        index: int, slice, list of int or ndarray
+            Index of a document or indices of documents.
+
+        Returns
+        -------
+        text: str or Corpus
+            Decoded text if index is int. Otherwise, a corpus sharing the buffer.
+        """
+        if isinstance(index, (int, np.integer)):
+            return self.get_bytes(index).tobytes().decode("utf-8", errors="surrogatepass")
+
+        if isinstance(index, slice) is False:
+            index = np.asarray(index)
+
+        labels = self.labels[index] if self.labels is not None else None
+        return Corpus(self.buffer, self.starts[index], self.ends[index], labels)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def get_bytes(self, index):
+        """
+        Get the encoded text of a document without decoding it.
+
+        Parameters
+        ----------
+        index: int
+            Index of a document
+
+        Returns
+        -------
+        b: ndarray
+            uint8 array view of the buffer.
+        """
+        return self.buffer[self.starts[index]:self.ends[index]]
+
+    @property
+    def nbytes(self):
+        """
+        Size of the encoded text of documents in this corpus in bytes.
+        """
+        return int(np.sum(self.ends - self.starts))
+
+    def compact(self):
+        """
+        Copy the text of documents in this corpus to a new buffer in the order of documents.
+        Use this to release the original buffer after taking a small subset.
+
+        Returns
+        -------
+        corpus: Corpus
+            Corpus with its own buffer.
+        """
+        lengths = self.ends - self.starts
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        buffer = np.empty(offsets[-1], dtype=np.uint8)
+        for i in range(len(self)):
+            buffer[offsets[i]:offsets[i + 1]] = self.get_bytes(i)
+
+        return Corpus(buffer, offsets[:-1], offsets[1:], self.labels)
+
+    def __repr__(self):
+        return "Corpus(%d documents, %d bytes)" % (len(self), self.nbytes)
+
+
+def build_corpus(text_list, labels=None):
+    """
+    Build a corpus from a list of text.
+
+    Parameters
+    ----------
+    text_list: list of str
+        List of text
+    labels: list or ndarray
+        Label or label ID of each text. None if the corpus is not labeled.
+
+    Returns
+    -------
+    corpus: Corpus
+        Corpus containing text_list
+    """
+    encoded = [text.encode("utf-8", errors="surrogatepass") for text in text_list]
+
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.array([len(b) for b in encoded], dtype=np.int64), out=offsets[1:])
+
+    buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    if labels is not None:
+        labels = np.asarray(labels)
+
+    return Corpus(buffer, offsets[:-1], offsets[1:], labels)
+
+
+def build_corpus_from_offsets(buffer, offsets, labels=None):
+    """
+    Build a corpus from a buffer and an offsets array, e.g. memory-mapped from a snapshot.
+
+    Parameters
+    ----------
+    buffer: ndarray
+        uint8 array containing text encoded in UTF-8.
+    offsets: ndarray
+        int64 array of (number of documents + 1) offsets. Document i spans offsets[i] to offsets[i + 1].
+    labels: ndarray
+        Label or label ID of each document. None if the corpus is not labeled.
+
+    Returns
+    -------
+    corpus: Corpus
+        Corpus sharing buffer.
+    """
+    return Corpus(buffer, offsets[:-1], offsets[1:], labels)
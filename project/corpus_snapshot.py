@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+"""
+Save and load a binary snapshot of a corpus loaded from label directories
+
+A snapshot directory contains:
+    text.bin: All text encoded in UTF-8 and concatenated into one blob.
+    offsets.npy: int64 array of (number of samples + 1) offsets of each text in text.bin.
+    labels.npy: int32 array of label IDs.
+    meta.json: Label to ID mapping, number of training samples and the key to validate the snapshot.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import json
+
+import numpy as np
+
+from project.load_text_data import load_text_and_label_id_from_files
+from project.corpus import build_corpus_from_offsets
+from project.file_manifest import build_file_manifest
+from project.file_manifest import compute_manifest_digest
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+SNAPSHOT_VERSION = 1
+TEXT_FILE = "text.bin"
+OFFSETS_FILE = "offsets.npy"
+LABELS_FILE = "labels.npy"
+META_FILE = "meta.json"
+
+
+def save_snapshot(snapshot_dir, text_list, label_ids, num_training_samples, label_to_id, key=None):
+    """
+    Save a corpus to a snapshot directory.
+
+    Parameters
+    ----------
+    snapshot_dir: pathlib.Path
+        Directory to save the snapshot. Created if it does not exist.
+    text_list: list of str
+        List of text for training dataset followed by test dataset.
+    label_ids: ndarray
+        Label IDs for text_list.
+    num_training_samples: int
+        Number of training samples at the beginning of text_list.
+    label_to_id: dict
+        Label to ID mapping
+    key: dict
+        Information to validate the snapshot when it is loaded.
+    """
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    # Invalidate the existing snapshot first so that a partially written snapshot is never loaded.
+    meta_path = snapshot_dir / META_FILE
+    if meta_path.exists():
+        meta_path.unlink()
+
+    offsets = np.zeros(len(text_list) + 1, dtype=np.int64)
+    with open(snapshot_dir / TEXT_FILE, "wb") as f:
+        for i, text in enumerate(text_list):
+            b = text.encode("utf-8", errors="surrogatepass")
+            f.write(b)
+            offsets[i + 1] = offsets[i] + len(b)
+
+    np.save(snapshot_dir / OFFSETS_FILE, offsets)
+    np.save(snapshot_dir / LABELS_FILE, np.asarray(label_ids, dtype=np.int32))
+
+    meta = {"version": SNAPSHOT_VERSION,
+            "num_training_samples": num_training_samples,
+            "label_to_id": label_to_id,
+            "key": key}
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+    log.info("Saved snapshot of %d samples (%d bytes) to %s" % (len(text_list), offsets[-1], snapshot_dir))
+
+
+def load_snapshot(snapshot_dir, key=None, return_corpus=False):
+    """
+    Load a corpus from a snapshot directory.
+
+    Parameters
+    ----------
+    snapshot_dir: pathlib.Path
+        Directory where the snapshot is saved.
+    key: dict
+        If specified, the snapshot is loaded only if it was saved with the same key.
+    return_corpus: bool
+        Return x_train and x_test as Corpus backed by the memory-mapped snapshot instead of tuples of str.
+        No text is decoded when the snapshot is loaded.
+
+    Returns
+    -------
+    (x_train, y_train): tuple of list
+        x_train contains the list of text in string. y_train contains the ndarray of label IDs in int.
+    (x_test, y_test): tuple of list
+        x_test contains the list of text in string. y_test contains the ndarray of label IDs in int.
+    (label_to_id, id_to_label): tuple of dictionary
+        label_to_id contains label to ID mapping.  id_to_label contains ID to label mapping.
+        None is returned instead of the above if the snapshot does not exist or is stale.
+    """
+    meta_path = snapshot_dir / META_FILE
+    if meta_path.exists() is False:
+        return None
+
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+
+    if meta["version"] != SNAPSHOT_VERSION or (key is not None and meta["key"] != key):
+        log.info("Snapshot in %s is stale." % (snapshot_dir))
+        return None
+
+    offsets = np.load(snapshot_dir / OFFSETS_FILE, mmap_mode="r")
+    label_ids = np.load(snapshot_dir / LABELS_FILE, mmap_mode="r")
+
+    if offsets[-1] > 0:
+        blob = np.memmap(snapshot_dir / TEXT_FILE, dtype=np.uint8, mode="r")
+    else:  # Cannot memory-map an empty file
+        blob = np.zeros(0, dtype=np.uint8)
+
+    num_training_samples = meta["num_training_samples"]
+    y_train = np.array(label_ids[:num_training_samples])
+    y_test = np.array(label_ids[num_training_samples:])
+
+    if return_corpus:
+        corpus = build_corpus_from_offsets(blob, offsets, label_ids)
+        x_train = corpus[:num_training_samples]
+        x_test = corpus[num_training_samples:]
+    else:
+        text_list = [blob[offsets[i]:offsets[i + 1]].tobytes().decode("utf-8", errors="surrogatepass")
+                     for i in range(len(offsets) - 1)]
+        x_train = tuple(text_list[:num_training_samples])
+        x_test = tuple(text_list[num_training_samples:])
+
+    label_to_id = meta["label_to_id"]
+    id_to_label = {id: label for label, id in label_to_id.items()}
+
+    log.info("Loaded snapshot of %d samples from %s" % (len(label_ids), snapshot_dir))
+
+    return (x_train, y_train), (x_test, y_test), (label_to_id, id_to_label)
+
+
+def load_text_and_label_id_from_files_with_snapshot(root_dir, snapshot_dir, test_dataset_ratio=0.2, errors=None,
+                                                    num_workers=None, use_process_pool=False, return_corpus=False):
+    """
+    Load text from files under label directories using a snapshot if it is up to date.
+    If the snapshot does not exist, or files under root_dir were added, removed or modified since the snapshot
+    was saved, text is loaded from files and the snapshot is saved again.
+
+    Parameters
+    ----------
+    root_dir: pathlib.Path
+        Parent directory of labeled directories, each of which contains text files
+    snapshot_dir: pathlib.Path
+        Directory to save the snapshot.
+    test_dataset_ratio: float
+        Ratio of test dataset to split the data into training dataset and test dataset
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    num_workers: int
+        Number of workers to read files concurrently. If None or 1, files are read serially.
+    use_process_pool: bool
+        Use a process pool instead of a thread pool to read files.
+    return_corpus: bool
+        Return x_train and x_test as Corpus instead of tuples of str.
+
+    Returns
+    -------
+    (x_train, y_train): tuple of list
+        x_train contains the list of text in string. y_train contains the ndarray of label IDs in int.
+    (x_test, y_test): tuple of list
+        x_test contains the list of text in string. y_test contains the ndarray of label IDs in int.
+    (label_to_id, id_to_label): tuple of dictionary
+        label_to_id contains label to ID mapping.  id_to_label contains ID to label mapping.
+
+    Raises
+    ------
+    ValueError
+        If root_dir does not exist.
+    """
+    manifest = build_file_manifest(root_dir)
+    key = {"manifest_digest": compute_manifest_digest(manifest),
+           "test_dataset_ratio": test_dataset_ratio,
+           "errors": errors}
+
+    dataset = load_snapshot(snapshot_dir, key=key, return_corpus=return_corpus)
+    if dataset is not None:
+        return dataset
+
+    (x_train, y_train), (x_test, y_test), (label_to_id, id_to_label) = load_text_and_label_id_from_files(
+        root_dir, test_dataset_ratio=test_dataset_ratio, errors=errors, num_workers=num_workers,
+        use_process_pool=use_process_pool)
+
+    save_snapshot(snapshot_dir, list(x_train) + list(x_test), np.concatenate([y_train, y_test]), len(x_train),
+                  label_to_id, key=key)
+
+    if return_corpus:
+        return load_snapshot(snapshot_dir, return_corpus=True)
+
+    return (x_train, y_train), (x_test, y_test), (label_to_id, id_to_label)
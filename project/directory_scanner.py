@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+Scan label directories with os.scandir
+
+Label directories and files in each of them are listed in a single pass. File type is taken from the directory
+entry, so no extra stat call is made per file unless the size and modification time are requested.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import collections
+import concurrent.futures
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+FileEntry = collections.namedtuple("FileEntry", ["path", "size", "mtime_ns"])
+
+
+def _scan_label_dir(label_dir_path, with_stat=False):
+    """
+    List files in a label directory.
+
+    Parameters
+    ----------
+    label_dir_path: str
+        Path to the label directory
+    with_stat: bool
+        Get the size and the modification time of each file.
+
+    Returns
+    -------
+    file_entries: list of FileEntry
+        Files in the directory traversal order. Subdirectories are skipped.
+        size and mtime_ns are None unless with_stat is True.
+    """
+    file_entries = list()
+    with os.scandir(label_dir_path) as it:
+        for entry in it:
+            if entry.is_dir():  # Same as Path.glob("*") except directories
+                continue
+
+            if with_stat:
+                st = entry.stat()
+                file_entries.append(FileEntry(Path(entry.path), st.st_size, st.st_mtime_ns))
+            else:
+                file_entries.append(FileEntry(Path(entry.path), None, None))
+
+    return file_entries
+
+
+def scan_label_dirs(root_dir, with_stat=False, num_workers=None):
+    """
+    List label directories and files under each of them.
+
+    Parameters
+    ----------
+    root_dir: pathlib.Path
+        Parent directory of labeled directories, each of which contains text files
+    with_stat: bool
+        Get the size and the modification time of each file.
+    num_workers: int
+        Number of threads to scan label directories concurrently. If None or 1, directories are scanned serially.
+
+    Returns
+    -------
+    label_file_entries: list of tuple
+        List of (label, list of FileEntry) in the directory traversal order.
+
+    Raises
+    ------
+    ValueError
+        If root_dir does not exist.
+    """
+    root_dir_path = root_dir
+    if root_dir_path.exists() is False:
+        log.fatal("%s does not exist." % (root_dir_path))
+        raise ValueError("%s does not exist." % (root_dir_path))
+
+    with os.scandir(root_dir_path) as it:
+        label_dirs = [(entry.name, entry.path) for entry in it if entry.is_dir()]
+
+    for label, _ in label_dirs:
+        log.info("Scanning %s" % (label))
+
+    if num_workers is None or num_workers <= 1:
+        file_entries_list = [_scan_label_dir(path, with_stat=with_stat) for _, path in label_dirs]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+            file_entries_list = list(executor.map(lambda d: _scan_label_dir(d[1], with_stat=with_stat), label_dirs))
+
+    return [(label, file_entries) for (label, _), file_entries in zip(label_dirs, file_entries_list)]
+
+
+def scan_label_dirs_for_roots(root_dirs, with_stat=False, num_workers=None):
+    """
+    Scan multiple root directories, e.g. training and test dataset directories, concurrently.
+
+    Parameters
+    ----------
+    root_dirs: list of pathlib.Path
+        Parent directories of labeled directories
+    with_stat: bool
+        Get the size and the modification time of each file.
+    num_workers: int
+        Number of threads to scan root directories concurrently. If None or 1, directories are scanned serially.
+
+    Returns
+    -------
+    label_file_entries_list: list of list
+        Result of scan_label_dirs for each root directory.
+
+    Raises
+    ------
+    ValueError
+        If any of root_dirs does not exist.
+    """
+    if num_workers is None or num_workers <= 1:
+        return [scan_label_dirs(root_dir, with_stat=with_stat) for root_dir in root_dirs]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(num_workers, len(root_dirs))) as executor:
+        futures = [executor.submit(scan_label_dirs, root_dir, with_stat=with_stat) for root_dir in root_dirs]
+        return [f.result() for f in futures]
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+Build a manifest of files under label directories to detect changes in a corpus
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import hashlib
+
+from project.directory_scanner import scan_label_dirs
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+def compute_file_hash(input_file):
+    """
+    Compute a hash of the content of a file.
+
+    Parameters
+    ----------
+    input_file: pathlib.Path
+        Path to the file
+
+    Returns
+    -------
+    digest: str
+        Hex digest of the content
+    """
+    h = hashlib.sha1()
+    with open(input_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+
+    return h.hexdigest()
+
+
+def build_file_manifest(root_dir, use_content_hash=False):
+    """
+    Build a manifest of files under label directories.
+
+    Parameters
+    ----------
+    root_dir: pathlib.Path
+        Parent directory of labeled directories, each of which contains text files
+    use_content_hash: bool
+        Compute a hash of the content of each file. This requires reading all files.
+
+    Returns
+    -------
+    manifest: list of tuple
+        List of (relative path in str, size in bytes, modification time in ns, content hash in str)
+        in the directory traversal order. Content hash is an empty string unless use_content_hash is True.
+
+    Raises
+    ------
+    ValueError
+        If root_dir does not exist.
+    """
+    manifest = list()
+    for label, file_entries in scan_label_dirs(root_dir, with_stat=True):
+        for e in file_entries:
+            content_hash = compute_file_hash(e.path) if use_content_hash else ""
+            manifest.append((label + "/" + e.path.name, e.size, e.mtime_ns, content_hash))
+
+    return manifest
+
+
+def compute_manifest_digest(manifest):
+    """
+    Compute a digest of a manifest.
+
+    Parameters
+    ----------
+    manifest: list of tuple
+        List of (relative path in str, size in bytes, modification time in ns, content hash in str)
+
+    Returns
+    -------
+    digest: str
+        Hex digest which changes if any file is added, removed, modified or reordered.
+    """
+    h = hashlib.sha1()
+    for path, size, mtime_ns, content_hash in manifest:
+        line = "%s\t%d\t%d\t%s\n" % (path, size, mtime_ns, content_hash)
+        h.update(line.encode("utf-8", errors="surrogateescape"))
+
+    return h.hexdigest()
+
+
+def is_file_changed(old_entry, new_entry):
+    """
+    Check if a file was changed between two manifest entries of the same path.
+    If both entries have a content hash, only the content hash is compared so that touching a file is not
+    regarded as a change. Otherwise size and modification time are compared.
+
+    Parameters
+    ----------
+    old_entry: tuple
+        (relative path in str, size in bytes, modification time in ns, content hash in str)
+    new_entry: tuple
+        (relative path in str, size in bytes, modification time in ns, content hash in str)
+
+    Returns
+    -------
+    changed: bool
+        True if the file was changed.
+    """
+    if old_entry[3] != "" and new_entry[3] != "":
+        return old_entry[3] != new_entry[3]
+
+    return old_entry[1] != new_entry[1] or old_entry[2] != new_entry[2]
+
+
+def diff_file_manifest(old_manifest, new_manifest):
+    """
+    Compare two manifests.
+
+    Parameters
+    ----------
+    old_manifest: list of tuple
+        Manifest returned by build_file_manifest
+    new_manifest: list of tuple
+        Manifest returned by build_file_manifest
+
+    Returns
+    -------
+    added: list of str
+        Relative paths of files only in new_manifest
+    changed: list of str
+        Relative paths of files in both manifests whose content changed
+    removed: list of str
+        Relative paths of files only in old_manifest
+    """
+    old_entries = {e[0]: e for e in old_manifest}
+    new_paths = set()
+
+    added = list()
+    changed = list()
+    for e in new_manifest:
+        new_paths.add(e[0])
+        if e[0] not in old_entries:
+            added.append(e[0])
+        elif is_file_changed(old_entries[e[0]], e):
+            changed.append(e[0])
+
+    removed = [e[0] for e in old_manifest if e[0] not in new_paths]
+
+    return added, changed, removed
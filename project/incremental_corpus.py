@@ -0,0 +1,398 @@
+#!/usr/bin/env python
+"""
+Incrementally refresh a cached corpus loaded from label directories
+
+Only files added or changed since the last refresh are read. Text is appended to a blob in the cache directory
+and an index keeps the manifest entry and the location in the blob for each file. Space used by text of
+removed or changed files is reclaimed when it exceeds the space used by live text.
+
+The cache directory contains:
+    text.<generation>.bin: Text of files encoded in UTF-8.
+    index.json: Label to ID mapping, the generation of the blob, and the manifest entry, offset and length in the
+    blob for each file.
+
+Compaction writes live text to a blob of the next generation and replaces the index before the old blob is
+removed, so the index always refers to a complete blob if the process is interrupted.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import json
+
+import numpy as np
+
+from project.load_text_data import read_text_files
+from project.load_text_data import compute_num_training_samples
+from project.file_manifest import build_file_manifest
+from project.file_manifest import diff_file_manifest
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+INDEX_VERSION = 2
+TEXT_FILE_FORMAT = "text.%d.bin"
+INDEX_FILE = "index.json"
+
+
+def _get_text_path(cache_dir, index):
+    """
+    Get the path of the text blob the index refers to.
+
+    Parameters
+    ----------
+    cache_dir: pathlib.Path
+        Cache directory
+    index: dict
+        Index
+
+    Returns
+    -------
+    text_path: pathlib.Path
+        Path to the text blob
+    """
+    return cache_dir / (TEXT_FILE_FORMAT % (index["generation"]))
+
+
+def _remove_stale_text_blobs(cache_dir, index):
+    """
+    Remove text blobs the index does not refer to. They are left if the process is interrupted during compaction.
+
+    Parameters
+    ----------
+    cache_dir: pathlib.Path
+        Cache directory
+    index: dict
+        Index. If None, all text blobs are removed.
+    """
+    text_path = _get_text_path(cache_dir, index) if index is not None else None
+    for p in cache_dir.glob("text*.bin"):
+        if p != text_path:
+            p.unlink()
+
+
+def _load_index(cache_dir, errors):
+    """
+    Load the index from the cache directory.
+
+    Parameters
+    ----------
+    cache_dir: pathlib.Path
+        Cache directory
+    errors: str
+        Decoding option the corpus needs to have been read with.
+
+    Returns
+    -------
+    index: dict
+        Index. An empty index is returned if the index does not exist or was built with a different option.
+        In the latter case, the cached corpus is removed.
+    """
+    index_path = cache_dir / INDEX_FILE
+    if index_path.exists():
+        with open(index_path, "r") as f:
+            index = json.load(f)
+
+        if index["version"] == INDEX_VERSION and index["errors"] == errors:
+            _remove_stale_text_blobs(cache_dir, index)
+            return index
+
+        log.info("Cache in %s was built with a different option. Rebuilding." % (cache_dir))
+        index_path.unlink()
+
+    _remove_stale_text_blobs(cache_dir, None)
+
+    return {"version": INDEX_VERSION,
+            "errors": errors,
+            "generation": 0,
+            "label_to_id": dict(),
+            "entries": list(),  # List of [path, size, mtime_ns, content_hash, offset, length]
+            "garbage_bytes": 0}
+
+
+def _save_index(cache_dir, index):
+    """
+    Save the index to the cache directory. The index is replaced atomically.
+
+    Parameters
+    ----------
+    cache_dir: pathlib.Path
+        Cache directory
+    index: dict
+        Index
+    """
+    index_path = cache_dir / INDEX_FILE
+    tmp_path = cache_dir / (INDEX_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+
+def _open_text_blob(cache_dir, index):
+    """
+    Memory-map the text blob.
+
+    Parameters
+    ----------
+    cache_dir: pathlib.Path
+        Cache directory
+    index: dict
+        Index
+
+    Returns
+    -------
+    blob: ndarray
+        uint8 array of the blob
+    """
+    text_path = _get_text_path(cache_dir, index)
+    if text_path.exists() is False or text_path.stat().st_size == 0:  # Cannot memory-map an empty file
+        return np.zeros(0, dtype=np.uint8)
+
+    return np.memmap(text_path, dtype=np.uint8, mode="r")
+
+
+def _compact(cache_dir, index):
+    """
+    Write text of files in the index to a text blob of the next generation. The index is saved before the old blob
+    is removed.
+
+    Parameters
+    ----------
+    cache_dir: pathlib.Path
+        Cache directory
+    index: dict
+        Index. The generation and offsets are updated in place.
+    """
+    old_text_path = _get_text_path(cache_dir, index)
+    blob = _open_text_blob(cache_dir, index)
+    text_path = cache_dir / (TEXT_FILE_FORMAT % (index["generation"] + 1))
+
+    offset = 0
+    with open(text_path, "wb") as f:
+        for e in index["entries"]:
+            f.write(blob[e[4]:e[4] + e[5]].tobytes())
+            e[4] = offset
+            offset += e[5]
+
+    del blob
+    log.info("Compacted %s. Reclaimed %d bytes." % (cache_dir, index["garbage_bytes"]))
+    index["generation"] += 1
+    index["garbage_bytes"] = 0
+    _save_index(cache_dir, index)
+
+    if old_text_path.exists():
+        old_text_path.unlink()
+
+
+def refresh_corpus(root_dir, cache_dir, errors=None, use_content_hash=False, num_workers=None,
+                   use_process_pool=False):
+    """
+    Update the cached corpus with files added, changed or removed under label directories since the last refresh.
+    Label IDs of existing labels are kept. A new label is assigned the next ID. Labels whose files are all removed
+    keep their IDs.
+
+    Parameters
+    ----------
+    root_dir: pathlib.Path
+        Parent directory of labeled directories, each of which contains text files
+    cache_dir: pathlib.Path
+        Directory to store the cached corpus. Created if it does not exist.
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    use_content_hash: bool
+        Detect changes by the content hash of each file instead of size and modification time.
+        This reads all files, but files touched without changing the content are not read again.
+    num_workers: int
+        Number of workers to read files concurrently. If None or 1, files are read serially.
+    use_process_pool: bool
+        Use a process pool instead of a thread pool to read files.
+
+    Returns
+    -------
+    added: list of str
+        Relative paths of files added
+    changed: list of str
+        Relative paths of files changed
+    removed: list of str
+        Relative paths of files removed
+
+    Raises
+    ------
+    ValueError
+        If root_dir does not exist.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    index = _load_index(cache_dir, errors)
+
+    new_manifest = build_file_manifest(root_dir, use_content_hash=use_content_hash)
+    old_manifest = [tuple(e[:4]) for e in index["entries"]]
+    added, changed, removed = diff_file_manifest(old_manifest, new_manifest)
+
+    log.info("%d files added, %d files changed and %d files removed." % (len(added), len(changed), len(removed)))
+
+    if len(added) == 0 and len(changed) == 0 and len(removed) == 0:
+        if (cache_dir / INDEX_FILE).exists() is False:  # Save an empty corpus
+            _save_index(cache_dir, index)
+        return added, changed, removed
+
+    # Read and append text of added and changed files
+    paths_to_read = added + changed
+    text_list = read_text_files([root_dir / p for p in paths_to_read], errors=errors, num_workers=num_workers,
+                                use_process_pool=use_process_pool)
+
+    new_spans = dict()
+    with open(_get_text_path(cache_dir, index), "ab") as f:
+        offset = f.tell()
+        for p, text in zip(paths_to_read, text_list):
+            b = text.encode("utf-8", errors="surrogatepass")
+            f.write(b)
+            new_spans[p] = (offset, len(b))
+            offset += len(b)
+
+    old_spans = {e[0]: (e[4], e[5]) for e in index["entries"]}
+    for p in changed + removed:
+        index["garbage_bytes"] += old_spans[p][1]
+
+    # Rebuild entries in the directory traversal order
+    entries = list()
+    label_to_id = index["label_to_id"]
+    for path, size, mtime_ns, content_hash in new_manifest:
+        offset, length = new_spans[path] if path in new_spans else old_spans[path]
+        entries.append([path, size, mtime_ns, content_hash, offset, length])
+
+        label = path.split("/")[0]
+        if label not in label_to_id:
+            label_to_id[label] = len(label_to_id)
+
+    index["entries"] = entries
+
+    live_bytes = sum([e[5] for e in entries])
+    if index["garbage_bytes"] > live_bytes:
+        _compact(cache_dir, index)
+    else:
+        _save_index(cache_dir, index)
+
+    return added, changed, removed
+
+
+def load_corpus(cache_dir, test_dataset_ratio=0.2):
+    """
+    Load the cached corpus and split it in the same way as load_text_and_label_id_from_files.
+
+    Parameters
+    ----------
+    cache_dir: pathlib.Path
+        Directory where the cached corpus is stored.
+    test_dataset_ratio: float
+        Ratio of test dataset to split the data into training dataset and test dataset
+
+    Returns
+    -------
+    (x_train, y_train): tuple of list
+        x_train contains the list of text in string. y_train contains the ndarray of label IDs in int.
+    (x_test, y_test): tuple of list
+        x_test contains the list of text in string. y_test contains the ndarray of label IDs in int.
+    (label_to_id, id_to_label): tuple of dictionary
+        label_to_id contains label to ID mapping.  id_to_label contains ID to label mapping.
+
+    Raises
+    ------
+    ValueError
+        If the cached corpus does not exist.
+    """
+    index_path = cache_dir / INDEX_FILE
+    if index_path.exists() is False:
+        log.fatal("%s does not exist." % (index_path))
+        raise ValueError("%s does not exist." % (index_path))
+
+    with open(index_path, "r") as f:
+        index = json.load(f)
+
+    blob = _open_text_blob(cache_dir, index)
+    label_to_id = index["label_to_id"]
+
+    # Group entries by label in the directory traversal order
+    entries_for_label = dict()
+    for e in index["entries"]:
+        entries_for_label.setdefault(e[0].split("/")[0], list()).append(e)
+
+    all_training_samples = list()
+    all_test_samples = list()
+
+    for label, entries in entries_for_label.items():
+        num_training_samples = compute_num_training_samples(len(entries), test_dataset_ratio)
+        if num_training_samples is None:
+            log.info("Label %s contain only 1 sample and cannot be split to training and test dataset. Skipping." %
+                     (label))
+            continue
+
+        samples_for_label_id = [(blob[e[4]:e[4] + e[5]].tobytes().decode("utf-8", errors="surrogatepass"),
+                                 label_to_id[label]) for e in entries]
+
+        all_training_samples += samples_for_label_id[:num_training_samples]
+        all_test_samples += samples_for_label_id[num_training_samples:]
+
+    id_to_label = {id: label for label, id in label_to_id.items()}
+
+    # Unzip the list
+    (x_train, y_train) = tuple(zip(*all_training_samples))
+
+    if len(all_test_samples) > 0:
+        (x_test, y_test) = tuple(zip(*all_test_samples))
+    else:
+        x_test = list()
+        y_test = list()
+
+    y_train_np = np.array(y_train)
+    y_test_np = np.array(y_test)
+
+    return (x_train, y_train_np), (x_test, y_test_np), (label_to_id, id_to_label)
+
+
+def load_text_and_label_id_from_files_incrementally(root_dir, cache_dir, test_dataset_ratio=0.2, errors=None,
+                                                    use_content_hash=False, num_workers=None,
+                                                    use_process_pool=False):
+    """
+    Refresh the cached corpus and load it.
+    Text and the split are the same as load_text_and_label_id_from_files. Label IDs are kept stable across
+    refreshes, so they can differ from IDs returned by load_text_and_label_id_from_files.
+
+    Parameters
+    ----------
+    root_dir: pathlib.Path
+        Parent directory of labeled directories, each of which contains text files
+    cache_dir: pathlib.Path
+        Directory to store the cached corpus.
+    test_dataset_ratio: float
+        Ratio of test dataset to split the data into training dataset and test dataset
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    use_content_hash: bool
+        Detect changes by the content hash of each file instead of size and modification time.
+    num_workers: int
+        Number of workers to read files concurrently. If None or 1, files are read serially.
+    use_process_pool: bool
+        Use a process pool instead of a thread pool to read files.
+
+    Returns
+    -------
+    (x_train, y_train): tuple of list
+        x_train contains the list of text in string. y_train contains the ndarray of label IDs in int.
+    (x_test, y_test): tuple of list
+        x_test contains the list of text in string. y_test contains the ndarray of label IDs in int.
+    (label_to_id, id_to_label): tuple of dictionary
+        label_to_id contains label to ID mapping.  id_to_label contains ID to label mapping.
+
+    Raises
+    ------
+    ValueError
+        If root_dir does not exist.
+    """
+    refresh_corpus(root_dir, cache_dir, errors=errors, use_content_hash=use_content_hash, num_workers=num_workers,
+                   use_process_pool=use_process_pool)
+
+    return load_corpus(cache_dir, test_dataset_ratio=test_dataset_ratio)
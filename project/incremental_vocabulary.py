@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+Vocabulary updated with new documents without changing IDs of existing words
+
+Counts of all words are kept. When new words are counted, words which are not in the vocabulary and occur at
+least min_count times are appended with new IDs in the descending order of count, so text encoded with the
+vocabulary stays valid. By default, min_count is the smallest count of words in the initial vocabulary.
+Compaction ranks words by count again in the same way as map_word_list_to_vocabulary, and returns an array to map
+old IDs to new IDs so that encoded text can be converted instead of re-encoded.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import collections
+import gzip
+import json
+
+import numpy as np
+
+from project.text_to_id import RESERVED_WORD_LIST
+from project.text_to_id import map_word_count_to_vocabulary
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+INCREMENTAL_VOCABULARY_VERSION = 1
+
+
+class IncrementalVocabulary():
+    """
+    Word to ID mapping which can be extended with new words.
+    """
+
+    def __init__(self, word_count, word_to_id, min_count=None, max_vocabulary_size=None):
+        """
+        Initialize a vocabulary.
+
+        Parameters
+        ----------
+        word_count: dict
+            Word to count mapping of words counted so far, in the order of first occurrence.
+        word_to_id: dict
+            Word to id to top vocabulary mapping including RESERVED_WORD_LIST.
+        min_count: int
+            Minimum count for a word to be added to the vocabulary. If None, the smallest count of words in
+            word_to_id is used.
+        max_vocabulary_size: int
+            Maximum number of words in the vocabulary including reserved words. None for no limit.
+        """
+        self.word_count = dict(word_count)
+        self.word_to_id = dict(word_to_id)
+        self.id_to_word = {id: w for w, id in self.word_to_id.items()}
+
+        if min_count is None:
+            counts = [self.word_count[w] for w in self.word_to_id if w in self.word_count]
+            min_count = min(counts) if len(counts) > 0 else 1
+        self.min_count = min_count
+        self.max_vocabulary_size = max_vocabulary_size
+
+    def __len__(self):
+        return len(self.word_to_id)
+
+    def update(self, word_list):
+        """
+        Count words and add words which qualify for the vocabulary.
+
+        Parameters
+        ----------
+        word_list: list of str
+            Words in new documents
+
+        Returns
+        -------
+        new_words: list of str
+            Words added to the vocabulary in the order of ID
+        """
+        word_count = self.word_count
+        word_count_in_batch = collections.Counter(word_list)
+        for w, count in word_count_in_batch.items():
+            word_count[w] = word_count.get(w, 0) + count
+
+        new_words = [w for w in word_count_in_batch if w not in self.word_to_id and word_count[w] >= self.min_count]
+        new_words.sort(key=lambda w: word_count[w], reverse=True)
+
+        if self.max_vocabulary_size is not None:
+            new_words = new_words[:max(self.max_vocabulary_size - len(self.word_to_id), 0)]
+
+        next_id = max(self.id_to_word) + 1 if len(self.id_to_word) > 0 else 0
+        for id, w in enumerate(new_words, next_id):
+            self.word_to_id[w] = id
+            self.id_to_word[id] = w
+
+        log.info("Added %d words to the vocabulary of %d words" % (len(new_words), len(self.word_to_id)))
+
+        return new_words
+
+    def compact(self, top_vocabulary_size=None):
+        """
+        Assign IDs by the rank of count again in the same way as map_word_list_to_vocabulary.
+
+        Parameters
+        ----------
+        top_vocabulary_size: int
+            Size of top vocabulary after compaction. If None, the current number of words excluding reserved
+            words is kept.
+
+        Returns
+        -------
+        old_id_to_new_id: ndarray
+            int32 array to map an old ID to a new ID. Words removed from the vocabulary are mapped to 0 in the same
+            way as map_text_to_word_id. Use old_id_to_new_id[x] to convert encoded text.
+        """
+        if top_vocabulary_size is None:
+            top_vocabulary_size = len(self.word_to_id) - len(RESERVED_WORD_LIST)
+
+        _, _, _, _, _, word_to_id, id_to_word = map_word_count_to_vocabulary(self.word_count, top_vocabulary_size)
+
+        old_id_to_new_id = np.zeros(max(self.id_to_word) + 1, dtype=np.int32)
+        for w, old_id in self.word_to_id.items():
+            if w in word_to_id:
+                old_id_to_new_id[old_id] = word_to_id[w]
+
+        self.word_to_id = word_to_id
+        self.id_to_word = id_to_word
+
+        return old_id_to_new_id
+
+    def save(self, path):
+        """
+        Save the vocabulary and word counts to a gzip-compressed JSON file.
+
+        Parameters
+        ----------
+        path: pathlib.Path
+            Path to the file
+        """
+        state = {"version": INCREMENTAL_VOCABULARY_VERSION,
+                 "min_count": self.min_count,
+                 "max_vocabulary_size": self.max_vocabulary_size,
+                 "word_count": list(self.word_count.items()),  # List to keep the order in any JSON reader
+                 "word_to_id": list(self.word_to_id.items())}
+
+        with gzip.open(path, "wt", encoding="utf-8", errors="surrogatepass") as f:
+            json.dump(state, f, separators=(",", ":"))
+
+
+def create_incremental_vocabulary(word_list, top_vocabulary_size, min_count=None, max_vocabulary_size=None):
+    """
+    Create a vocabulary from words with the same IDs as map_word_list_to_vocabulary.
+
+    Parameters
+    ----------
+    word_list: list of str
+        List of words
+    top_vocabulary_size: int
+        Size of top vocabulary
+    min_count: int
+        Minimum count for a word to be added to the vocabulary by update. If None, the smallest count of words in
+        the top vocabulary is used.
+    max_vocabulary_size: int
+        Maximum number of words in the vocabulary including reserved words. None for no limit.
+
+    Returns
+    -------
+    vocabulary: IncrementalVocabulary
+        Vocabulary
+    """
+    word_count = collections.Counter(word_list)
+    _, _, _, _, _, word_to_id, _ = map_word_count_to_vocabulary(word_count, top_vocabulary_size)
+
+    return IncrementalVocabulary(word_count, word_to_id, min_count=min_count, max_vocabulary_size=max_vocabulary_size)
+
+
+def load_incremental_vocabulary(path):
+    """
+    Load a vocabulary saved with IncrementalVocabulary.save.
+
+    Parameters
+    ----------
+    path: pathlib.Path
+        Path to the file
+
+    Returns
+    -------
+    vocabulary: IncrementalVocabulary
+        Vocabulary
+
+    Raises
+    ------
+    ValueError
+        If path does not exist or the version is not supported.
+    """
+    if path.exists() is False:
+        log.fatal("%s does not exist." % (path))
+        raise ValueError("%s does not exist." % (path))
+
+    with gzip.open(path, "rt", encoding="utf-8", errors="surrogatepass") as f:
+        state = json.load(f)
+
+    if state["version"] != INCREMENTAL_VOCABULARY_VERSION:
+        raise ValueError("Unsupported vocabulary version %d." % (state["version"]))
+
+    return IncrementalVocabulary(dict(state["word_count"]), dict(state["word_to_id"]), min_count=state["min_count"],
+                                 max_vocabulary_size=state["max_vocabulary_size"])
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Lazily read documents from files
+
+A document is represented by a handle of its file path and label. Text is read from the file only when the
+document is accessed, and optionally kept in a bounded LRU cache.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import collections
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+DocumentHandle = collections.namedtuple("DocumentHandle", ["path", "label"])
+
+
+class LazyDocumentList():
+    """
+    Sequence of documents read from files on access.
+    """
+
+    def __init__(self, paths, labels=None, errors=None, cache_size=0, cache=None):
+        """
+        Initialize a lazy document list.
+
+        Parameters
+        ----------
+        paths: list of pathlib.Path
+            Path to the file of each document
+        labels: list or ndarray
+            Label or label ID of each document. None if documents are not labeled.
+        errors: str
+            Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+        cache_size: int
+            Maximum number of decoded documents to keep in the LRU cache. 0 disables the cache.
+        cache: collections.OrderedDict
+            Cache to share with another list. Used when slicing.
+        """
+        self.paths = paths
+        self.labels = labels
+        self.errors = errors
+        self.cache_size = cache_size
+        self.cache = cache if cache is not None else collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, index):
+        """
+        Get a document or a subset of documents.
+
+        Parameters
+        ----------
+        index: int or slice
+            Index of a document or a slice.
+
+        Returns
+        -------
+        text: str or LazyDocumentList
+            Text of the document if index is int. Otherwise, a list sharing the cache.
+        """
+        if isinstance(index, slice):
+            labels = self.labels[index] if self.labels is not None else None
+            return LazyDocumentList(self.paths[index], labels, errors=self.errors, cache_size=self.cache_size,
+                                    cache=self.cache)
+
+        return self.read(self.paths[index])
+
+    def __iter__(self):
+        for path in self.paths:
+            yield self.read(path)
+
+    def handle(self, index):
+        """
+        Get the handle of a document without reading it.
+
+        Parameters
+        ----------
+        index: int
+            Index of a document
+
+        Returns
+        -------
+        handle: DocumentHandle
+            Path and label of the document.
+        """
+        label = self.labels[index] if self.labels is not None else None
+        return DocumentHandle(self.paths[index], label)
+
+    def read(self, path):
+        """
+        Read text of a file using the cache.
+
+        Parameters
+        ----------
+        path: pathlib.Path
+            Path to the file
+
+        Returns
+        -------
+        text: str
+            Text of the file
+        """
+        if path in self.cache:
+            self.cache.move_to_end(path)
+            return self.cache[path]
+
+        with open(path, "r", errors=self.errors) as f:
+            text = f.read()
+
+        if self.cache_size > 0:
+            self.cache[path] = text
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        return text
@@ -0,0 +1,438 @@
+#!/usr/bin/env python
+"""
+Load text data directly from tar, tar.gz or zip archives without extracting them
+
+Member files need to be at <root>/<label>/<file>, where root is an optional directory in the archive, e.g. the
+label of 20news-18828/alt.atheism/49960 is alt.atheism if root is 20news-18828. If root is not specified, it is the
+top of the archive, or a single directory containing all member files if there is one. Member names are scanned
+once more to detect it, so specify root to avoid decompressing a tar archive twice. Members outside root and
+members under root at other depths, e.g. a README or nested directories, are skipped in the same way as the
+directory loaders, so training and test trees in the same archive are not merged. Members are read in the archive
+order, and text is decoded in the same way as files opened by the loaders in load_text_data.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import io
+import logging
+import time
+import tarfile
+import zipfile
+from pathlib import PurePosixPath
+
+import numpy as np
+
+from project.load_text_data import compute_num_training_samples
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+MACOSX_METADATA_DIR = "__MACOSX"  # Added to zip archives created on macOS
+
+
+def _list_member_files(archive_path):
+    """
+    List paths of member files in an archive without reading them.
+
+    Parameters
+    ----------
+    archive_path: pathlib.Path
+        Path to a tar, tar.gz, tar.bz2, tar.xz or zip archive
+
+    Returns
+    -------
+    names: list of str
+        Paths of member files in the archive order. An empty list if the archive is not supported.
+    """
+    if zipfile.is_zipfile(str(archive_path)):
+        with zipfile.ZipFile(str(archive_path)) as zf:
+            return [info.filename for info in zf.infolist() if info.is_dir() is False]
+
+    if tarfile.is_tarfile(str(archive_path)):
+        with tarfile.open(str(archive_path), "r|*") as tf:
+            return [member.name for member in tf if member.isfile()]
+
+    return list()
+
+
+def _detect_root_parts(names):
+    """
+    Detect the directory containing label directories from paths of member files.
+
+    Parameters
+    ----------
+    names: list of str
+        Paths of member files in the archive
+
+    Returns
+    -------
+    root_parts: tuple
+        Path components of the single top directory containing all member files except macOS metadata, or an empty
+        tuple if label directories are at the top of the archive.
+    """
+    top_dirs = set()
+    is_nested = False
+    for name in names:
+        parts = PurePosixPath(name).parts
+        if parts[0] == MACOSX_METADATA_DIR:
+            continue
+        if len(parts) == 1:  # A file at the top
+            return tuple()
+        top_dirs.add(parts[0])
+        is_nested = is_nested or len(parts) >= 3
+
+    if len(top_dirs) == 1 and is_nested:
+        return (top_dirs.pop(),)
+
+    return tuple()
+
+
+def _get_label(name, root_parts_list):
+    """
+    Get the label of a member file from its path.
+
+    Parameters
+    ----------
+    name: str
+        Path of the member in the archive
+    root_parts_list: list of tuple
+        Path components of each root directory
+
+    Returns
+    -------
+    (root_index, label): tuple
+        Index of the root containing the member and the label. (None, None) if the member is not in a label
+        directory right below any root.
+    """
+    parts = PurePosixPath(name).parts
+    for i, root_parts in enumerate(root_parts_list):
+        if parts[:len(root_parts)] != root_parts:
+            continue
+        if len(parts) != len(root_parts) + 2:
+            log.debug("Skipping %s, which is not in a label directory." % (name))
+            return None, None
+        return i, parts[len(root_parts)]
+
+    return None, None
+
+
+def _iterate_archive_members_for_roots(archive_path, root_list, errors=None):
+    """
+    Generator to read text of member files under root directories in an archive in the archive order.
+
+    Parameters
+    ----------
+    archive_path: pathlib.Path
+        Path to a tar, tar.gz, tar.bz2, tar.xz or zip archive
+    root_list: list of str
+        Directories in the archive containing label directories. None to detect the top of the archive or a single
+        directory containing all member files.
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+
+    Yields
+    ------
+    (root_index, label, text): tuple
+        Index of the root containing the member, name of the label directory and text of the member in string.
+
+    Raises
+    ------
+    ValueError
+        If archive_path does not exist or is not a supported archive.
+    """
+    if archive_path.exists() is False:
+        log.fatal("%s does not exist." % (archive_path))
+        raise ValueError("%s does not exist." % (archive_path))
+
+    root_parts_list = [PurePosixPath(root).parts if root is not None else None for root in root_list]
+    if None in root_parts_list:
+        root_parts = _detect_root_parts(_list_member_files(archive_path))
+        log.info("Reading label directories under /%s in %s" % ("/".join(root_parts), archive_path))
+        root_parts_list = [root_parts if p is None else p for p in root_parts_list]
+
+    start_time = time.time()
+    num_files = 0
+    total_bytes = 0
+
+    if zipfile.is_zipfile(str(archive_path)):
+        with zipfile.ZipFile(str(archive_path)) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                root_index, label = _get_label(info.filename, root_parts_list)
+                if label is None:
+                    continue
+                with zf.open(info) as f:
+                    text = io.TextIOWrapper(f, errors=errors).read()  # Same decoding as open(..., "r")
+                num_files += 1
+                total_bytes += info.file_size
+                yield root_index, label, text
+
+    elif tarfile.is_tarfile(str(archive_path)):
+        with tarfile.open(str(archive_path), "r|*") as tf:  # Stream mode. Compressed data is read sequentially.
+            for member in tf:
+                if member.isfile() is False:
+                    continue
+                root_index, label = _get_label(member.name, root_parts_list)
+                if label is None:
+                    continue
+                data = tf.extractfile(member).read()  # Stream mode members are not seekable
+                text = io.TextIOWrapper(io.BytesIO(data), errors=errors).read()  # Same decoding as open(..., "r")
+                num_files += 1
+                total_bytes += member.size
+                yield root_index, label, text
+
+    else:
+        raise ValueError("%s is not a supported archive." % (archive_path))
+
+    elapsed_time = max(time.time() - start_time, 1e-9)
+    log.info("Read %d files (%d bytes) from %s in %.3f sec: %.1f files/sec, %.1f bytes/sec" %
+             (num_files, total_bytes, archive_path, elapsed_time, num_files / elapsed_time,
+              total_bytes / elapsed_time))
+
+
+def iterate_archive_members(archive_path, root=None, errors=None):
+    """
+    Generator to read text of member files in an archive in the archive order.
+
+    Parameters
+    ----------
+    archive_path: pathlib.Path
+        Path to a tar, tar.gz, tar.bz2, tar.xz or zip archive
+    root: str
+        Directory in the archive containing label directories, e.g. 20news-bydate-train.
+        If None, the top of the archive or a single directory containing all member files is used.
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+
+    Yields
+    ------
+    (label, text): tuple
+        Name of the label directory containing the member and text of the member in string.
+        Members that are not in a label directory right below root are skipped.
+
+    Raises
+    ------
+    ValueError
+        If archive_path does not exist or is not a supported archive.
+    """
+    for _, label, text in _iterate_archive_members_for_roots(archive_path, [root], errors=errors):
+        yield label, text
+
+
+def _load_samples_for_labels(archive_path, root=None, errors=None):
+    """
+    Read an archive and group text by label.
+
+    Parameters
+    ----------
+    archive_path: pathlib.Path
+        Path to an archive
+    root: str
+        Directory in the archive containing label directories. If None, it is detected.
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+
+    Returns
+    -------
+    samples_for_labels: dict
+        Label to list of text mapping in the order labels first appear in the archive.
+    """
+    samples_for_labels = dict()
+    for label, text in iterate_archive_members(archive_path, root=root, errors=errors):
+        if label not in samples_for_labels:
+            log.info("Scanning %s" % (label))
+            samples_for_labels[label] = list()
+        samples_for_labels[label].append(text)
+
+    return samples_for_labels
+
+
+def load_text_from_archive(archive_path, root=None, test_dataset_ratio=0.2, errors=None):
+    """
+    Load text from member files under label directories in an archive.
+
+    Parameters
+    ----------
+    archive_path: pathlib.Path
+        Path to a tar, tar.gz, tar.bz2, tar.xz or zip archive
+    root: str
+        Directory in the archive containing label directories, e.g. 20news-18828.
+        If None, the top of the archive or a single directory containing all member files is used.
+    test_dataset_ratio: float
+        Ratio of test dataset to split the data into training dataset and test dataset
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+
+    Returns
+    -------
+    (x_train, y_train), (x_test, y_test): tuples of list
+        x_train and x_test contains the list of text in string.
+        y_train and y_test contains the list of labels in string.
+
+    Raises
+    ------
+    ValueError
+        If archive_path does not exist or is not a supported archive.
+    """
+    all_training_samples = list()
+    all_test_samples = list()
+
+    for label, text_list in _load_samples_for_labels(archive_path, root=root, errors=errors).items():
+
+        num_training_samples = compute_num_training_samples(len(text_list), test_dataset_ratio)
+        if num_training_samples is None:
+            log.info("Label %s contain only 1 sample and cannot be split to training and test dataset. Skipping." %
+                     (label))
+            continue
+
+        samples_for_label = [(text, label) for text in text_list]
+
+        all_training_samples += samples_for_label[:num_training_samples]
+        all_test_samples += samples_for_label[num_training_samples:]
+
+    # Unzip the list
+    (x_train, y_train) = tuple(zip(*all_training_samples))
+
+    if len(all_test_samples) > 0:
+        (x_test, y_test) = tuple(zip(*all_test_samples))
+    else:
+        x_test = list()
+        y_test = list()
+
+    return (x_train, y_train), (x_test, y_test)
+
+
+def load_text_and_label_id_from_archive(archive_path, root=None, test_dataset_ratio=0.2, errors=None):
+    """
+    Load text from member files under label directories in an archive.
+
+    Parameters
+    ----------
+    archive_path: pathlib.Path
+        Path to a tar, tar.gz, tar.bz2, tar.xz or zip archive
+    root: str
+        Directory in the archive containing label directories, e.g. 20news-18828.
+        If None, the top of the archive or a single directory containing all member files is used.
+    test_dataset_ratio: float
+        Ratio of test dataset to split the data into training dataset and test dataset
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+
+    Returns
+    -------
+    (x_train, y_train): tuple of list
+        x_train contains the list of text in string. y_train contains the ndarray of label IDs in int.
+    (x_test, y_test): tuple of list
+        x_test contains the list of text in string. y_test contains the ndarray of label IDs in int.
+    (label_to_id, id_to_label): tuple of dictionary
+        label_to_id contains label to ID mapping.  id_to_label contains ID to label mapping.
+
+    Raises
+    ------
+    ValueError
+        If archive_path does not exist or is not a supported archive.
+    """
+    label_to_id = dict()
+    current_id = 0
+
+    all_training_samples = list()
+    all_test_samples = list()
+
+    for label, text_list in _load_samples_for_labels(archive_path, root=root, errors=errors).items():
+
+        num_training_samples = compute_num_training_samples(len(text_list), test_dataset_ratio)
+        if num_training_samples is None:
+            log.info("Label %s contain only 1 sample and cannot be split to training and test dataset. Skipping." %
+                     (label))
+            continue
+
+        if label not in label_to_id:
+            new_label_id = current_id
+            label_to_id[label] = new_label_id
+            current_id += 1
+
+        samples_for_label_id = [(text, label_to_id[label]) for text in text_list]
+
+        all_training_samples += samples_for_label_id[:num_training_samples]
+        all_test_samples += samples_for_label_id[num_training_samples:]
+
+    id_to_label = {id: label for label, id in label_to_id.items()}
+
+    # Unzip the list
+    (x_train, y_train) = tuple(zip(*all_training_samples))
+
+    if len(all_test_samples) > 0:
+        (x_test, y_test) = tuple(zip(*all_test_samples))
+    else:
+        x_test = list()
+        y_test = list()
+
+    y_train_np = np.array(y_train)
+    y_test_np = np.array(y_test)
+
+    return (x_train, y_train_np), (x_test, y_test_np), (label_to_id, id_to_label)
+
+
+def load_text_and_label_id_from_archive_training_and_test_dirs(archive_path, training_root, test_root, errors=None):
+    """
+    Load text from member files under label directories of training and test directories in an archive.
+    The archive is read once.
+
+    Parameters
+    ----------
+    archive_path: pathlib.Path
+        Path to a tar, tar.gz, tar.bz2, tar.xz or zip archive
+    training_root: str
+        Directory in the archive containing label directories of training dataset, e.g. 20news-bydate-train
+    test_root: str
+        Directory in the archive containing label directories of test dataset, e.g. 20news-bydate-test
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+
+    Returns
+    -------
+    (x_train, y_train): tuple of list
+        x_train contains the list of text in string. y_train contains the ndarray of label IDs in int.
+    (x_test, y_test): tuple of list
+        x_test contains the list of text in string. y_test contains the ndarray of label IDs in int.
+    (label_to_id, id_to_label): tuple of dictionary
+        label_to_id contains label to ID mapping.  id_to_label contains ID to label mapping.
+
+    Raises
+    ------
+    ValueError
+        If archive_path does not exist or is not a supported archive, or training dataset has different label(s)
+        from test dataset.
+    """
+    samples_for_labels_list = [dict(), dict()]  # Training and test
+    for root_index, label, text in _iterate_archive_members_for_roots(archive_path, [training_root, test_root],
+                                                                      errors=errors):
+        samples_for_labels_list[root_index].setdefault(label, list()).append(text)
+
+    samples_for_labels_training, samples_for_labels_test = samples_for_labels_list
+    if set(samples_for_labels_test) != set(samples_for_labels_training):
+        raise ValueError("Training dataset has different label(s) from test dataset.")
+
+    label_to_id = {label: id for id, label in enumerate(samples_for_labels_training)}
+    id_to_label = {id: label for label, id in label_to_id.items()}
+
+    datasets = list()
+    for samples_for_labels in samples_for_labels_list:
+        samples = [(text, label_to_id[label]) for label, text_list in samples_for_labels.items()
+                   for text in text_list]
+
+        # Unzip the list
+        if len(samples) > 0:
+            (x, y) = tuple(zip(*samples))
+        else:
+            x = list()
+            y = list()
+
+        datasets.append((x, np.array(y)))
+
+    return datasets[0], datasets[1], (label_to_id, id_to_label)
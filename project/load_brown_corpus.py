@@ -22,11 +22,13 @@ import nltk
 nltk.download('brown')
 from nltk.corpus import brown
 
+from project.corpus import build_corpus
+
 log = logging.getLogger(__name__)
 logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
 
 
-def load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=None):
+def load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=None, return_corpus=False):
     """
     Load text from Brown corpus.
 
@@ -38,6 +40,8 @@ def load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=N
         Ratio of test dataset to split the data into training dataset and test dataset
     errors: str
         Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    return_corpus: bool
+        Return x_train and x_test as Corpus instead of tuples of str.
 
     Returns
     -------
@@ -62,22 +66,24 @@ def load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=N
         log.fatal("%s does not exist." % (root_dir_path))
         raise ValueError("%s does not exist." % (root_dir_path))
 
-    documents = [x for x in root_dir_path.glob("c*")]
-
-    labels = {label.name[:2] for label in documents}
+    # Group documents by label in one pass over the directory
+    file_names_for_labels = dict()
+    with os.scandir(root_dir_path) as it:
+        for entry in it:
+            if entry.name.startswith("c"):
+                file_names_for_labels.setdefault(entry.name[:2], list()).append(entry.name)
 
     all_training_samples = list()
     all_test_samples = list()
 
-    for label in labels:
+    for label, file_names in file_names_for_labels.items():
 
         log.info("Scanning %s" % (label))
 
         samples_for_label = list()
 
         # Process files
-        for input_file in root_dir_path.glob(label + "*"):
-            file_name = input_file.name
+        for file_name in file_names:
             text = " ".join(brown.words(fileids=[file_name]))
             sample = (text, label)
             samples_for_label.append(sample)
@@ -122,4 +128,8 @@ def load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=N
     y_train_np = np.array(y_train)
     y_test_np = np.array(y_test)
 
+    if return_corpus:
+        x_train = build_corpus(x_train, y_train_np)
+        x_test = build_corpus(x_test, y_test_np)
+
     return (x_train, y_train_np), (x_test, y_test_np), (label_to_id, id_to_label)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""
+Read documents from a very large text file without reading the whole file
+
+The file is memory-mapped and split into documents by a delimiter (a line break by default). Each document is
+represented by a (label, offset, length) record and is decoded only when its text is requested.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import mmap
+import collections
+
+from project.load_text_data import compute_num_training_samples
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+DocumentRecord = collections.namedtuple("DocumentRecord", ["label", "offset", "length"])
+
+
+class MappedTextFile():
+    """
+    Memory-mapped text file containing documents separated by a delimiter.
+    """
+
+    def __init__(self, path):
+        """
+        Memory-map a file.
+
+        Parameters
+        ----------
+        path: pathlib.Path
+            Path to the file
+
+        Raises
+        ------
+        ValueError
+            If path does not exist.
+        """
+        if path.exists() is False:
+            log.fatal("%s does not exist." % (path))
+            raise ValueError("%s does not exist." % (path))
+
+        self.path = path
+        self.f = open(path, "rb")
+        if os.fstat(self.f.fileno()).st_size > 0:
+            self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:  # Cannot memory-map an empty file
+            self.mm = b""
+
+    def close(self):
+        """
+        Unmap and close the file.
+        """
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.mm)
+
+    def iterate_records(self, delimiter=b"\n", label=None, label_separator=None, skip_empty=True):
+        """
+        Generator to split the file into documents.
+
+        Parameters
+        ----------
+        delimiter: bytes
+            Delimiter between documents.
+        label: str
+            Label of all documents. Ignored if label_separator is specified.
+        label_separator: bytes
+            If specified, each document starts with its label followed by label_separator, e.g. b"\t".
+            The label is excluded from the document.
+        skip_empty: bool
+            Skip documents with no content.
+
+        Yields
+        ------
+        record: DocumentRecord
+            (label, offset, length) of a document in the file.
+        """
+        mm = self.mm
+        size = len(mm)
+        delimiter_size = len(delimiter)
+
+        start = 0
+        while start < size:
+            end = mm.find(delimiter, start)
+            if end < 0:
+                end = size
+
+            doc_label = label
+            doc_start = start
+            if label_separator is not None:
+                label_end = mm.find(label_separator, start, end)
+                if label_end >= 0:
+                    doc_label = mm[start:label_end].decode("utf-8")
+                    doc_start = label_end + len(label_separator)
+
+            if end > doc_start or skip_empty is False:
+                yield DocumentRecord(doc_label, doc_start, end - doc_start)
+
+            start = end + delimiter_size
+
+    def read(self, record, errors=None):
+        """
+        Decode the text of a document.
+
+        Parameters
+        ----------
+        record: DocumentRecord
+            Record of a document
+        errors: str
+            Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+
+        Returns
+        -------
+        text: str
+            Text of the document
+        """
+        if errors is None:
+            errors = "strict"
+
+        return self.mm[record.offset:record.offset + record.length].decode("utf-8", errors=errors)
+
+    def iterate_text(self, records, errors=None):
+        """
+        Generator to decode the text of documents one at a time.
+
+        Parameters
+        ----------
+        records: iterable of DocumentRecord
+            Records of documents
+        errors: str
+            Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+
+        Yields
+        ------
+        (text, label): tuple
+            Text of the document in string and the label of the document.
+        """
+        for record in records:
+            yield self.read(record, errors=errors), record.label
+
+
+def split_records(records, test_dataset_ratio=0.2):
+    """
+    Split document records into training and test dataset in the same way as load_text_and_label_id_from_files.
+    No text is decoded.
+
+    Parameters
+    ----------
+    records: iterable of DocumentRecord
+        Records of documents
+    test_dataset_ratio: float
+        Ratio of test dataset to split the data into training dataset and test dataset
+
+    Returns
+    -------
+    (training_records, test_records): tuple of list
+        Lists of DocumentRecord for training dataset and test dataset.
+    (label_to_id, id_to_label): tuple of dictionary
+        label_to_id contains label to ID mapping.  id_to_label contains ID to label mapping.
+    """
+    records_for_labels = dict()
+    for record in records:
+        records_for_labels.setdefault(record.label, list()).append(record)
+
+    label_to_id = dict()
+    training_records = list()
+    test_records = list()
+
+    for label, records_for_label in records_for_labels.items():
+        num_training_samples = compute_num_training_samples(len(records_for_label), test_dataset_ratio)
+        if num_training_samples is None:
+            log.info("Label %s contain only 1 sample and cannot be split to training and test dataset. Skipping." %
+                     (label))
+            continue
+
+        label_to_id[label] = len(label_to_id)
+        training_records += records_for_label[:num_training_samples]
+        test_records += records_for_label[num_training_samples:]
+
+    id_to_label = {id: label for label, id in label_to_id.items()}
+
+    return (training_records, test_records), (label_to_id, id_to_label)
@@ -10,13 +10,323 @@ __email__ = "hideyuki@gmail.com"
 
 import os
 import logging
+import time
+import functools
+import concurrent.futures
 import numpy as np
 
+from project.corpus import build_corpus_from_offsets
+from project.lazy_documents import LazyDocumentList
+from project.directory_scanner import scan_label_dirs
+from project.directory_scanner import scan_label_dirs_for_roots
+
 log = logging.getLogger(__name__)
 logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
 
 
-def load_text_from_files(root_dir, test_dataset_ratio=0.2, errors=None):
+def _read_text_file(input_file, errors=None):
+    """
+    Read a text file.
+
+    Parameters
+    ----------
+    input_file: pathlib.Path
+        Path to the text file
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+
+    Returns
+    -------
+    (text, size): tuple
+        Text in string and the size of the file in bytes.
+    """
+    with open(input_file, "r", errors=errors) as f:
+        text = f.read()  # Change this if you are reading a very large text file.
+        size = os.fstat(f.fileno()).st_size
+
+    return text, size
+
+
+def _iterate_file_contents(read_file, file_list, num_workers=None, use_process_pool=False):
+    """
+    Generator to read files, optionally in parallel using a thread or process pool.
+
+    Parameters
+    ----------
+    read_file: function
+        Function to read a file, which returns a tuple of the content and the size of the file in bytes.
+    file_list: list of pathlib.Path
+        List of files to read
+    num_workers: int
+        Number of workers to read files concurrently. If None or 1, files are read serially.
+    use_process_pool: bool
+        Use a process pool instead of a thread pool. Useful if decoding rather than I/O is the bottleneck.
+
+    Yields
+    ------
+    (content, size): tuple
+        Content and the size of each file in the same order as file_list.
+    """
+    if num_workers is None or num_workers <= 1 or len(file_list) <= 1:
+        for f in file_list:
+            yield read_file(f)
+        return
+
+    if use_process_pool:
+        executor_class = concurrent.futures.ProcessPoolExecutor
+    else:
+        executor_class = concurrent.futures.ThreadPoolExecutor
+
+    chunk_size = 1
+    if use_process_pool:  # Amortize IPC cost
+        chunk_size = max(len(file_list) // (num_workers * 4), 1)
+
+    with executor_class(max_workers=num_workers) as executor:
+        for result in executor.map(read_file, file_list, chunksize=chunk_size):  # map preserves order
+            yield result
+
+
+def read_text_files(file_list, errors=None, num_workers=None, use_process_pool=False):
+    """
+    Read text files, optionally in parallel using a thread or process pool.
+
+    Parameters
+    ----------
+    file_list: list of pathlib.Path
+        List of files to read
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    num_workers: int
+        Number of workers to read files concurrently. If None or 1, files are read serially.
+    use_process_pool: bool
+        Use a process pool instead of a thread pool. Useful if decoding rather than I/O is the bottleneck.
+
+    Returns
+    -------
+    text_list: list of str
+        List of text in the same order as file_list.
+    """
+    start_time = time.time()
+
+    read_file = functools.partial(_read_text_file, errors=errors)
+    results = list(_iterate_file_contents(read_file, file_list, num_workers=num_workers,
+                                          use_process_pool=use_process_pool))
+
+    text_list = [r[0] for r in results]
+    total_bytes = sum([r[1] for r in results])
+
+    elapsed_time = max(time.time() - start_time, 1e-9)
+    log.info("Read %d files (%d bytes) in %.3f sec: %.1f files/sec, %.1f bytes/sec" %
+             (len(file_list), total_bytes, elapsed_time, len(file_list) / elapsed_time, total_bytes / elapsed_time))
+
+    return text_list
+
+
+def _read_encoded_text_file(input_file, errors=None):
+    """
+    Read a text file and encode the text in UTF-8.
+
+    Parameters
+    ----------
+    input_file: pathlib.Path
+        Path to the text file
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+
+    Returns
+    -------
+    (b, size): tuple
+        Text encoded in UTF-8 and the size of the file in bytes.
+    """
+    text, size = _read_text_file(input_file, errors=errors)
+
+    return text.encode("utf-8", errors="surrogatepass"), size
+
+
+def read_text_files_to_corpus(file_list, errors=None, num_workers=None, use_process_pool=False):
+    """
+    Read text files into a Corpus. Text of each file is appended to the buffer as it is read, so the list of text
+    in string is never built. Text is decoded in the same way as read_text_files.
+
+    Parameters
+    ----------
+    file_list: list of pathlib.Path
+        List of files to read
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    num_workers: int
+        Number of workers to read files concurrently. If None or 1, files are read serially.
+    use_process_pool: bool
+        Use a process pool instead of a thread pool. Useful if decoding rather than I/O is the bottleneck.
+
+    Returns
+    -------
+    corpus: Corpus
+        Unlabeled corpus of text in the same order as file_list.
+    """
+    start_time = time.time()
+
+    buffer = bytearray()
+    offsets = np.zeros(len(file_list) + 1, dtype=np.int64)
+    total_bytes = 0
+
+    read_file = functools.partial(_read_encoded_text_file, errors=errors)
+    for i, (b, size) in enumerate(_iterate_file_contents(read_file, file_list, num_workers=num_workers,
+                                                         use_process_pool=use_process_pool)):
+        buffer += b
+        offsets[i + 1] = len(buffer)
+        total_bytes += size
+
+    elapsed_time = max(time.time() - start_time, 1e-9)
+    log.info("Read %d files (%d bytes) in %.3f sec: %.1f files/sec, %.1f bytes/sec" %
+             (len(file_list), total_bytes, elapsed_time, len(file_list) / elapsed_time, total_bytes / elapsed_time))
+
+    return build_corpus_from_offsets(np.frombuffer(buffer, dtype=np.uint8), offsets)
+
+
+def _select_from_corpus(corpus, indices, labels):
+    """
+    Select documents of a dataset from a corpus without copying the buffer.
+
+    Parameters
+    ----------
+    corpus: Corpus
+        Corpus of all files
+    indices: tuple of int
+        Indices of documents in corpus
+    labels: tuple or ndarray
+        Label or label ID of each document
+
+    Returns
+    -------
+    corpus: Corpus
+        Labeled corpus sharing the buffer
+    """
+    subset = corpus[np.array(indices, dtype=np.int64)]
+    subset.labels = np.asarray(labels)
+
+    return subset
+
+
+def _list_label_files(root_dir_path, num_workers=None):
+    """
+    List label directories and files under each of them.
+
+    Parameters
+    ----------
+    root_dir_path: pathlib.Path
+        Parent directory of labeled directories, each of which contains text files
+    num_workers: int
+        Number of threads to scan label directories concurrently. If None or 1, directories are scanned serially.
+
+    Returns
+    -------
+    label_files: list of tuple
+        List of (label, list of files) in the directory traversal order.
+
+    Raises
+    ------
+    ValueError
+        If root_dir_path does not exist.
+    """
+    label_file_entries = scan_label_dirs(root_dir_path, num_workers=num_workers)
+    return [(label, [e.path for e in file_entries]) for label, file_entries in label_file_entries]
+
+
+def _list_label_files_for_training_and_test(root_training_dir, root_test_dir, num_workers=None):
+    """
+    List label directories and files under each of them for training and test dataset directories.
+
+    Parameters
+    ----------
+    root_training_dir: pathlib.Path
+        Parent directory of labeled directories containing training dataset
+    root_test_dir: pathlib.Path
+        Parent directory of labeled directories containing test dataset
+    num_workers: int
+        Number of threads to scan the two directories concurrently. If None or 1, directories are scanned serially.
+
+    Returns
+    -------
+    (label_files_training, label_files_test): tuple of list
+        List of (label, list of files) for training dataset and test dataset.
+
+    Raises
+    ------
+    ValueError
+        If a directory does not exist, or training dataset has different label(s) from test dataset.
+    """
+    label_file_entries_list = scan_label_dirs_for_roots([root_training_dir, root_test_dir], num_workers=num_workers)
+    label_files_training, label_files_test = [
+        [(label, [e.path for e in file_entries]) for label, file_entries in label_file_entries]
+        for label_file_entries in label_file_entries_list]
+
+    if {label for label, _ in label_files_test} != {label for label, _ in label_files_training}:
+        raise ValueError("Training dataset has different label(s) from test dataset.")
+
+    return label_files_training, label_files_test
+
+
+def compute_num_training_samples(num_samples_for_label, test_dataset_ratio):
+    """
+    Compute the number of training samples for a label. Samples of each label are split in the same way by all
+    loaders: at least one sample goes to the test dataset if test_dataset_ratio is positive, and the first
+    samples in the loading order are training samples.
+
+    Parameters
+    ----------
+    num_samples_for_label: int
+        Number of samples for the label
+    test_dataset_ratio: float
+        Ratio of test dataset to split the data into training dataset and test dataset
+
+    Returns
+    -------
+    num_training_samples: int
+        Number of training samples. The rest of samples are test samples.
+        None if the label needs to be skipped as it cannot be split.
+    """
+    if num_samples_for_label == 1 and test_dataset_ratio > 0:
+        return None
+
+    if test_dataset_ratio > 0:
+        num_test_samples = max(int(num_samples_for_label * test_dataset_ratio), 1)
+    else:
+        num_test_samples = 0
+
+    return num_samples_for_label - num_test_samples
+
+
+def _select_label_files(label_files, test_dataset_ratio):
+    """
+    Drop labels that cannot be split and compute the number of training samples for the rest.
+
+    Parameters
+    ----------
+    label_files: list of tuple
+        List of (label, list of files)
+    test_dataset_ratio: float
+        Ratio of test dataset to split the data into training dataset and test dataset
+
+    Returns
+    -------
+    selected: list of tuple
+        List of (label, list of files, number of training samples)
+    """
+    selected = list()
+    for label, files in label_files:
+        num_training_samples = compute_num_training_samples(len(files), test_dataset_ratio)
+        if num_training_samples is None:
+            log.info("Label %s contain only 1 sample and cannot be split to training and test dataset. Skipping." %
+                     (label))
+            continue
+        selected.append((label, files, num_training_samples))
+
+    return selected
+
+
+def load_text_from_files(root_dir, test_dataset_ratio=0.2, errors=None, num_workers=None, use_process_pool=False,
+                         return_corpus=False, lazy=False, cache_size=0):
     """
     Load text from files under label directories.
 
@@ -28,6 +338,17 @@ def load_text_from_files(root_dir, test_dataset_ratio=0.2, errors=None):
         Ratio of test dataset to split the data into training dataset and test dataset
     errors: str
         Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    num_workers: int
+        Number of workers to scan directories and read files concurrently. If None or 1, they are processed serially.
+    use_process_pool: bool
+        Use a process pool instead of a thread pool to read files.
+    return_corpus: bool
+        Return x_train and x_test as Corpus instead of tuples of str.
+    lazy: bool
+        Return x_train and x_test as LazyDocumentList that reads each file when it is accessed.
+        No file is read by the loader.
+    cache_size: int
+        Maximum number of decoded documents to keep in the LRU cache of LazyDocumentList.
 
     Returns
     -------
@@ -40,41 +361,28 @@ def load_text_from_files(root_dir, test_dataset_ratio=0.2, errors=None):
     ValueError
         If root_dir does not exist.
     """
-    root_dir_path = root_dir
-    if root_dir_path.exists() is False:
-        log.fatal("% does not exist." % (root_dir_path))
-        raise ValueError("% does not exist." % (root_dir_path))
-
-    label_dirs = [x for x in root_dir_path.iterdir() if x.is_dir()]
+    label_files = _select_label_files(_list_label_files(root_dir, num_workers=num_workers), test_dataset_ratio)
+
+    all_files = [f for _, files, _ in label_files for f in files]
+    if lazy:
+        all_text = all_files  # Files are read when accessed
+    elif return_corpus:
+        corpus = read_text_files_to_corpus(all_files, errors=errors, num_workers=num_workers,
+                                           use_process_pool=use_process_pool)
+        all_text = range(len(all_files))  # Samples refer to documents in corpus
+    else:
+        all_text = read_text_files(all_files, errors=errors, num_workers=num_workers,
+                                   use_process_pool=use_process_pool)
 
     all_training_samples = list()
     all_test_samples = list()
 
-    for label_dir in label_dirs:
-
-        label = label_dir.name
-        log.info("Scanning %s" % (label))
-
-        samples_for_label = list()
-        # Process files
-        for input_file in label_dir.glob("*"):
-            with open(input_file, "r", errors=errors) as f:
-                text = f.read()  # Change this if you are reading a very large text file.
-                sample = (text, label)
-                samples_for_label.append(sample)
-
-        num_samples_for_label = len(samples_for_label)
-
-        if num_samples_for_label == 1 and test_dataset_ratio > 0:
-            log.info("Label %s contain only 1 sample and cannot be split to training and test dataset. Skipping.")
-            continue
+    i = 0
+    for label, files, num_training_samples in label_files:
 
-        if test_dataset_ratio > 0:
-            num_test_samples = max(int(num_samples_for_label * test_dataset_ratio), 1)
-        else:
-            num_test_samples = 0
+        samples_for_label = [(text, label) for text in all_text[i:i + len(files)]]
+        i += len(files)
 
-        num_training_samples = num_samples_for_label - num_test_samples
         training_samples = samples_for_label[:num_training_samples]
         test_samples = samples_for_label[num_training_samples:]
 
@@ -90,9 +398,17 @@ def load_text_from_files(root_dir, test_dataset_ratio=0.2, errors=None):
         x_test = list()
         y_test = list()
 
+    if lazy:
+        x_train = LazyDocumentList(x_train, y_train, errors=errors, cache_size=cache_size)
+        x_test = LazyDocumentList(x_test, y_test, errors=errors, cache_size=cache_size)
+    elif return_corpus:
+        x_train = _select_from_corpus(corpus, x_train, y_train)
+        x_test = _select_from_corpus(corpus, x_test, y_test)
+
     return (x_train, y_train), (x_test, y_test)
 
-def load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=None):
+def load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=None, num_workers=None,
+                                      use_process_pool=False, return_corpus=False, lazy=False, cache_size=0):
     """
     Load text from files under label directories.
 
@@ -104,6 +420,17 @@ def load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=N
         Ratio of test dataset to split the data into training dataset and test dataset
     errors: str
         Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    num_workers: int
+        Number of workers to scan directories and read files concurrently. If None or 1, they are processed serially.
+    use_process_pool: bool
+        Use a process pool instead of a thread pool to read files.
+    return_corpus: bool
+        Return x_train and x_test as Corpus instead of tuples of str.
+    lazy: bool
+        Return x_train and x_test as LazyDocumentList that reads each file when it is accessed.
+        No file is read by the loader.
+    cache_size: int
+        Maximum number of decoded documents to keep in the LRU cache of LazyDocumentList.
 
     Returns
     -------
@@ -123,34 +450,24 @@ def load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=N
     label_to_id = dict()
     current_id = 0
 
-    root_dir_path = root_dir
-    if root_dir_path.exists() is False:
-        log.fatal("% does not exist." % (root_dir_path))
-        raise ValueError("% does not exist." % (root_dir_path))
+    label_files = _select_label_files(_list_label_files(root_dir, num_workers=num_workers), test_dataset_ratio)
 
-    label_dirs = [x for x in root_dir_path.iterdir() if x.is_dir()]
+    all_files = [f for _, files, _ in label_files for f in files]
+    if lazy:
+        all_text = all_files  # Files are read when accessed
+    elif return_corpus:
+        corpus = read_text_files_to_corpus(all_files, errors=errors, num_workers=num_workers,
+                                           use_process_pool=use_process_pool)
+        all_text = range(len(all_files))  # Samples refer to documents in corpus
+    else:
+        all_text = read_text_files(all_files, errors=errors, num_workers=num_workers,
+                                   use_process_pool=use_process_pool)
 
     all_training_samples = list()
     all_test_samples = list()
 
-    for label_dir in label_dirs:
-
-        label = label_dir.name
-        log.info("Scanning %s" % (label))
-
-        samples_for_label = list()
-        # Process files
-        for input_file in label_dir.glob("*"):
-            with open(input_file, "r", errors=errors) as f:
-                text = f.read()  # Change this if you are reading a very large text file.
-                sample = (text, label)
-                samples_for_label.append(sample)
-
-        num_samples_for_label = len(samples_for_label)
-
-        if num_samples_for_label == 1 and test_dataset_ratio > 0:
-            log.info("Label %s contain only 1 sample and cannot be split to training and test dataset. Skipping.")
-            continue
+    i = 0
+    for label, files, num_training_samples in label_files:
 
         if label not in label_to_id:
             new_label_id = current_id
@@ -158,21 +475,15 @@ def load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=N
             current_id += 1
 
         # Change label string to ID in dataset
-        samples_for_label_id = [(s[0], label_to_id[s[1]]) for s in samples_for_label]
+        samples_for_label_id = [(text, label_to_id[label]) for text in all_text[i:i + len(files)]]
+        i += len(files)
 
-        if test_dataset_ratio > 0:
-            num_test_samples = max(int(num_samples_for_label * test_dataset_ratio), 1)
-        else:
-            num_test_samples = 0
-
-        num_training_samples = num_samples_for_label - num_test_samples
-        training_samples =  samples_for_label_id [:num_training_samples]
-        test_samples =  samples_for_label_id [num_training_samples:]
+        training_samples = samples_for_label_id[:num_training_samples]
+        test_samples = samples_for_label_id[num_training_samples:]
 
         all_training_samples += training_samples
         all_test_samples += test_samples
 
-
     id_to_label = {id: label for label, id in label_to_id.items()}
 
     # Unzip the list
@@ -187,9 +498,18 @@ def load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=N
     y_train_np = np.array(y_train)
     y_test_np = np.array(y_test)
 
+    if lazy:
+        x_train = LazyDocumentList(x_train, y_train_np, errors=errors, cache_size=cache_size)
+        x_test = LazyDocumentList(x_test, y_test_np, errors=errors, cache_size=cache_size)
+    elif return_corpus:
+        x_train = _select_from_corpus(corpus, x_train, y_train_np)
+        x_test = _select_from_corpus(corpus, x_test, y_test_np)
+
     return (x_train, y_train_np), (x_test, y_test_np), (label_to_id, id_to_label)
 
-def load_text_and_label_id_from_training_and_test_dirs(root_training_dir, root_test_dir, errors=None):
+def load_text_and_label_id_from_training_and_test_dirs(root_training_dir, root_test_dir, errors=None,
+                                                       num_workers=None, use_process_pool=False, return_corpus=False,
+                                                       lazy=False, cache_size=0):
     """
     Load text from files under label directories.
 
@@ -201,6 +521,17 @@ def load_text_and_label_id_from_training_and_test_dirs(root_training_dir, root_t
         Parent directory of labeled directories containing test dataset, each of which contains text files
     errors: str
         Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    num_workers: int
+        Number of workers to scan directories and read files concurrently. If None or 1, they are processed serially.
+    use_process_pool: bool
+        Use a process pool instead of a thread pool to read files.
+    return_corpus: bool
+        Return x_train and x_test as Corpus instead of tuples of str.
+    lazy: bool
+        Return x_train and x_test as LazyDocumentList that reads each file when it is accessed.
+        No file is read by the loader.
+    cache_size: int
+        Maximum number of decoded documents to keep in the LRU cache of LazyDocumentList.
 
     Returns
     -------
@@ -220,50 +551,42 @@ def load_text_and_label_id_from_training_and_test_dirs(root_training_dir, root_t
     label_to_id = dict()
     current_id = 0
 
-    all_training_samples = list()
-    all_test_samples = list()
-
-    label_dirs_training = None
-    for i, root_dir_path in enumerate([root_training_dir, root_test_dir]):
+    label_files_training, label_files_test = _list_label_files_for_training_and_test(root_training_dir, root_test_dir,
+                                                                                     num_workers=num_workers)
 
-        if root_dir_path.exists() is False:
-            log.fatal("% does not exist." % (root_dir_path))
-            raise ValueError("% does not exist." % (root_dir_path))
-
-        label_dirs = [x for x in root_dir_path.iterdir() if x.is_dir()]
-        if i == 0:
-            label_dirs_training = label_dirs
-        else:
-            if {p.name for p in label_dirs} != {p.name for p in label_dirs_training}:
-                raise ValueError("Training dataset has different label(s) from test dataset.")
-
-        for label_dir in label_dirs:
-
-            label = label_dir.name
-            log.info("Scanning %s" % (label))
+    for label, _ in label_files_training:
+        if label not in label_to_id:
+            new_label_id = current_id
+            label_to_id[label] = new_label_id
+            current_id += 1
 
-            samples_for_label = list()
+    # Read training and test files in one batch so that the pool is kept busy.
+    all_label_files = label_files_training + label_files_test
+    all_files = [f for _, files in all_label_files for f in files]
+    if lazy:
+        all_text = all_files  # Files are read when accessed
+    elif return_corpus:
+        corpus = read_text_files_to_corpus(all_files, errors=errors, num_workers=num_workers,
+                                           use_process_pool=use_process_pool)
+        all_text = range(len(all_files))  # Samples refer to documents in corpus
+    else:
+        all_text = read_text_files(all_files, errors=errors, num_workers=num_workers,
+                                   use_process_pool=use_process_pool)
 
-            # Process files for the label
-            for input_file in label_dir.glob("*"):
-                with open(input_file, "r", errors=errors) as f:
-                    text = f.read()  # Change this if you are reading a very large text file.
-                    sample = (text, label)
-                    samples_for_label.append(sample)
+    all_training_samples = list()
+    all_test_samples = list()
 
-            if i == 0: # if training
-                if label not in label_to_id:
-                    new_label_id = current_id
-                    label_to_id[label] = new_label_id
-                    current_id += 1
+    i = 0
+    for j, (label, files) in enumerate(all_label_files):
 
-            # Change label string to ID in dataset
-            samples = [(s[0], label_to_id[s[1]]) for s in samples_for_label]
+        # Change label string to ID in dataset
+        samples = [(text, label_to_id[label]) for text in all_text[i:i + len(files)]]
+        i += len(files)
 
-            if i == 0:
-                all_training_samples += samples
-            else:
-                all_test_samples += samples
+        if j < len(label_files_training):
+            all_training_samples += samples
+        else:
+            all_test_samples += samples
 
     id_to_label = {id: label for label, id in label_to_id.items()}
 
@@ -279,4 +602,148 @@ def load_text_and_label_id_from_training_and_test_dirs(root_training_dir, root_t
     y_train_np = np.array(y_train)
     y_test_np = np.array(y_test)
 
-    return (x_train, y_train_np), (x_test, y_test_np), (label_to_id, id_to_label)
\ No newline at end of file
+    if lazy:
+        x_train = LazyDocumentList(x_train, y_train_np, errors=errors, cache_size=cache_size)
+        x_test = LazyDocumentList(x_test, y_test_np, errors=errors, cache_size=cache_size)
+    elif return_corpus:
+        x_train = _select_from_corpus(corpus, x_train, y_train_np)
+        x_test = _select_from_corpus(corpus, x_test, y_test_np)
+
+    return (x_train, y_train_np), (x_test, y_test_np), (label_to_id, id_to_label)
+
+def _stream_samples(file_and_label_id_list, errors=None, batch_size=None):
+    """
+    Generator to read files one at a time and yield text with the label ID.
+
+    Parameters
+    ----------
+    file_and_label_id_list: list of tuple
+        List of (file, label ID)
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    batch_size: int
+        If specified, yield batches of samples instead of each sample.
+
+    Yields
+    ------
+    (text, label_id): tuple
+        Text in string and label ID in int if batch_size is None.
+        Otherwise, list of text in string and the ndarray of label IDs in int with up to batch_size elements.
+    """
+    if batch_size is None:
+        for input_file, label_id in file_and_label_id_list:
+            text, _ = _read_text_file(input_file, errors=errors)
+            yield text, label_id
+    else:
+        for i in range(0, len(file_and_label_id_list), batch_size):
+            batch = file_and_label_id_list[i:i + batch_size]
+            text_list = [_read_text_file(input_file, errors=errors)[0] for input_file, _ in batch]
+            label_ids = np.array([label_id for _, label_id in batch])
+            yield text_list, label_ids
+
+
+def stream_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2, errors=None, batch_size=None):
+    """
+    Stream text from files under label directories without loading the whole corpus in memory.
+    Only file paths are kept in memory. Text is read when the generator is advanced.
+    Samples and the split are the same as load_text_and_label_id_from_files.
+
+    Parameters
+    ----------
+    root_dir: pathlib.Path
+        Parent directory of labeled directories, each of which contains text files
+    test_dataset_ratio: float
+        Ratio of test dataset to split the data into training dataset and test dataset
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    batch_size: int
+        If specified, generators yield (list of text, ndarray of label IDs) with up to batch_size elements.
+
+    Returns
+    -------
+    (training_stream, test_stream): tuple of generator
+        Generators yielding (text, label_id) for training dataset and test dataset.
+    (label_to_id, id_to_label): tuple of dictionary
+        label_to_id contains label to ID mapping.  id_to_label contains ID to label mapping.
+
+    Raises
+    ------
+    ValueError
+        If root_dir does not exist.
+    """
+
+    label_to_id = dict()
+    current_id = 0
+
+    label_files = _select_label_files(_list_label_files(root_dir), test_dataset_ratio)
+
+    training_files = list()
+    test_files = list()
+
+    for label, files, num_training_samples in label_files:
+
+        if label not in label_to_id:
+            new_label_id = current_id
+            label_to_id[label] = new_label_id
+            current_id += 1
+
+        training_files += [(f, label_to_id[label]) for f in files[:num_training_samples]]
+        test_files += [(f, label_to_id[label]) for f in files[num_training_samples:]]
+
+    id_to_label = {id: label for label, id in label_to_id.items()}
+
+    training_stream = _stream_samples(training_files, errors=errors, batch_size=batch_size)
+    test_stream = _stream_samples(test_files, errors=errors, batch_size=batch_size)
+
+    return (training_stream, test_stream), (label_to_id, id_to_label)
+
+def stream_text_and_label_id_from_training_and_test_dirs(root_training_dir, root_test_dir, errors=None,
+                                                         batch_size=None):
+    """
+    Stream text from files under training and test label directories without loading the whole corpus in memory.
+    Samples are the same as load_text_and_label_id_from_training_and_test_dirs.
+
+    Parameters
+    ----------
+    root_training_dir: pathlib.Path
+        Parent directory of labeled directories containing training dataset, each of which contains text files
+    root_test_dir: pathlib.Path
+        Parent directory of labeled directories containing test dataset, each of which contains text files
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    batch_size: int
+        If specified, generators yield (list of text, ndarray of label IDs) with up to batch_size elements.
+
+    Returns
+    -------
+    (training_stream, test_stream): tuple of generator
+        Generators yielding (text, label_id) for training dataset and test dataset.
+    (label_to_id, id_to_label): tuple of dictionary
+        label_to_id contains label to ID mapping.  id_to_label contains ID to label mapping.
+
+    Raises
+    ------
+    ValueError
+        If root_dir does not exist.
+    """
+
+    label_to_id = dict()
+    current_id = 0
+
+    label_files_training, label_files_test = _list_label_files_for_training_and_test(root_training_dir, root_test_dir)
+
+    for label, _ in label_files_training:
+        if label not in label_to_id:
+            new_label_id = current_id
+            label_to_id[label] = new_label_id
+            current_id += 1
+
+    training_files = [(f, label_to_id[label]) for label, files in label_files_training for f in files]
+    test_files = [(f, label_to_id[label]) for label, files in label_files_test for f in files]
+
+    id_to_label = {id: label for label, id in label_to_id.items()}
+
+    training_stream = _stream_samples(training_files, errors=errors, batch_size=batch_size)
+    test_stream = _stream_samples(test_files, errors=errors, batch_size=batch_size)
+
+    return (training_stream, test_stream), (label_to_id, id_to_label)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+"""
+Vocabulary of words and n-grams counted with bounded memory
+
+Documents are streamed one at a time, and n-grams up to a configurable order are counted in one dictionary
+together with words. When the dictionary grows beyond the memory budget, rare entries are pruned so that about
+half of the budget is used. A pruned n-gram restarts from 0 if it appears again, so the count of an entry is
+underestimated by at most the sum of the largest count removed in each pruning.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+
+import numpy as np
+
+from project.text_to_id import DEFAULT_FILTERS
+from project.text_to_id import iterate_ngram_lists
+from project.text_to_id import map_word_count_to_vocabulary
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+class PrunedCounter():
+    """
+    Counter which removes rare entries when it grows beyond a maximum size.
+    """
+
+    def __init__(self, max_size):
+        """
+        Initialize a counter.
+
+        Parameters
+        ----------
+        max_size: int
+            Maximum number of entries to keep.
+
+        Raises
+        ------
+        ValueError
+            If max_size is less than 2.
+        """
+        if max_size < 2:
+            raise ValueError("max_size needs to be 2 or greater.")
+
+        self.max_size = max_size
+        self.counts = dict()
+        self.error_bound = 0  # Maximum underestimation of counts
+        self.num_prunes = 0
+
+    def __len__(self):
+        return len(self.counts)
+
+    def update(self, ngram_list):
+        """
+        Count n-grams in a document, and prune rare entries if the counter is too large.
+
+        Parameters
+        ----------
+        ngram_list: list of str
+            N-grams
+        """
+        counts = self.counts
+        for g in ngram_list:
+            counts[g] = counts.get(g, 0) + 1
+
+        if len(counts) > self.max_size:
+            self.prune()
+
+    def prune(self):
+        """
+        Remove entries with small counts until half of max_size entries remain. Entries tied at the smallest
+        remaining count are kept in the order of first occurrence.
+        """
+        counts = self.counts
+        keep = self.max_size // 2
+
+        values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+        threshold = int(np.partition(values, len(values) - keep)[len(values) - keep])  # keep-th largest count
+        num_ties = keep - int(np.sum(values > threshold))  # Number of entries to keep at threshold
+
+        self.counts = dict()  # Keeps the order of first occurrence
+        max_pruned_count = 0
+        for g, c in counts.items():
+            if c > threshold:
+                self.counts[g] = c
+            elif c == threshold and num_ties > 0:
+                self.counts[g] = c
+                num_ties -= 1
+            elif c > max_pruned_count:
+                max_pruned_count = c
+
+        self.error_bound += max_pruned_count
+        self.num_prunes += 1
+
+        log.debug("Pruned %d entries with count up to %d" % (len(counts) - len(self.counts), max_pruned_count))
+
+
+def build_ngram_vocabulary(text_list, top_vocabulary_size, max_order=2, max_size=1000000, filters=DEFAULT_FILTERS,
+                           separator_list=None, num_workers=None, chunk_size=1000):
+    """
+    Build a combined vocabulary of words and n-grams from text. Returns the same values as
+    map_word_list_to_vocabulary, and word_to_id can be passed to map_text_to_token_matrix with
+    max_ngram_order set to max_order.
+
+    Parameters
+    ----------
+    text_list: iterable of str or Corpus
+        Text
+    top_vocabulary_size: int
+        Size of top vocabulary including n-grams
+    max_order: int
+        Maximum number of words in an n-gram.
+    max_size: int
+        Maximum number of words and n-grams to count at a time. Memory use is proportional to this.
+    filters: string
+        A string specifying characters to remove.  Each character will be removed from output.
+    separator_list: list of strings
+        A list of strings containing one or more separators
+        if not specified, ["\n", " "] will be used.
+    num_workers: int
+        Number of worker processes to tokenize text. If None or 1, text is tokenized in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+
+    Returns
+    -------
+    vocabulary: list
+        Words and n-grams in the descending order of count
+    vocabulary_size: int
+        Number of words and n-grams counted
+    top_vocabulary: list
+        Top vocabulary list
+    top_vocabulary_size: int
+        Size of the top vocabulary
+    reserved_word_size: int
+        Size of reserved word list
+    word_to_id: dict
+        Word and n-gram to id to top vocabulary mapping
+    id_to_word: dict
+        Index to top vocabulary to word and n-gram mapping
+
+    Raises
+    ------
+    ValueError
+        If max_size is less than 2.
+    """
+    counter = PrunedCounter(max_size)
+
+    ngram_lists = iterate_ngram_lists(text_list, max_order=max_order, filters=filters, separator_list=separator_list,
+                                      num_workers=num_workers, chunk_size=chunk_size)
+    for ngram_list in ngram_lists:
+        counter.update(ngram_list)
+
+    if counter.num_prunes > 0:
+        log.info("Pruned %d times. Counts are underestimated by at most %d" % (counter.num_prunes,
+                                                                               counter.error_bound))
+
+    return map_word_count_to_vocabulary(counter.counts, top_vocabulary_size)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+"""
+Deterministic training/test split saved as a manifest
+
+Files of each label are ordered by a hash of their relative path and a seed, and the last ones in that order
+become the test dataset. Unlike the split in load_text_and_label_id_from_files, the result does not depend on
+the order the file system lists files in, so the same split is produced on every machine. Labels are assigned
+IDs in the sorted order of label names for the same reason.
+
+A split is a dictionary which can be saved to a gzip-compressed JSON file:
+    seed: Seed of the hash
+    test_dataset_ratio: Ratio of test dataset
+    label_to_id: Label to ID mapping
+    training: List of [label, file name] in training dataset
+    test: List of [label, file name] in test dataset
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import gzip
+import json
+import hashlib
+
+import numpy as np
+
+from project.directory_scanner import scan_label_dirs
+from project.load_text_data import read_text_files
+from project.load_text_data import compute_num_training_samples
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+SPLIT_VERSION = 1
+
+
+def _hash_file_name(label, file_name, seed):
+    """
+    Compute a stable hash of a file.
+
+    Parameters
+    ----------
+    label: str
+        Label of the file
+    file_name: str
+        Name of the file
+    seed: int
+        Seed of the hash
+
+    Returns
+    -------
+    h: bytes
+        Hash which does not depend on the platform or the Python process.
+    """
+    return hashlib.md5(("%d/%s/%s" % (seed, label, file_name)).encode("utf-8", errors="surrogateescape")).digest()
+
+
+def create_split(label_file_names, test_dataset_ratio=0.2, seed=0):
+    """
+    Split files into training and test dataset deterministically.
+
+    Parameters
+    ----------
+    label_file_names: list of tuple
+        List of (label, list of file names)
+    test_dataset_ratio: float
+        Ratio of test dataset to split the data into training dataset and test dataset
+    seed: int
+        Seed of the hash. Use a different seed to get a different split.
+
+    Returns
+    -------
+    split: dict
+        Split
+    """
+    training = list()
+    test = list()
+    labels = list()
+
+    for label, file_names in sorted(label_file_names, key=lambda x: x[0]):
+        num_training_samples = compute_num_training_samples(len(file_names), test_dataset_ratio)
+        if num_training_samples is None:
+            log.info("Label %s contain only 1 sample and cannot be split to training and test dataset. Skipping." %
+                     (label))
+            continue
+
+        labels.append(label)
+        ordered = sorted(file_names, key=lambda f: _hash_file_name(label, f, seed))
+        training += [[label, f] for f in ordered[:num_training_samples]]
+        test += [[label, f] for f in ordered[num_training_samples:]]
+
+    return {"version": SPLIT_VERSION,
+            "seed": seed,
+            "test_dataset_ratio": test_dataset_ratio,
+            "label_to_id": {label: i for i, label in enumerate(labels)},
+            "training": training,
+            "test": test}
+
+
+def create_split_from_dir(root_dir, test_dataset_ratio=0.2, seed=0):
+    """
+    Split files under label directories into training and test dataset deterministically. No file is read.
+
+    Parameters
+    ----------
+    root_dir: pathlib.Path
+        Parent directory of labeled directories, each of which contains text files
+    test_dataset_ratio: float
+        Ratio of test dataset to split the data into training dataset and test dataset
+    seed: int
+        Seed of the hash. Use a different seed to get a different split.
+
+    Returns
+    -------
+    split: dict
+        Split
+
+    Raises
+    ------
+    ValueError
+        If root_dir does not exist.
+    """
+    label_file_names = [(label, [e.path.name for e in file_entries])
+                        for label, file_entries in scan_label_dirs(root_dir)]
+
+    return create_split(label_file_names, test_dataset_ratio=test_dataset_ratio, seed=seed)
+
+
+def compute_split_digest(split):
+    """
+    Compute a digest of a split. Use this as a key of caches of features computed from the split.
+
+    Parameters
+    ----------
+    split: dict
+        Split
+
+    Returns
+    -------
+    digest: str
+        Hex digest of the split.
+    """
+    s = json.dumps(split, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(s.encode("utf-8", errors="surrogateescape")).hexdigest()
+
+
+def save_split_manifest(path, split):
+    """
+    Save a split to a gzip-compressed JSON file.
+
+    Parameters
+    ----------
+    path: pathlib.Path
+        Path to the manifest file
+    split: dict
+        Split
+    """
+    with gzip.open(path, "wt", encoding="utf-8", errors="surrogateescape") as f:
+        json.dump(split, f, separators=(",", ":"))
+
+
+def load_split_manifest(path):
+    """
+    Load a split from a manifest file.
+
+    Parameters
+    ----------
+    path: pathlib.Path
+        Path to the manifest file
+
+    Returns
+    -------
+    split: dict
+        Split
+
+    Raises
+    ------
+    ValueError
+        If path does not exist or the manifest version is not supported.
+    """
+    if path.exists() is False:
+        log.fatal("%s does not exist." % (path))
+        raise ValueError("%s does not exist." % (path))
+
+    with gzip.open(path, "rt", encoding="utf-8", errors="surrogateescape") as f:
+        split = json.load(f)
+
+    if split["version"] != SPLIT_VERSION:
+        raise ValueError("Unsupported split manifest version %d." % (split["version"]))
+
+    return split
+
+
+def load_text_and_label_id_from_split(root_dir, split, errors=None, num_workers=None, use_process_pool=False):
+    """
+    Load text from files under label directories according to a split.
+
+    Parameters
+    ----------
+    root_dir: pathlib.Path
+        Parent directory of labeled directories, each of which contains text files
+    split: dict
+        Split
+    errors: str
+        Set to 'ignore' if you want to ignore a byte that cannot be decoded.
+    num_workers: int
+        Number of workers to read files concurrently. If None or 1, files are read serially.
+    use_process_pool: bool
+        Use a process pool instead of a thread pool to read files.
+
+    Returns
+    -------
+    (x_train, y_train): tuple of list
+        x_train contains the list of text in string. y_train contains the ndarray of label IDs in int.
+    (x_test, y_test): tuple of list
+        x_test contains the list of text in string. y_test contains the ndarray of label IDs in int.
+    (label_to_id, id_to_label): tuple of dictionary
+        label_to_id contains label to ID mapping.  id_to_label contains ID to label mapping.
+    """
+    label_to_id = split["label_to_id"]
+    id_to_label = {id: label for label, id in label_to_id.items()}
+
+    entries = split["training"] + split["test"]
+    all_text = read_text_files([root_dir / label / file_name for label, file_name in entries], errors=errors,
+                               num_workers=num_workers, use_process_pool=use_process_pool)
+
+    num_training_samples = len(split["training"])
+    x_train = tuple(all_text[:num_training_samples])
+    x_test = tuple(all_text[num_training_samples:])
+    y_train = np.array([label_to_id[label] for label, _ in split["training"]])
+    y_test = np.array([label_to_id[label] for label, _ in split["test"]])
+
+    return (x_train, y_train), (x_test, y_test), (label_to_id, id_to_label)
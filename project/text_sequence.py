@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""
+Feed batches of word IDs encoded from text to Keras
+
+Text is tokenized, mapped to word IDs and padded one batch at a time, so the matrix of the whole dataset is never
+built. Background threads encode the batches following the one requested. Shuffling permutes an index array
+once per epoch, and batches are taken from the original text list or Corpus without copying it.
+
+Batches can be requested from multiple threads. Call close or use the sequence as a context manager to stop the
+background threads.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import math
+import threading
+import concurrent.futures
+
+import numpy as np
+import keras
+
+from project.text_to_id import RESERVED_WORD_LIST
+from project.text_to_id import DEFAULT_FILTERS
+from project.text_to_id import iterate_word_lists
+from project.text_to_id import map_word_lists_to_ragged_word_id
+from project.text_to_id import pad_ragged_word_id
+from project.corpus import Corpus
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+class TextSequence(keras.utils.Sequence):
+    """
+    Sequence of (x, y) batches where x is an int32 matrix of padded word IDs.
+    """
+
+    def __init__(self, text_list, label_ids, word_to_id, maxlen, batch_size=32, num_labels=None, shuffle=True,
+                 padding="pre", truncating="pre", num_prefetch_batches=2, num_workers=2, seed=None,
+                 filters=DEFAULT_FILTERS, separator_list=None):
+        """
+        Initialize a sequence.
+
+        Parameters
+        ----------
+        text_list: list of str or Corpus
+            List of text. A LazyDocumentList can also be used.
+        label_ids: ndarray
+            Label ID of each text. If None, labels of the Corpus are used.
+        word_to_id: dict
+            Word to id to top vocabulary mapping including RESERVED_WORD_LIST. A MappedVocabulary can also be used.
+        maxlen: int
+            Number of words per text
+        batch_size: int
+            Number of text in a batch
+        num_labels: int
+            If specified, y is a float32 one-hot matrix. Otherwise, y is an int32 vector of label IDs.
+        shuffle: bool
+            Shuffle the order of text at the end of each epoch.
+        padding: str
+            'pre' to pad before the word IDs or 'post' to pad after them.
+        truncating: str
+            'pre' to remove words at the beginning of text longer than maxlen or 'post' to remove them at the end.
+        num_prefetch_batches: int
+            Number of batches to encode in advance. 0 disables prefetching.
+        num_workers: int
+            Number of threads to encode batches in advance.
+        seed: int
+            Seed of the shuffle
+        filters: string
+            A string specifying characters to remove.  Each character will be removed from output.
+        separator_list: list of strings
+            A list of strings containing one or more separators
+            if not specified, ["\n", " "] will be used.
+
+        Raises
+        ------
+        ValueError
+            If no label is specified, or padding or truncating is neither 'pre' nor 'post'.
+        """
+        super().__init__()
+
+        if label_ids is None:
+            if isinstance(text_list, Corpus) is False or text_list.labels is None:
+                raise ValueError("label_ids needs to be specified unless text_list is a labeled Corpus.")
+            label_ids = text_list.labels
+
+        if padding not in ("pre", "post"):
+            raise ValueError("Invalid padding: %s" % (padding))
+        if truncating not in ("pre", "post"):
+            raise ValueError("Invalid truncating: %s" % (truncating))
+
+        self.text_list = text_list
+        self.label_ids = np.asarray(label_ids, dtype=np.int32)
+        self.word_to_id = word_to_id
+        self.pad_id = word_to_id[RESERVED_WORD_LIST[2]]  # <PAD>
+        self.maxlen = maxlen
+        self.batch_size = batch_size
+        self.num_labels = num_labels
+        self.shuffle = shuffle
+        self.padding = padding
+        self.truncating = truncating
+        self.num_prefetch_batches = num_prefetch_batches
+        self.filters = filters
+        self.separator_list = separator_list
+
+        self.random = np.random.RandomState(seed)
+        self.order = np.arange(len(self.label_ids))
+        if shuffle:
+            self.random.shuffle(self.order)
+
+        self.executor = None
+        if num_prefetch_batches > 0:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=num_workers)
+        self.futures = dict()
+        self.lock = threading.Lock()  # Guards executor and futures
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        executor = getattr(self, "executor", None)  # Not set if __init__ raised
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __len__(self):
+        return math.ceil(len(self.order) / self.batch_size)
+
+    def _get_text_batch(self, indices):
+        """
+        Get text for indices without copying the whole text list.
+
+        Parameters
+        ----------
+        indices: ndarray
+            Indices of text
+
+        Returns
+        -------
+        text_batch: list of str or Corpus
+            Text of the batch. A Corpus sharing the buffer if text_list is a Corpus.
+        """
+        if isinstance(self.text_list, Corpus):
+            return self.text_list[indices]
+
+        return [self.text_list[i] for i in indices]
+
+    def encode(self, indices):
+        """
+        Encode a batch.
+
+        Parameters
+        ----------
+        indices: ndarray
+            Indices of text in the batch
+
+        Returns
+        -------
+        x: ndarray
+            int32 matrix of word IDs with the shape (number of text in the batch, maxlen)
+        y: ndarray
+            int32 vector of label IDs, or float32 one-hot matrix if num_labels is specified.
+        """
+        word_lists = iterate_word_lists(self._get_text_batch(indices), filters=self.filters,
+                                        separator_list=self.separator_list)
+        values, offsets = map_word_lists_to_ragged_word_id(word_lists, self.word_to_id)
+        x = pad_ragged_word_id(values, offsets, self.maxlen, self.pad_id, padding=self.padding,
+                               truncating=self.truncating)
+
+        y = self.label_ids[indices]
+        if self.num_labels is not None:
+            y_one_hot = np.zeros((len(y), self.num_labels), dtype=np.float32)
+            y_one_hot[np.arange(len(y)), y] = 1.0
+            y = y_one_hot
+
+        return x, y
+
+    def _get_indices(self, index):
+        return self.order[index * self.batch_size:(index + 1) * self.batch_size]
+
+    def __getitem__(self, index):
+        """
+        Get a batch. Batches following it are encoded in the background.
+
+        Parameters
+        ----------
+        index: int
+            Index of the batch
+
+        Returns
+        -------
+        (x, y): tuple of ndarray
+            Batch
+        """
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("Batch index %d is out of range." % (index))
+
+        with self.lock:
+            if self.executor is not None:
+                for i in range(index, min(index + self.num_prefetch_batches + 1, len(self))):
+                    if i not in self.futures:
+                        self.futures[i] = self.executor.submit(self.encode, self._get_indices(i))
+
+                # Drop batches skipped by random access
+                for i in [i for i in self.futures if i < index]:
+                    self.futures.pop(i).cancel()
+
+                future = self.futures.pop(index)
+            else:
+                future = None
+
+        if future is not None:
+            try:
+                return future.result()  # Wait without holding the lock
+            except concurrent.futures.CancelledError:  # Cancelled by close in another thread
+                pass
+
+        return self.encode(self._get_indices(index))
+
+    def on_epoch_end(self):
+        """
+        Shuffle the order of text for the next epoch. Only the index array is permuted.
+        """
+        if self.shuffle is False:
+            return
+
+        with self.lock:
+            for future in self.futures.values():  # Encoded in the old order
+                future.cancel()
+            self.futures = dict()
+
+            self.order = self.order.copy()  # Batches being encoded keep the old order
+            self.random.shuffle(self.order)
+
+    def close(self):
+        """
+        Stop the background threads. Batches requested after this are encoded in the calling thread.
+        """
+        with self.lock:
+            executor = self.executor
+            self.executor = None
+            self.futures = dict()
+
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -13,10 +13,10 @@ import logging
 import re
 
 import numpy as np
-import keras
 from gensim.models.word2vec import Word2Vec
 
-from project.text_to_id import map_text_to_word_list
+from project.text_to_id import iterate_word_lists
+from project.text_to_id import map_label_list_to_label_id
 
 log = logging.getLogger(__name__)
 logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
@@ -24,7 +24,8 @@ logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd
 RESERVED_WORD_LIST = ["<UNK>", "<EOS>", "<PAD>"]
 MODEL_PATH = "/tmp/tp/word2vec_example.model"
 
-def map_text_list_to_embedding(text_list, label_for_text_list, num_labels, label_to_id):
+def map_text_list_to_embedding(text_list, label_for_text_list, num_labels, label_to_id, num_workers=None,
+                               chunk_size=1000, one_hot_labels=True):
     """
 
     Parameters
@@ -37,6 +38,12 @@ def map_text_list_to_embedding(text_list, label_for_text_list, num_labels, label
         Number of labels
     label_to_id: dict
         Label to integer id mapping
+    num_workers: int
+        Number of worker processes to tokenize text. If None or 1, text is tokenized in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+    one_hot_labels: bool
+        Return y as a float32 one-hot matrix. If False, y is an int32 vector of label IDs.
 
     Returns
     -------
@@ -50,13 +57,13 @@ def map_text_list_to_embedding(text_list, label_for_text_list, num_labels, label
     model = Word2Vec.load(MODEL_PATH)
     missing_words = set()
     x_list = list()
-    y_list = list()
+    label_list = list()
 
     total_found_in_dict = 0
     total_not_in_dict = 0
-    for i, text in enumerate(text_list):
+    word_lists = iterate_word_lists(text_list, num_workers=num_workers, chunk_size=chunk_size)
+    for i, words_in_text in enumerate(word_lists):
         log.debug("Processing post: [%d]" % (i + 1))
-        words_in_text = map_text_to_word_list(text)
 
         word_v_list = list()
         for w in words_in_text:
@@ -75,11 +82,6 @@ def map_text_list_to_embedding(text_list, label_for_text_list, num_labels, label
             # log.warning("Did not find any words in vocabulary.  Skipping the text.")
             continue
 
-        # For now, do not change non-zero element to 1.
-        label_id = label_to_id[label_for_text_list[i]]
-        label_id = keras.utils.to_categorical(label_id, num_labels).astype(np.float32)
-        label_id = label_id.reshape(1, num_labels)
-
         # Squish word_id_list
         word_v_np = np.array(word_v_list)
         word_count = word_v_np.shape[0]
@@ -92,11 +94,11 @@ def map_text_list_to_embedding(text_list, label_for_text_list, num_labels, label
         x_list.append(word_v_mean)
 #        x_list.append(word_v_sum)
 
-        y_list.append(label_id)
+        label_list.append(label_for_text_list[i])
 
     x = np.array(x_list)
     print(x.shape)
-    y = np.concatenate(y_list)
+    y = map_label_list_to_label_id(label_list, num_labels, label_to_id, one_hot=one_hot_labels)
 
     assert x.shape[0] == y.shape[0]
 
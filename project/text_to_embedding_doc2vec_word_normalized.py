@@ -13,10 +13,10 @@ import logging
 import re
 
 import numpy as np
-import keras
 from gensim.models.doc2vec import Doc2Vec
 
 from project.text_to_id import map_text_to_word_list
+from project.text_to_id import map_label_list_to_label_id
 from project.normalize_words import normalize_words
 
 log = logging.getLogger(__name__)
@@ -25,7 +25,7 @@ logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd
 RESERVED_WORD_LIST = ["<UNK>", "<EOS>", "<PAD>"]
 MODEL_FILE = "/tmp/tp/doc2vec_newsgroup.model"
 
-def map_text_list_to_embedding(text_list, label_for_text_list, num_labels, label_to_id):
+def map_text_list_to_embedding(text_list, label_for_text_list, num_labels, label_to_id, one_hot_labels=True):
     """
 
     Parameters
@@ -38,6 +38,8 @@ def map_text_list_to_embedding(text_list, label_for_text_list, num_labels, label
         Number of labels
     label_to_id: dict
         Label to integer id mapping
+    one_hot_labels: bool
+        Return y as a float32 one-hot matrix. If False, y is an int32 vector of label IDs.
 
     Returns
     -------
@@ -49,7 +51,6 @@ def map_text_list_to_embedding(text_list, label_for_text_list, num_labels, label
     model = Doc2Vec.load(MODEL_FILE)
 
     x_list = list()
-    y_list = list()
 
     for i, text in enumerate(text_list):
         log.debug("Processing post: [%d]" % (i + 1))
@@ -57,16 +58,10 @@ def map_text_list_to_embedding(text_list, label_for_text_list, num_labels, label
 
         v = model.infer_vector(word_list)
 
-        # For now, do not change non-zero element to 1.
-        label_id = label_to_id[label_for_text_list[i]]
-        label_id = keras.utils.to_categorical(label_id, num_labels).astype(np.float32)
-        label_id = label_id.reshape(1, num_labels)
-
         x_list.append(v)
-        y_list.append(label_id)
 
     x = np.array(x_list)
     print(x.shape)
-    y = np.concatenate(y_list)
+    y = map_label_list_to_label_id(label_for_text_list, num_labels, label_to_id, one_hot=one_hot_labels)
 
     return x, y
\ No newline at end of file
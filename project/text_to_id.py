@@ -11,15 +11,25 @@ __email__ = "hideyuki@gmail.com"
 import os
 import logging
 import re
+import functools
+import zlib
+import collections
+import concurrent.futures
 
 import numpy as np
+import scipy.sparse
 import keras
 
+from project.corpus import Corpus
+
 
 log = logging.getLogger(__name__)
 logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
 
 RESERVED_WORD_LIST = ["<UNK>", "<EOS>", "<PAD>"]
+DEFAULT_FILTERS = '!"#$%&()*+,-./:;<=>?@[]^_`{|}~\''
+RE_SPECIAL_CHARACTERS = "-.*+?^$|[]()\\{}"
+NGRAM_SEPARATOR = " "  # Not in words split by the default separators
 
 def map_label_to_id(labels):
     """
@@ -45,13 +55,366 @@ def map_label_to_id(labels):
 
     return label_to_id, id_to_label
 
-def map_text_list_to_word_list(text_list, filters='!"#$%&()*+,-./:;<=>?@[]^_`{|}~\'', separator_list=None):
+class Tokenizer():
+    """
+    Tokenizer to convert text to word list.
+    Separators and filters are compiled once so that the same tokenizer can be applied to many documents.
+    Output is the same as map_text_to_word_list.
+    """
+
+    def __init__(self, filters=DEFAULT_FILTERS, separator_list=None):
+        """
+        Initialize a tokenizer.
+
+        Parameters
+        ----------
+        filters: string
+            A string specifying characters to remove.  Each character will be removed from output.
+
+        separator_list: list of strings
+            A list of strings containing one or more separators
+            if not specified, ["\n", " "] will be used.
+        """
+        if separator_list is None:
+            separator_list = ["\n", " "]
+
+        self.filters = filters
+        self.separator_list = list(separator_list)
+        self.first_separator = separator_list[0]
+
+        # Separators other than the first one are replaced with the first one.
+        # Single character separators are replaced at once with a translate table.
+        other_separators = separator_list[1:]
+        if all([len(sep) == 1 for sep in other_separators]):
+            self.separator_table = str.maketrans({sep: self.first_separator for sep in other_separators})
+            self.multi_char_separators = None
+        else:
+            self.separator_table = None
+            self.multi_char_separators = other_separators
+
+        # Replace multiple separators with 1 separator
+        if len(self.first_separator) == 1 and self.first_separator not in RE_SPECIAL_CHARACTERS:
+            # Only runs of 2 or more need replacing. A literal prefix is also faster to search for.
+            self.separator_reg = re.compile(self.first_separator * 2 + "+")
+        else:
+            self.separator_reg = re.compile(self.first_separator + "+")
+
+        # Characters to remove. This matches the character class map_text_to_word_list builds by joining
+        # filter characters with "|", which also removes "|" if there is more than one filter character.
+        filter_chars = set(filters)
+        if len(filters) > 1:
+            filter_chars.add("|")
+        self.filter_table = str.maketrans({c: None for c in filter_chars})
+
+        # Byte-level equivalents. Bytes of ASCII characters never appear inside a multi-byte UTF-8 sequence,
+        # so UTF-8 encoded text can be processed without decoding if all separators and filters are ASCII.
+        self.supports_bytes = all([c.isascii() for c in filter_chars]) and \
+                              all([sep.isascii() for sep in separator_list])
+        if self.supports_bytes:
+            self.first_separator_bytes = self.first_separator.encode("ascii")
+            if self.separator_table is not None and len(self.first_separator) == 1:
+                self.separator_table_bytes = bytes.maketrans("".join(other_separators).encode("ascii"),
+                                                             self.first_separator_bytes * len(other_separators))
+            else:
+                self.separator_table_bytes = None
+            self.multi_char_separators_bytes = [sep.encode("ascii") for sep in other_separators]
+            self.separator_reg_bytes = re.compile(self.separator_reg.pattern.encode("ascii"))
+            self.filter_bytes = "".join(sorted(filter_chars)).encode("ascii")
+
+    def tokenize(self, text):
+        """
+        Convert text to word list
+
+        Parameters
+        ----------
+        text: str
+            Text
+
+        Returns
+        -------
+        word: list of str
+            List of words
+        """
+        if self.separator_table is not None:
+            text = text.translate(self.separator_table)
+        else:
+            for s in self.multi_char_separators:
+                text = text.replace(s, self.first_separator)
+
+        text = self.separator_reg.sub(self.first_separator, text)
+        text = text.translate(self.filter_table)
+
+        return text.split(self.first_separator)
+
+    def tokenize_bytes(self, b, decode=True, errors="strict"):
+        """
+        Convert UTF-8 encoded text to word list without decoding the whole text.
+        Separators and filters are applied to bytes, and only the remaining words are decoded.
+        The result is the same as tokenize(b.decode("utf-8")) for valid UTF-8.
+
+        Parameters
+        ----------
+        b: bytes, memoryview or ndarray of uint8
+            UTF-8 encoded text
+        decode: bool
+            Decode words to str. If False, words are returned as bytes.
+        errors: str
+            Error handling scheme for decoding words.
+
+        Returns
+        -------
+        word: list of str or list of bytes
+            List of words
+        """
+        if isinstance(b, bytes) is False:
+            b = bytes(b)
+
+        if self.supports_bytes is False:  # Non-ASCII separators or filters need decoding
+            word_list = self.tokenize(b.decode("utf-8", errors=errors))
+            if decode:
+                return word_list
+            return [w.encode("utf-8", errors="surrogatepass") for w in word_list]
+
+        if self.separator_table_bytes is not None:
+            b = b.translate(self.separator_table_bytes)
+        else:
+            for s in self.multi_char_separators_bytes:
+                b = b.replace(s, self.first_separator_bytes)
+
+        b = self.separator_reg_bytes.sub(self.first_separator_bytes, b)
+        b = b.translate(None, self.filter_bytes)
+
+        if decode:
+            # Only separators and words are left. Decoding them at once is faster than decoding each word.
+            return b.decode("utf-8", errors=errors).split(self.first_separator)
+
+        return b.split(self.first_separator_bytes)
+
+    def tokenize_bytes_batch(self, byte_list, decode=True, errors="strict"):
+        """
+        Convert each UTF-8 encoded text in a list to word list
+
+        Parameters
+        ----------
+        byte_list: list of bytes
+            List of UTF-8 encoded text
+        decode: bool
+            Decode words to str. If False, words are returned as bytes.
+        errors: str
+            Error handling scheme for decoding words.
+
+        Returns
+        -------
+        word_lists: list of list of str or list of list of bytes
+            List of words for each text
+        """
+        return [self.tokenize_bytes(b, decode=decode, errors=errors) for b in byte_list]
+
+    def tokenize_batch(self, text_list):
+        """
+        Convert each text in a list to word list
+
+        Parameters
+        ----------
+        text_list: list of str
+            List of text
+
+        Returns
+        -------
+        word_lists: list of list of str
+            List of words for each text
+        """
+        return [self.tokenize(text) for text in text_list]
+
+
+@functools.lru_cache(maxsize=16)
+def _get_tokenizer(filters, separators):
+    """
+    Get a tokenizer for the filters and separators. Tokenizers are cached.
+
+    Parameters
+    ----------
+    filters: string
+        A string specifying characters to remove.
+    separators: tuple of strings
+        Separators, or None to use the default.
+
+    Returns
+    -------
+    tokenizer: Tokenizer
+        Tokenizer
+    """
+    return Tokenizer(filters=filters, separator_list=list(separators) if separators is not None else None)
+
+
+def get_tokenizer(filters=DEFAULT_FILTERS, separator_list=None):
+    """
+    Get a tokenizer for the filters and separators. Tokenizers are cached.
+
+    Parameters
+    ----------
+    filters: string
+        A string specifying characters to remove.  Each character will be removed from output.
+
+    separator_list: list of strings
+        A list of strings containing one or more separators
+        if not specified, ["\n", " "] will be used.
+
+    Returns
+    -------
+    tokenizer: Tokenizer
+        Tokenizer
+    """
+    return _get_tokenizer(filters, tuple(separator_list) if separator_list is not None else None)
+
+
+def _tokenize_chunk(args):
+    """
+    Tokenize a chunk of text in a worker process.
+
+    Parameters
+    ----------
+    args: tuple
+        (filters, separators as tuple or None, list of text or Corpus)
+
+    Returns
+    -------
+    word_lists: list of list of str
+        List of words for each text
+    """
+    filters, separators, text_chunk = args
+    tokenizer = _get_tokenizer(filters, separators)
+
+    if isinstance(text_chunk, Corpus):
+        return [tokenizer.tokenize_bytes(text_chunk.get_bytes(i)) for i in range(len(text_chunk))]
+
+    return tokenizer.tokenize_batch(text_chunk)
+
+
+def _iterate_chunks(text_list, filters, separator_list, chunk_size):
+    """
+    Generator to split text into chunks to send to worker processes.
+
+    Parameters
+    ----------
+    text_list: list of str or Corpus
+        List of text
+    filters: string
+        A string specifying characters to remove.
+    separator_list: list of strings
+        Separators, or None to use the default.
+    chunk_size: int
+        Number of text in a chunk.
+
+    Yields
+    ------
+    args: tuple
+        (filters, separators as tuple or None, list of text or Corpus)
+    """
+    separators = tuple(separator_list) if separator_list is not None else None
+    is_corpus = isinstance(text_list, Corpus)
+
+    for i in range(0, len(text_list), chunk_size):
+        if is_corpus:  # Send only the bytes of the chunk instead of the whole buffer
+            yield filters, separators, text_list[i:i + chunk_size].compact()
+        else:
+            yield filters, separators, list(text_list[i:i + chunk_size])
+
+
+def iterate_word_lists(text_list, filters=DEFAULT_FILTERS, separator_list=None, num_workers=None, chunk_size=1000):
+    """
+    Generator to convert each text in a list to word list, optionally in a process pool.
+
+    Parameters
+    ----------
+    text_list: list of str or Corpus
+        List of text. Text in a Corpus is tokenized from its UTF-8 buffer without decoding whole documents.
+    filters: string
+        A string specifying characters to remove.  Each character will be removed from output.
+    separator_list: list of strings
+        A list of strings containing one or more separators
+        if not specified, ["\n", " "] will be used.
+    num_workers: int
+        Number of worker processes. If None or 1, text is tokenized in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+
+    Yields
+    ------
+    word_list: list of str
+        List of words for each text in the order of text_list.
+    """
+    is_corpus = isinstance(text_list, Corpus)
+
+    if num_workers is None or num_workers <= 1 or len(text_list) <= chunk_size:
+        tokenizer = get_tokenizer(filters=filters, separator_list=separator_list)
+        if is_corpus:
+            for i in range(len(text_list)):
+                yield tokenizer.tokenize_bytes(text_list.get_bytes(i))
+        else:
+            for text in text_list:
+                yield tokenizer.tokenize(text)
+        return
+
+    chunks = _iterate_chunks(text_list, filters, separator_list, chunk_size)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
+        for word_lists in executor.map(_tokenize_chunk, chunks):  # map preserves order
+            for word_list in word_lists:
+                yield word_list
+
+
+def tokenize_text_list(text_list, filters=DEFAULT_FILTERS, separator_list=None, num_workers=None, chunk_size=1000,
+                       flat=False):
+    """
+    Convert each text in a list to word list, optionally in a process pool.
+
+    Parameters
+    ----------
+    text_list: list of str or Corpus
+        List of text
+    filters: string
+        A string specifying characters to remove.  Each character will be removed from output.
+    separator_list: list of strings
+        A list of strings containing one or more separators
+        if not specified, ["\n", " "] will be used.
+    num_workers: int
+        Number of worker processes. If None or 1, text is tokenized in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+    flat: bool
+        Return all words in one list with offsets instead of a list for each text.
+
+    Returns
+    -------
+    word_lists: list of list of str
+        List of words for each text in the order of text_list if flat is False.
+    (word_list, offsets): tuple
+        If flat is True, word_list contains words of all text, and words of text i are
+        word_list[offsets[i]:offsets[i + 1]]. offsets is an int64 ndarray.
+    """
+    word_lists = iterate_word_lists(text_list, filters=filters, separator_list=separator_list,
+                                    num_workers=num_workers, chunk_size=chunk_size)
+    if flat is False:
+        return list(word_lists)
+
+    word_list = list()
+    offsets = np.zeros(len(text_list) + 1, dtype=np.int64)
+    for i, w in enumerate(word_lists):
+        word_list += w
+        offsets[i + 1] = len(word_list)
+
+    return word_list, offsets
+
+
+def map_text_list_to_word_list(text_list, filters=DEFAULT_FILTERS, separator_list=None, num_workers=None,
+                               chunk_size=1000):
     """
     Convert text to word list
 
     Parameters
     ----------
-    text: list of str
+    text: list of str or Corpus
         List of text
 
     filters: string
@@ -61,6 +424,12 @@ def map_text_list_to_word_list(text_list, filters='!"#$%&()*+,-./:;<=>?@[]^_`{|}
         A list of strings containing one or more separators
         if not specified, ["\n", " "] will be used.
 
+    num_workers: int
+        Number of worker processes to tokenize text. If None or 1, text is tokenized in the current process.
+
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+
     Returns
     -------
     word: list of str
@@ -69,13 +438,13 @@ def map_text_list_to_word_list(text_list, filters='!"#$%&()*+,-./:;<=>?@[]^_`{|}
 
     word_list = list()
 
-    for text in text_list:
-        w = map_text_to_word_list(text, filters=filters, separator_list=separator_list)
+    for w in iterate_word_lists(text_list, filters=filters, separator_list=separator_list, num_workers=num_workers,
+                                chunk_size=chunk_size):
         word_list += w
 
     return word_list
 
-def map_text_to_word_list(text, filters='!"#$%&()*+,-./:;<=>?@[]^_`{|}~\'', separator_list=None):
+def map_text_to_word_list(text, filters=DEFAULT_FILTERS, separator_list=None):
     """
     Convert text to word list
 
@@ -97,41 +466,66 @@ def map_text_to_word_list(text, filters='!"#$%&()*+,-./:;<=>?@[]^_`{|}~\'', sepa
         List of words
     """
 
-    re_special_characters="-.*+?^$|[]()\\" # This is a subset that requires escaping with \ for using in re.sub()
+    return get_tokenizer(filters=filters, separator_list=separator_list).tokenize(text)
 
-    filter_char_list = list(filters) # list of chars
-
-    escaped_filter_char_list = list()
-    for c in filter_char_list:
-        if c in re_special_characters:
-            c = "\\" + c
-        e = c
+def map_word_list_to_ngram_list(word_list, max_order=2):
+    """
+    Expand a word list to n-grams of all orders up to max_order.
 
-        escaped_filter_char_list.append(e)
+    Parameters
+    ----------
+    word_list: list of str
+        List of words
+    max_order: int
+        Maximum number of words in an n-gram.
 
-    adjusted_filter = "[" + "|".join(escaped_filter_char_list) + "]"
-    if separator_list is None:
-        separator_list = ["\n", " "]
+    Returns
+    -------
+    ngram_list: list of str
+        Words followed by bigrams, trigrams, etc. Words in an n-gram are joined by NGRAM_SEPARATOR.
+    """
+    ngram_list = list(word_list)
+    for n in range(2, max_order + 1):
+        ngram_list += [NGRAM_SEPARATOR.join(word_list[i:i + n]) for i in range(len(word_list) - n + 1)]
 
-    first_separator = separator_list[0]
+    return ngram_list
 
-    for i, s in enumerate(separator_list):
-        if i == 0: # skip replacing the first separator
-            continue
-        text = text.replace(s, first_separator)
 
-    # Replace multiple separators with 1 separator
-    exp = first_separator + "+"
-    reg = re.compile(exp)
-    text = reg.sub(first_separator, text)
+def iterate_ngram_lists(text_list, max_order=2, filters=DEFAULT_FILTERS, separator_list=None, num_workers=None,
+                        chunk_size=1000):
+    """
+    Generator to tokenize text and expand the words of each text to n-grams.
 
-    # Remove characters
-    reg = re.compile(adjusted_filter)
-    text = reg.sub("", text)
+    Parameters
+    ----------
+    text_list: iterable of str or Corpus
+        Text
+    max_order: int
+        Maximum number of words in an n-gram. 1 to yield words only.
+    filters: string
+        A string specifying characters to remove.  Each character will be removed from output.
+    separator_list: list of strings
+        A list of strings containing one or more separators
+        if not specified, ["\n", " "] will be used.
+    num_workers: int
+        Number of worker processes. If None or 1, text is tokenized in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+
+    Yields
+    ------
+    ngram_list: list of str
+        List of n-grams for each text in the order of text_list.
+    """
+    word_lists = iterate_word_lists(text_list, filters=filters, separator_list=separator_list,
+                                    num_workers=num_workers, chunk_size=chunk_size)
+    if max_order <= 1:
+        yield from word_lists
+        return
 
-    word_list = text.split(first_separator)
+    for word_list in word_lists:
+        yield map_word_list_to_ngram_list(word_list, max_order)
 
-    return word_list
 
 def map_word_list_to_vocabulary(word_list, top_vocabulary_size):
     """
@@ -163,13 +557,43 @@ def map_word_list_to_vocabulary(word_list, top_vocabulary_size):
         Index to top vocabulary to word mapping
     """
     # Count occurrence
-    word_count = dict()
-    for w in word_list:
-        if w not in word_count:
-            word_count[w] = 0
+    word_count = collections.Counter(word_list)  # Keys are kept in the order of first occurrence
+
+    return map_word_count_to_vocabulary(word_count, top_vocabulary_size)
+
+
+def map_word_count_to_vocabulary(word_count, top_vocabulary_size):
+    """
+    From the count of each word, select the top vocabulary with the size set to vocabulary_size, and returns
+    word to id map as well as id to word map for the vocabulary.
+    Words with the same count are ranked in the order of keys in word_count.
+
+    Parameters
+    ----------
+    word_count: dict
+        Word to count mapping. Keys need to be in the order of the first occurrence of each word
+        to get the same result as map_word_list_to_vocabulary.
+    top_vocabulary_size: int
+        Size of top vocabulary
 
-        count = word_count[w]
-        word_count[w] = count + 1
+    Returns
+    -------
+    vocabulary: list
+        vocabulary list
+    vocabulary_size: int
+        Size of the vocabulary
+    top_vocabulary: list
+        Top vocabulary list
+    top_vocabulary_size: int
+        Size of the top vocabulary
+    reserved_word_size: int
+        Size of reserved word list
+    word_to_id: dict
+        Word to id to top vocabulary mapping
+    id_to_word: dict
+        Index to top vocabulary to word mapping
+    """
+    word_count = dict(word_count)  # Entries for reserved words are overwritten below
 
     # The unique words in across all the files
     vocabulary = sorted(word_count.keys(), key=lambda v: word_count[v], reverse=True)
@@ -184,8 +608,8 @@ def map_word_list_to_vocabulary(word_list, top_vocabulary_size):
 
     # print top ranking words
     log.info("Top 5 words (count)")
-    for i in range(5):
-        log.info("%10s (%d)" % (top_vocabulary[i], word_count[top_vocabulary[i]]))
+    for w in top_vocabulary[:5]:
+        log.info("%10s (%d)" % (w, word_count.get(w, -1)))  # Reserved words are not counted
 
     # Mapping between words and IDs
     word_to_id = {w: i for i, w in enumerate(top_vocabulary)}
@@ -207,12 +631,199 @@ def map_word_list_to_vocabulary(word_list, top_vocabulary_size):
            word_to_id, id_to_word
 
 
-def map_text_to_token_matrix(text_list, label_for_text_list, top_vocabulary_size, reserved_word_size, num_labels, label_to_id, word_to_id):
+def _count_chunk(args):
     """
+    Tokenize a chunk of text and count words in a worker process.
 
     Parameters
     ----------
-    text_list: list of str
+    args: tuple
+        (filters, separators as tuple or None, list of text or Corpus)
+
+    Returns
+    -------
+    word_count: collections.Counter
+        Word to count mapping in the order of the first occurrence in the chunk.
+    """
+    word_count = collections.Counter()
+    for word_list in _tokenize_chunk(args):
+        word_count.update(word_list)
+
+    return word_count
+
+
+def count_words(text_list, filters=DEFAULT_FILTERS, separator_list=None, num_workers=None, chunk_size=1000):
+    """
+    Count words in text. Each worker process tokenizes and counts a chunk of text, and the partial counts are
+    merged in the order of chunks. The word list of the whole text is never built.
+
+    Parameters
+    ----------
+    text_list: list of str or Corpus
+        List of text
+    filters: string
+        A string specifying characters to remove.  Each character will be removed from output.
+    separator_list: list of strings
+        A list of strings containing one or more separators
+        if not specified, ["\n", " "] will be used.
+    num_workers: int
+        Number of worker processes. If None or 1, text is counted in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+
+    Returns
+    -------
+    word_count: collections.Counter
+        Word to count mapping in the order of the first occurrence in text_list.
+    """
+    if num_workers is None or num_workers <= 1 or len(text_list) <= chunk_size:
+        word_count = collections.Counter()
+        for word_list in iterate_word_lists(text_list, filters=filters, separator_list=separator_list):
+            word_count.update(word_list)
+        return word_count
+
+    chunks = _iterate_chunks(text_list, filters, separator_list, chunk_size)
+
+    word_count = collections.Counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
+        for partial_word_count in executor.map(_count_chunk, chunks):  # Merge in order to keep first occurrence order
+            word_count.update(partial_word_count)
+
+    return word_count
+
+
+def build_vocabulary(text_list, top_vocabulary_size, filters=DEFAULT_FILTERS, separator_list=None, num_workers=None,
+                     chunk_size=1000):
+    """
+    Build the vocabulary from text. The result is the same as
+    map_word_list_to_vocabulary(map_text_list_to_word_list(text_list), top_vocabulary_size)
+    without building the word list of the whole text.
+
+    Parameters
+    ----------
+    text_list: list of str or Corpus
+        List of text
+    top_vocabulary_size: int
+        Size of top vocabulary
+    filters: string
+        A string specifying characters to remove.  Each character will be removed from output.
+    separator_list: list of strings
+        A list of strings containing one or more separators
+        if not specified, ["\n", " "] will be used.
+    num_workers: int
+        Number of worker processes. If None or 1, text is counted in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+
+    Returns
+    -------
+    vocabulary: list
+        vocabulary list
+    vocabulary_size: int
+        Size of the vocabulary
+    top_vocabulary: list
+        Top vocabulary list
+    top_vocabulary_size: int
+        Size of the top vocabulary
+    reserved_word_size: int
+        Size of reserved word list
+    word_to_id: dict
+        Word to id to top vocabulary mapping
+    id_to_word: dict
+        Index to top vocabulary to word mapping
+    """
+    word_count = count_words(text_list, filters=filters, separator_list=separator_list, num_workers=num_workers,
+                             chunk_size=chunk_size)
+
+    return map_word_count_to_vocabulary(word_count, top_vocabulary_size)
+
+
+def map_label_list_to_label_id(label_for_text_list, num_labels, label_to_id, one_hot=False):
+    """
+    Map labels to label IDs in one step.
+
+    Parameters
+    ----------
+    label_for_text_list: list of str
+        List of labels
+    num_labels:
+        Number of labels
+    label_to_id: dict
+        Label to integer id mapping
+    one_hot: bool
+        Return a one-hot matrix instead of a vector of label IDs.
+
+    Returns
+    -------
+    y: ndarray
+        int32 vector of label IDs for sparse categorical loss, or
+        float32 one-hot matrix with the shape (number of labels in label_for_text_list, num_labels) if one_hot is True.
+    """
+    label_ids = np.fromiter((label_to_id[label] for label in label_for_text_list), dtype=np.int32,
+                            count=len(label_for_text_list))
+    if one_hot is False:
+        return label_ids
+
+    y = np.zeros((len(label_ids), num_labels), dtype=np.float32)
+    y[np.arange(len(label_ids)), label_ids] = 1.0
+
+    return y
+
+
+def _map_text_to_sparse_token_matrix(text_list, label_for_text_list, top_vocabulary_size, reserved_word_size,
+                                     num_labels, label_to_id, word_to_id, num_workers=None, chunk_size=1000,
+                                     one_hot_labels=True, max_ngram_order=1):
+    """
+    Count words of each text directly into a CSR matrix without building a one-hot matrix per word.
+
+    Parameters
+    ----------
+    Same as map_text_to_token_matrix
+
+    Returns
+    -------
+    x: scipy.sparse.csr_matrix
+        float32 matrix of word counts with the shape (number of text, top_vocabulary_size + reserved_word_size)
+    y: ndarray
+        Numpy array of indices representing labels
+    """
+    top_and_reserved_vocabulary_size = top_vocabulary_size + reserved_word_size
+
+    indices_list = list()
+    counts_list = list()
+    indptr = np.zeros(len(label_for_text_list) + 1, dtype=np.int64)
+
+    word_lists = iterate_ngram_lists(text_list, max_order=max_ngram_order, num_workers=num_workers,
+                                     chunk_size=chunk_size)
+    for i, words_in_text in enumerate(word_lists):
+        log.debug("Processing post: [%d]" % (i + 1))
+
+        word_array = np.fromiter((word_to_id.get(w, 0) for w in words_in_text), dtype=np.int32,
+                                 count=len(words_in_text))  # 0 for unknown
+        indices, counts = np.unique(word_array, return_counts=True)  # Sorted column indices
+
+        indices_list.append(indices.astype(np.int32))
+        counts_list.append(counts.astype(np.float32))
+        indptr[i + 1] = indptr[i] + len(indices)
+
+    indices = np.concatenate(indices_list) if len(indices_list) > 0 else np.zeros(0, dtype=np.int32)
+    data = np.concatenate(counts_list) if len(counts_list) > 0 else np.zeros(0, dtype=np.float32)
+
+    x = scipy.sparse.csr_matrix((data, indices, indptr), shape=(len(label_for_text_list),
+                                                              top_and_reserved_vocabulary_size))
+    log.info("Shape of x: %s, non-zero entries: %d" % (x.shape, x.nnz))
+    y = map_label_list_to_label_id(label_for_text_list, num_labels, label_to_id, one_hot=one_hot_labels)
+
+    return x, y
+
+
+def map_text_to_token_matrix(text_list, label_for_text_list, top_vocabulary_size, reserved_word_size, num_labels, label_to_id, word_to_id,
+                             num_workers=None, chunk_size=1000, sparse=False, one_hot_labels=True, max_ngram_order=1):
+    """
+
+    Parameters
+    ----------
+    text_list: list of str or Corpus
         List of text
     label_for_text_list: list of str
         List of labels, which is the ground truth for each text on the text_list
@@ -226,22 +837,39 @@ def map_text_to_token_matrix(text_list, label_for_text_list, top_vocabulary_size
         Label to integer id mapping
     word_to_id: dict
         Word to id to top vocabulary mapping
+    num_workers: int
+        Number of worker processes to tokenize text. If None or 1, text is tokenized in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+    sparse: bool
+        Return x as a scipy.sparse.csr_matrix of word counts instead of a dense matrix.
+    one_hot_labels: bool
+        Return y as a float32 one-hot matrix. If False, y is an int32 vector of label IDs.
+    max_ngram_order: int
+        Count n-grams up to this order as well as words. word_to_id needs to contain n-grams, e.g. from
+        build_ngram_vocabulary.
 
     Returns
     -------
-    x: ndarray
+    x: ndarray or scipy.sparse.csr_matrix
         Numpy array of indices representing text
     y: ndarray
         Numpy array of indices representing labels
     """
+    if sparse:
+        return _map_text_to_sparse_token_matrix(text_list, label_for_text_list, top_vocabulary_size,
+                                                reserved_word_size, num_labels, label_to_id, word_to_id,
+                                                num_workers=num_workers, chunk_size=chunk_size,
+                                                one_hot_labels=one_hot_labels, max_ngram_order=max_ngram_order)
+
     x_list = list()
-    y_list = list()
 
     top_and_reserved_vocabulary_size = top_vocabulary_size + reserved_word_size
 
-    for i, text in enumerate(text_list):
+    word_lists = iterate_ngram_lists(text_list, max_order=max_ngram_order, num_workers=num_workers,
+                                     chunk_size=chunk_size)
+    for i, words_in_text in enumerate(word_lists):
         log.debug("Processing post: [%d]" % (i + 1))
-        words_in_text = map_text_to_word_list(text)
 
         word_id_list = list()
         for w in words_in_text:
@@ -259,24 +887,167 @@ def map_text_to_token_matrix(text_list, label_for_text_list, top_vocabulary_size
 
         x_list.append(s)
 
-        # For now, do not change non-zero element to 1.
-        label_id = label_to_id[label_for_text_list[i]]
-        label_id = keras.utils.to_categorical(label_id, num_labels).astype(np.float32)
-        label_id = label_id.reshape(1, num_labels)
-        y_list.append(label_id)
-
     x = np.concatenate(x_list, axis=0)
     print(x.shape)
-    y = np.concatenate(y_list)
+    y = map_label_list_to_label_id(label_for_text_list, num_labels, label_to_id, one_hot=one_hot_labels)
 
     return x, y
 
-def map_text_to_word_id(text_list, label_for_text_list, top_vocabulary_size, reserved_word_size, num_labels, label_to_id, word_to_id):
+@functools.lru_cache(maxsize=65536)
+def hash_word(word, seed=0):
+    """
+    Compute a stable 32-bit hash of a word. Unlike hash(), the value does not change between Python processes.
+    Hashes of frequent words are cached in a bounded cache.
+
+    Parameters
+    ----------
+    word: str
+        Word
+    seed: int
+        Seed of the hash
+
+    Returns
+    -------
+    h: int
+        Hash in [0, 2 ** 32)
+    """
+    return zlib.crc32(word.encode("utf-8", errors="surrogatepass"), seed)
+
+
+def map_word_lists_to_hashed_token_matrix(word_lists, num_buckets, alternate_sign=False, seed=0):
     """
+    Count words of each word list into a fixed number of buckets using the hashing trick.
+    No vocabulary is needed, and memory use does not depend on the number of distinct words.
 
     Parameters
     ----------
-    text_list: list of str
+    word_lists: iterable of list of str
+        Word list of each text
+    num_buckets: int
+        Number of buckets, which is the number of columns of the matrix. Needs to be 2 ** 31 or less.
+    alternate_sign: bool
+        Add -1 instead of 1 for words whose hash has the top bit set, so that collisions tend to cancel out.
+    seed: int
+        Seed of the hash
+
+    Returns
+    -------
+    x: scipy.sparse.csr_matrix
+        float32 matrix of word counts with the shape (number of word lists, num_buckets)
+    """
+    indices_list = list()
+    data_list = list()
+    indptr = [0]
+
+    for word_list in word_lists:
+        hashes = np.fromiter((hash_word(w, seed) for w in word_list), dtype=np.uint32, count=len(word_list))
+        buckets = (hashes & 0x7fffffff) % num_buckets
+
+        indices, inverse = np.unique(buckets, return_inverse=True)  # Sorted column indices
+        if alternate_sign:
+            weights = np.where(hashes >> 31, -1.0, 1.0)
+            data = np.bincount(inverse, weights=weights, minlength=len(indices))
+        else:
+            data = np.bincount(inverse, minlength=len(indices))
+
+        indices_list.append(indices.astype(np.int32))
+        data_list.append(data.astype(np.float32))
+        indptr.append(indptr[-1] + len(indices))
+
+    indices = np.concatenate(indices_list) if len(indices_list) > 0 else np.zeros(0, dtype=np.int32)
+    data = np.concatenate(data_list) if len(data_list) > 0 else np.zeros(0, dtype=np.float32)
+
+    x = scipy.sparse.csr_matrix((data, indices, np.array(indptr, dtype=np.int64)),
+                                shape=(len(indptr) - 1, num_buckets))
+    if alternate_sign:
+        x.eliminate_zeros()  # Words that cancelled out
+
+    return x
+
+
+def iterate_hashed_token_matrices(text_batches, num_buckets, alternate_sign=False, seed=0, filters=DEFAULT_FILTERS,
+                                  separator_list=None):
+    """
+    Generator to vectorize batches of text as they arrive using the hashing trick.
+    Matrices of all batches have the same columns, so they can be stacked with scipy.sparse.vstack.
+
+    Parameters
+    ----------
+    text_batches: iterable of list of str or Corpus
+        Batches of text. Can be a generator, e.g. a stream from stream_text_and_label_id_from_files.
+    num_buckets: int
+        Number of buckets, which is the number of columns of the matrix.
+    alternate_sign: bool
+        Add -1 instead of 1 for words whose hash has the top bit set, so that collisions tend to cancel out.
+    seed: int
+        Seed of the hash
+    filters: string
+        A string specifying characters to remove.  Each character will be removed from output.
+    separator_list: list of strings
+        A list of strings containing one or more separators
+        if not specified, ["\n", " "] will be used.
+
+    Yields
+    ------
+    x: scipy.sparse.csr_matrix
+        float32 matrix of word counts with the shape (number of text in the batch, num_buckets)
+    """
+    for text_batch in text_batches:
+        word_lists = iterate_word_lists(text_batch, filters=filters, separator_list=separator_list)
+        yield map_word_lists_to_hashed_token_matrix(word_lists, num_buckets, alternate_sign=alternate_sign, seed=seed)
+
+
+def map_text_to_hashed_token_matrix(text_list, label_for_text_list, num_buckets, num_labels, label_to_id,
+                                    alternate_sign=False, seed=0, num_workers=None, chunk_size=1000,
+                                    one_hot_labels=True):
+    """
+    Map text to a sparse matrix of word counts using the hashing trick instead of a vocabulary.
+
+    Parameters
+    ----------
+    text_list: list of str or Corpus
+        List of text
+    label_for_text_list: list of str
+        List of labels, which is the ground truth for each text on the text_list
+    num_buckets: int
+        Number of buckets, which is the number of columns of the matrix.
+    num_labels:
+        Number of labels
+    label_to_id: dict
+        Label to integer id mapping
+    alternate_sign: bool
+        Add -1 instead of 1 for words whose hash has the top bit set, so that collisions tend to cancel out.
+    seed: int
+        Seed of the hash
+    num_workers: int
+        Number of worker processes to tokenize text. If None or 1, text is tokenized in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+    one_hot_labels: bool
+        Return y as a float32 one-hot matrix. If False, y is an int32 vector of label IDs.
+
+    Returns
+    -------
+    x: scipy.sparse.csr_matrix
+        float32 matrix of word counts with the shape (number of text, num_buckets)
+    y: ndarray
+        Numpy array of indices representing labels
+    """
+    word_lists = iterate_word_lists(text_list, num_workers=num_workers, chunk_size=chunk_size)
+    x = map_word_lists_to_hashed_token_matrix(word_lists, num_buckets, alternate_sign=alternate_sign, seed=seed)
+    log.info("Shape of x: %s, non-zero entries: %d" % (x.shape, x.nnz))
+    y = map_label_list_to_label_id(label_for_text_list, num_labels, label_to_id, one_hot=one_hot_labels)
+
+    return x, y
+
+
+def map_text_to_word_id(text_list, label_for_text_list, top_vocabulary_size, reserved_word_size, num_labels, label_to_id, word_to_id,
+                        num_workers=None, chunk_size=1000, one_hot_labels=True):
+    """
+
+    Parameters
+    ----------
+    text_list: list of str or Corpus
         List of text
     label_for_text_list: list of str
         List of labels, which is the ground truth for each text on the text_list
@@ -290,6 +1061,12 @@ def map_text_to_word_id(text_list, label_for_text_list, top_vocabulary_size, res
         Label to integer id mapping
     word_to_id: dict
         Word to id to top vocabulary mapping
+    num_workers: int
+        Number of worker processes to tokenize text. If None or 1, text is tokenized in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+    one_hot_labels: bool
+        Return y as a float32 one-hot matrix. If False, y is an int32 vector of label IDs.
 
     Returns
     -------
@@ -299,13 +1076,12 @@ def map_text_to_word_id(text_list, label_for_text_list, top_vocabulary_size, res
         Numpy array of indices representing labels
     """
     x_list = list()
-    y_list = list()
 
     top_and_reserved_vocabulary_size = top_vocabulary_size + reserved_word_size
 
-    for i, text in enumerate(text_list):
+    word_lists = iterate_word_lists(text_list, num_workers=num_workers, chunk_size=chunk_size)
+    for i, words_in_text in enumerate(word_lists):
         log.debug("Processing post: [%d]" % (i + 1))
-        words_in_text = map_text_to_word_list(text)
 
         word_id_list = list()
         for w in words_in_text:
@@ -315,15 +1091,189 @@ def map_text_to_word_id(text_list, label_for_text_list, top_vocabulary_size, res
                 id = word_to_id[w]
             word_id_list.append(id)
 
-        # For now, do not change non-zero element to 1.
-        label_id = label_to_id[label_for_text_list[i]]
-        label_id = keras.utils.to_categorical(label_id, num_labels).astype(np.float32)
-        label_id = label_id.reshape(1, num_labels)
         x_list.append(word_id_list)
-        y_list.append(label_id)
 
     x = np.array(x_list)
     print(x.shape)
-    y = np.concatenate(y_list)
+    y = map_label_list_to_label_id(label_for_text_list, num_labels, label_to_id, one_hot=one_hot_labels)
+
+    return x, y
+
+
+def map_word_lists_to_ragged_word_id(word_lists, word_to_id):
+    """
+    Map word lists to word IDs concatenated in one array.
+
+    Parameters
+    ----------
+    word_lists: iterable of list of str
+        Word list of each text
+    word_to_id: dict
+        Word to id to top vocabulary mapping. Words not in word_to_id are mapped to 0 in the same way as
+        map_text_to_word_id.
+
+    Returns
+    -------
+    values: ndarray
+        int32 array of word IDs of all text
+    offsets: ndarray
+        int64 array of (number of text + 1) offsets. Word IDs of text i are values[offsets[i]:offsets[i + 1]].
+    """
+    lengths = list()
+
+    def iterate_word_ids():
+        for word_list in word_lists:
+            lengths.append(len(word_list))
+            for w in word_list:
+                yield word_to_id.get(w, 0)
+
+    values = np.fromiter(iterate_word_ids(), dtype=np.int32)
+
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(np.array(lengths, dtype=np.int64), out=offsets[1:])
+
+    return values, offsets
+
+
+def pad_ragged_word_id(values, offsets, maxlen, pad_id, padding="pre", truncating="pre"):
+    """
+    Copy ragged word IDs to a fixed-length matrix. Same as keras.preprocessing.sequence.pad_sequences
+    without building a list per text.
+
+    Parameters
+    ----------
+    values: ndarray
+        int32 array of word IDs of all text
+    offsets: ndarray
+        int64 array of (number of text + 1) offsets
+    maxlen: int
+        Number of word IDs in each row
+    pad_id: int
+        ID to fill rows of text shorter than maxlen
+    padding: str
+        'pre' to pad before the word IDs or 'post' to pad after them.
+    truncating: str
+        'pre' to remove word IDs at the beginning of text longer than maxlen or 'post' to remove them at the end.
+
+    Returns
+    -------
+    x: ndarray
+        int32 matrix with the shape (number of text, maxlen)
+
+    Raises
+    ------
+    ValueError
+        If padding or truncating is neither 'pre' nor 'post'.
+    """
+    if padding not in ("pre", "post"):
+        raise ValueError("Invalid padding: %s" % (padding))
+    if truncating not in ("pre", "post"):
+        raise ValueError("Invalid truncating: %s" % (truncating))
+
+    num_text = len(offsets) - 1
+    lengths = offsets[1:] - offsets[:-1]
+    kept = np.minimum(lengths, maxlen)
+
+    source_starts = offsets[:-1] + (lengths - kept if truncating == "pre" else 0)
+    destination_starts = maxlen - kept if padding == "pre" else np.zeros(num_text, dtype=np.int64)
+
+    # Position of each kept word ID within its row
+    rows = np.repeat(np.arange(num_text), kept)
+    positions = np.arange(len(rows)) - np.repeat(np.cumsum(kept) - kept, kept)
+
+    x = np.full((num_text, maxlen), pad_id, dtype=np.int32)
+    x[rows, destination_starts[rows] + positions] = values[source_starts[rows] + positions]
+
+    return x
+
+
+def map_text_to_ragged_word_id(text_list, label_for_text_list, num_labels, label_to_id, word_to_id,
+                               num_workers=None, chunk_size=1000, one_hot_labels=True):
+    """
+    Map text to word IDs for consumers of variable-length sequences.
+
+    Parameters
+    ----------
+    text_list: list of str or Corpus
+        List of text
+    label_for_text_list: list of str
+        List of labels, which is the ground truth for each text on the text_list
+    num_labels:
+        Number of labels
+    label_to_id: dict
+        Label to integer id mapping
+    word_to_id: dict
+        Word to id to top vocabulary mapping
+    num_workers: int
+        Number of worker processes to tokenize text. If None or 1, text is tokenized in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+    one_hot_labels: bool
+        Return y as a float32 one-hot matrix. If False, y is an int32 vector of label IDs.
+
+    Returns
+    -------
+    (values, offsets): tuple of ndarray
+        values is the int32 array of word IDs of all text. Word IDs of text i are values[offsets[i]:offsets[i + 1]].
+    y: ndarray
+        Numpy array of indices representing labels
+    """
+    word_lists = iterate_word_lists(text_list, num_workers=num_workers, chunk_size=chunk_size)
+    values, offsets = map_word_lists_to_ragged_word_id(word_lists, word_to_id)
+    y = map_label_list_to_label_id(label_for_text_list, num_labels, label_to_id, one_hot=one_hot_labels)
+
+    return (values, offsets), y
+
+
+def map_text_to_padded_word_id(text_list, label_for_text_list, maxlen, num_labels, label_to_id, word_to_id,
+                               padding="pre", truncating="pre", num_workers=None, chunk_size=1000,
+                               one_hot_labels=True):
+    """
+    Map text to a fixed-length matrix of word IDs. Text shorter than maxlen is padded with the ID of <PAD>.
+
+    Parameters
+    ----------
+    text_list: list of str or Corpus
+        List of text
+    label_for_text_list: list of str
+        List of labels, which is the ground truth for each text on the text_list
+    maxlen: int
+        Number of words per text
+    num_labels:
+        Number of labels
+    label_to_id: dict
+        Label to integer id mapping
+    word_to_id: dict
+        Word to id to top vocabulary mapping including RESERVED_WORD_LIST
+    padding: str
+        'pre' to pad before the word IDs or 'post' to pad after them.
+    truncating: str
+        'pre' to remove words at the beginning of text longer than maxlen or 'post' to remove them at the end.
+    num_workers: int
+        Number of worker processes to tokenize text. If None or 1, text is tokenized in the current process.
+    chunk_size: int
+        Number of text sent to a worker process at a time.
+    one_hot_labels: bool
+        Return y as a float32 one-hot matrix. If False, y is an int32 vector of label IDs.
+
+    Returns
+    -------
+    x: ndarray
+        int32 matrix of word IDs with the shape (number of text, maxlen)
+    y: ndarray
+        Numpy array of indices representing labels
+
+    Raises
+    ------
+    ValueError
+        If padding or truncating is neither 'pre' nor 'post'.
+    """
+    (values, offsets), y = map_text_to_ragged_word_id(text_list, label_for_text_list, num_labels, label_to_id,
+                                                      word_to_id, num_workers=num_workers, chunk_size=chunk_size,
+                                                      one_hot_labels=one_hot_labels)
+
+    pad_id = word_to_id[RESERVED_WORD_LIST[2]]  # <PAD>
+    x = pad_ragged_word_id(values, offsets, maxlen, pad_id, padding=padding, truncating=truncating)
+    log.info("Shape of x: %s" % (x.shape,))
 
     return x, y
\ No newline at end of file
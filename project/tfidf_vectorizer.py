@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+"""
+TF-IDF vectorizer using the tokenizer and the vocabulary of text_to_id
+
+Words are tokenized in the same way as map_text_to_word_list, and columns of the output are the word IDs of
+word_to_id. A vocabulary built in fit has the same IDs as map_word_list_to_vocabulary without RESERVED_WORD_LIST,
+because reserved words never occur in text and would only add columns of zeros. Document frequency is counted in
+the same pass as word occurrence for the vocabulary. IDF is smoothed as if a document containing every word was
+added:
+    idf = ln((1 + number of documents) / (1 + document frequency)) + 1
+Each row is the word count multiplied by IDF and normalized to unit L2 norm.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import collections
+
+import numpy as np
+import scipy.sparse
+
+from project.text_to_id import DEFAULT_FILTERS
+from project.text_to_id import iterate_ngram_lists
+from project.text_to_id import map_word_count_to_vocabulary
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+class TfidfVectorizer():
+    """
+    Convert text to a sparse TF-IDF matrix.
+    """
+
+    def __init__(self, top_vocabulary_size=None, word_to_id=None, filters=DEFAULT_FILTERS, separator_list=None,
+                 num_workers=None, chunk_size=1000, max_ngram_order=1):
+        """
+        Initialize a vectorizer.
+
+        Parameters
+        ----------
+        top_vocabulary_size: int
+            Size of top vocabulary to build in fit. If None, all words are used.
+        word_to_id: dict
+            Word to id to top vocabulary mapping, e.g. from map_word_list_to_vocabulary. If specified, fit only
+            computes IDF for these words. Otherwise, the top vocabulary without reserved words is built again on
+            every fit.
+        filters: string
+            A string specifying characters to remove.  Each character will be removed from output.
+        separator_list: list of strings
+            A list of strings containing one or more separators
+            if not specified, ["\n", " "] will be used.
+        num_workers: int
+            Number of worker processes to tokenize text. If None or 1, text is tokenized in the current process.
+        chunk_size: int
+            Number of text sent to a worker process at a time.
+        max_ngram_order: int
+            Use n-grams up to this order as well as words, e.g. 2 for bigram TF-IDF.
+        """
+        self.top_vocabulary_size = top_vocabulary_size
+        self.word_to_id = word_to_id
+        self.fixed_vocabulary = word_to_id is not None
+        self.filters = filters
+        self.separator_list = separator_list
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.max_ngram_order = max_ngram_order
+        self.idf = None
+
+    def _iterate_word_lists(self, text_list):
+        return iterate_ngram_lists(text_list, max_order=self.max_ngram_order, filters=self.filters,
+                                   separator_list=self.separator_list, num_workers=self.num_workers,
+                                   chunk_size=self.chunk_size)
+
+    def fit(self, text_list):
+        """
+        Build the vocabulary unless word_to_id is specified, and compute IDF of each word.
+
+        Parameters
+        ----------
+        text_list: list of str or Corpus
+            List of text in training dataset
+
+        Returns
+        -------
+        self: TfidfVectorizer
+            This vectorizer
+        """
+        word_count = collections.Counter()
+        document_frequency = collections.Counter()
+        num_documents = 0
+
+        for word_list in self._iterate_word_lists(text_list):
+            word_count_in_text = collections.Counter(word_list)
+            word_count.update(word_count_in_text)
+            document_frequency.update(word_count_in_text.keys())
+            num_documents += 1
+
+        if self.fixed_vocabulary is False:
+            top_vocabulary_size = self.top_vocabulary_size
+            if top_vocabulary_size is None:
+                top_vocabulary_size = len(word_count)
+            _, _, top_vocabulary, top_vocabulary_size, _, _, _ = map_word_count_to_vocabulary(word_count,
+                                                                                               top_vocabulary_size)
+            self.word_to_id = {w: id for id, w in enumerate(top_vocabulary[:top_vocabulary_size])}
+
+        df = np.zeros(len(self.word_to_id), dtype=np.float64)
+        for w, id in self.word_to_id.items():
+            df[id] = document_frequency.get(w, 0)
+
+        self.idf = (np.log((1.0 + num_documents) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        return self
+
+    def transform(self, text_list):
+        """
+        Convert text to a TF-IDF matrix using the vocabulary and IDF computed in fit.
+        Words not in the vocabulary are ignored.
+
+        Parameters
+        ----------
+        text_list: list of str or Corpus
+            List of text
+
+        Returns
+        -------
+        x: scipy.sparse.csr_matrix
+            float32 matrix with the shape (number of text, size of word_to_id). Each row has unit L2 norm
+            unless the text contains no word in the vocabulary.
+
+        Raises
+        ------
+        ValueError
+            If the vectorizer is not fitted.
+        """
+        if self.idf is None:
+            raise ValueError("TfidfVectorizer is not fitted.")
+
+        word_to_id = self.word_to_id
+
+        indices_list = list()
+        data_list = list()
+        indptr = [0]
+
+        for word_list in self._iterate_word_lists(text_list):
+            word_ids = np.fromiter((word_to_id[w] for w in word_list if w in word_to_id), dtype=np.int32)
+            indices, counts = np.unique(word_ids, return_counts=True)
+
+            data = counts * self.idf[indices]
+            norm = np.sqrt(np.dot(data, data))
+            if norm > 0:
+                data /= norm
+
+            indices_list.append(indices)
+            data_list.append(data.astype(np.float32))
+            indptr.append(indptr[-1] + len(indices))
+
+        indices = np.concatenate(indices_list) if len(indices_list) > 0 else np.zeros(0, dtype=np.int32)
+        data = np.concatenate(data_list) if len(data_list) > 0 else np.zeros(0, dtype=np.float32)
+
+        x = scipy.sparse.csr_matrix((data, indices, np.array(indptr, dtype=np.int64)),
+                                    shape=(len(indptr) - 1, len(word_to_id)))
+        log.info("Shape of x: %s, non-zero entries: %d" % (x.shape, x.nnz))
+
+        return x
+
+    def fit_transform(self, text_list):
+        """
+        Fit the vectorizer and convert the same text to a TF-IDF matrix.
+
+        Parameters
+        ----------
+        text_list: list of str or Corpus
+            List of text in training dataset
+
+        Returns
+        -------
+        x: scipy.sparse.csr_matrix
+            float32 TF-IDF matrix
+        """
+        return self.fit(text_list).transform(text_list)
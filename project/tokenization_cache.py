@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+"""
+Disk cache of tokenized text keyed by the content of text and the tokenizer configuration
+
+Each entry is stored in a file named by the SHA-1 digest of the tokenizer configuration and the text encoded in
+UTF-8, so the same text is never tokenized again across runs while the configuration does not change. Renamed or
+moved files hit the same entries.
+
+An entry contains either words or word IDs:
+    words: uint32 number of words, uint32 length of each word in bytes, then the words encoded in UTF-8.
+    word IDs: int32 array of word IDs if the cache is created with word_to_id. Words not in word_to_id are mapped
+    to 0 in the same way as map_text_to_word_id.
+
+The modification time of an entry file is updated when the entry is used. When the total size of entries exceeds
+the limit, the least recently used entries are removed.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import time
+import hashlib
+import json
+import tempfile
+
+import numpy as np
+
+from project.text_to_id import DEFAULT_FILTERS
+from project.text_to_id import get_tokenizer
+from project.corpus import Corpus
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+TOKENIZATION_CACHE_VERSION = 1
+WORDS_SUFFIX = ".words"
+IDS_SUFFIX = ".ids"
+EVICTION_RATIO = 0.9  # Entries are removed until the total size is this ratio of the limit
+TMP_SUFFIX = ".tmp"
+TMP_FILE_MAX_AGE = 3600  # Temporary files older than this in seconds are left by interrupted writers
+
+
+def _encode_words(word_list):
+    """
+    Serialize a word list.
+
+    Parameters
+    ----------
+    word_list: list of str
+        List of words
+
+    Returns
+    -------
+    data: bytes
+        Serialized word list
+    """
+    encoded = [w.encode("utf-8", errors="surrogatepass") for w in word_list]
+    lengths = np.array([len(b) for b in encoded], dtype=np.uint32)
+
+    return np.uint32(len(encoded)).tobytes() + lengths.tobytes() + b"".join(encoded)
+
+
+def _decode_words(data):
+    """
+    Deserialize a word list.
+
+    Parameters
+    ----------
+    data: bytes
+        Serialized word list
+
+    Returns
+    -------
+    word_list: list of str
+        List of words
+    """
+    num_words = int(np.frombuffer(data, dtype=np.uint32, count=1)[0])
+    lengths = np.frombuffer(data, dtype=np.uint32, count=num_words, offset=4)
+
+    start = 4 + 4 * num_words
+    word_list = list()
+    for length in lengths.tolist():
+        word_list.append(data[start:start + length].decode("utf-8", errors="surrogatepass"))
+        start += length
+
+    return word_list
+
+
+def compute_vocabulary_digest(word_to_id):
+    """
+    Compute a digest of a word to ID mapping.
+
+    Parameters
+    ----------
+    word_to_id: dict
+        Word to id to top vocabulary mapping
+
+    Returns
+    -------
+    digest: str
+        Hex digest of the mapping
+    """
+    s = json.dumps(sorted(word_to_id.items()), separators=(",", ":"))
+    return hashlib.sha1(s.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+class TokenizationCache():
+    """
+    Size-bounded LRU cache of word lists or word IDs on disk.
+    """
+
+    def __init__(self, cache_dir, max_bytes=1 << 30, filters=DEFAULT_FILTERS, separator_list=None, word_to_id=None):
+        """
+        Open a cache directory.
+
+        Parameters
+        ----------
+        cache_dir: pathlib.Path
+            Directory to store entries. Created if it does not exist. Caches with different configurations can
+            share the directory.
+        max_bytes: int
+            Maximum total size of entries in bytes.
+        filters: string
+            A string specifying characters to remove.  Each character will be removed from output.
+        separator_list: list of strings
+            A list of strings containing one or more separators
+            if not specified, ["\n", " "] will be used.
+        word_to_id: dict
+            If specified, word IDs are cached instead of words.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.tokenizer = get_tokenizer(filters=filters, separator_list=separator_list)
+        self.word_to_id = word_to_id
+        self.suffix = WORDS_SUFFIX if word_to_id is None else IDS_SUFFIX
+        self.hits = 0
+        self.misses = 0
+
+        config = {"version": TOKENIZATION_CACHE_VERSION,
+                  "filters": self.tokenizer.filters,
+                  "separator_list": self.tokenizer.separator_list,
+                  "vocabulary": compute_vocabulary_digest(word_to_id) if word_to_id is not None else None}
+        s = json.dumps(config, sort_keys=True, separators=(",", ":"))
+        self.config_digest = hashlib.sha1(s.encode("utf-8", errors="surrogatepass")).digest()
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.total_bytes = sum([size for _, size, _ in self._scan_entries()])
+
+    def _scan_entries(self):
+        """
+        List entry files. Temporary files left by interrupted writers are removed.
+
+        Returns
+        -------
+        entries: list of tuple
+            List of (modification time in ns, size, path)
+        """
+        entries = list()
+        min_tmp_mtime_ns = time.time_ns() - TMP_FILE_MAX_AGE * 1000000000
+        with os.scandir(self.cache_dir) as it:
+            for d in it:
+                if d.is_dir() is False:
+                    continue
+                with os.scandir(d.path) as files:
+                    for entry in files:
+                        if entry.name.endswith(WORDS_SUFFIX) or entry.name.endswith(IDS_SUFFIX):
+                            st = entry.stat()
+                            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                        elif entry.name.endswith(TMP_SUFFIX) and entry.stat().st_mtime_ns < min_tmp_mtime_ns:
+                            try:
+                                os.remove(entry.path)
+                            except FileNotFoundError:  # Removed by another process
+                                pass
+
+        return entries
+
+    def _get_path(self, b):
+        """
+        Get the path of the entry for text.
+
+        Parameters
+        ----------
+        b: bytes
+            Text encoded in UTF-8
+
+        Returns
+        -------
+        path: pathlib.Path
+            Path to the entry file
+        """
+        digest = hashlib.sha1(self.config_digest + b).hexdigest()
+        return self.cache_dir / digest[:2] / (digest + self.suffix)
+
+    def _get(self, b):
+        """
+        Get the cached value for text.
+
+        Parameters
+        ----------
+        b: bytes
+            Text encoded in UTF-8
+
+        Returns
+        -------
+        value: list of str or ndarray
+            Words or int32 word IDs. None if the text is not in the cache.
+        """
+        path = self._get_path(b)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        os.utime(path)  # Mark as recently used
+        self.hits += 1
+
+        if self.word_to_id is None:
+            return _decode_words(data)
+
+        return np.frombuffer(data, dtype=np.int32)
+
+    def _put(self, b, word_list):
+        """
+        Store the word list of text.
+
+        Parameters
+        ----------
+        b: bytes
+            Text encoded in UTF-8
+        word_list: list of str
+            Words of the text
+
+        Returns
+        -------
+        value: list of str or ndarray
+            Words or int32 word IDs
+        """
+        if self.word_to_id is None:
+            value = word_list
+            data = _encode_words(word_list)
+        else:
+            value = np.fromiter((self.word_to_id.get(w, 0) for w in word_list), dtype=np.int32,
+                                count=len(word_list))
+            data = value.tobytes()
+
+        path = self._get_path(b)
+        path.parent.mkdir(exist_ok=True)
+
+        try:  # The entry can have been written by another process since the lookup
+            replaced_bytes = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced_bytes = 0
+
+        # Each writer has its own temporary file so that concurrent writers of an entry do not truncate each other
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".", suffix=TMP_SUFFIX,
+                                         delete=False) as f:
+            f.write(data)
+        os.replace(f.name, path)
+
+        self.total_bytes += len(data) - replaced_bytes
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+        return value
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the total size is below the limit.
+        """
+        entries = sorted(self._scan_entries())
+        self.total_bytes = sum([size for _, size, _ in entries])
+
+        target = self.max_bytes * EVICTION_RATIO
+        num_removed = 0
+        for _, size, path in entries:
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # Removed by another process
+                pass
+            self.total_bytes -= size
+            num_removed += 1
+
+        log.info("Removed %d entries from the tokenization cache" % (num_removed))
+
+    def tokenize(self, text):
+        """
+        Tokenize text using the cache.
+
+        Parameters
+        ----------
+        text: str
+            Text
+
+        Returns
+        -------
+        value: list of str or ndarray
+            Words, or int32 word IDs if the cache is created with word_to_id.
+        """
+        b = text.encode("utf-8", errors="surrogatepass")
+        value = self._get(b)
+        if value is None:
+            value = self._put(b, self.tokenizer.tokenize(text))
+
+        return value
+
+    def tokenize_bytes(self, b):
+        """
+        Tokenize text encoded in UTF-8 using the cache.
+
+        Parameters
+        ----------
+        b: bytes
+            Text encoded in UTF-8
+
+        Returns
+        -------
+        value: list of str or ndarray
+            Words, or int32 word IDs if the cache is created with word_to_id.
+        """
+        value = self._get(b)
+        if value is None:
+            value = self._put(b, self.tokenizer.tokenize_bytes(b))
+
+        return value
+
+    def tokenize_text_list(self, text_list):
+        """
+        Tokenize text using the cache.
+
+        Parameters
+        ----------
+        text_list: list of str or Corpus
+            List of text
+
+        Returns
+        -------
+        values: list
+            Words, or int32 word IDs if the cache is created with word_to_id, for each text.
+        """
+        if isinstance(text_list, Corpus):  # Hash the buffer without decoding
+            values = [self.tokenize_bytes(text_list.get_bytes(i).tobytes()) for i in range(len(text_list))]
+        else:
+            values = [self.tokenize(text) for text in text_list]
+
+        log.info("Tokenization cache hits: %d, misses: %d" % (self.hits, self.misses))
+
+        return values
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+"""
+Save a vocabulary to files which can be memory-mapped and shared by processes
+
+A vocabulary directory contains:
+    strings.bin: Words encoded in UTF-8 and concatenated in the sorted order of the encoded bytes.
+    string_offsets.npy: int64 array of (number of words + 1) offsets of each word in strings.bin.
+    ids.npy: int32 array of the ID of each word in the sorted order.
+    id_to_index.npy: int32 array of the position of the word for each ID in the sorted order. -1 for unused IDs.
+    hash_index.npy: int32 open-addressing hash table of positions in the sorted order. -1 for empty slots.
+    meta.json: Number of words, reserved word list and the size of the top vocabulary.
+
+The hash table is frozen when the vocabulary is saved. Words are hashed with hash_word of text_to_id, which
+does not depend on the Python process, and collisions are resolved by linear probing.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+
+import os
+import logging
+import json
+
+import numpy as np
+
+from project.text_to_id import RESERVED_WORD_LIST
+from project.text_to_id import hash_word
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+VOCABULARY_VERSION = 1
+STRINGS_FILE = "strings.bin"
+STRING_OFFSETS_FILE = "string_offsets.npy"
+IDS_FILE = "ids.npy"
+ID_TO_INDEX_FILE = "id_to_index.npy"
+HASH_INDEX_FILE = "hash_index.npy"
+META_FILE = "meta.json"
+
+
+def _encode_word(word):
+    return word.encode("utf-8", errors="surrogatepass")
+
+
+def save_vocabulary(vocabulary_dir, word_to_id, reserved_word_list=RESERVED_WORD_LIST):
+    """
+    Save a vocabulary to a directory.
+
+    Parameters
+    ----------
+    vocabulary_dir: pathlib.Path
+        Directory to save the vocabulary. Created if it does not exist.
+    word_to_id: dict
+        Word to id to top vocabulary mapping, e.g. from map_word_list_to_vocabulary.
+    reserved_word_list: list of str
+        Reserved words included in word_to_id.
+    """
+    vocabulary_dir.mkdir(parents=True, exist_ok=True)
+
+    # Invalidate the existing vocabulary first so that a partially written vocabulary is never loaded.
+    meta_path = vocabulary_dir / META_FILE
+    if meta_path.exists():
+        meta_path.unlink()
+
+    encoded = sorted((_encode_word(w), id) for w, id in word_to_id.items())
+    num_words = len(encoded)
+
+    offsets = np.zeros(num_words + 1, dtype=np.int64)
+    np.cumsum(np.array([len(b) for b, _ in encoded], dtype=np.int64), out=offsets[1:])
+    with open(vocabulary_dir / STRINGS_FILE, "wb") as f:
+        f.write(b"".join([b for b, _ in encoded]))
+
+    ids = np.array([id for _, id in encoded], dtype=np.int32)
+
+    id_to_index = np.full(int(ids.max()) + 1 if num_words > 0 else 0, -1, dtype=np.int32)
+    id_to_index[ids] = np.arange(num_words, dtype=np.int32)
+
+    # Hash table with the load factor of 0.5 or less
+    table_size = 1
+    while table_size < num_words * 2:
+        table_size *= 2
+    mask = table_size - 1
+
+    hash_index = np.full(table_size, -1, dtype=np.int32)
+    for i, (b, _) in enumerate(encoded):
+        slot = hash_word(b.decode("utf-8", errors="surrogatepass")) & mask
+        while hash_index[slot] >= 0:
+            slot = (slot + 1) & mask
+        hash_index[slot] = i
+
+    np.save(vocabulary_dir / STRING_OFFSETS_FILE, offsets)
+    np.save(vocabulary_dir / IDS_FILE, ids)
+    np.save(vocabulary_dir / ID_TO_INDEX_FILE, id_to_index)
+    np.save(vocabulary_dir / HASH_INDEX_FILE, hash_index)
+
+    meta = {"version": VOCABULARY_VERSION,
+            "num_words": num_words,
+            "reserved_word_list": list(reserved_word_list),
+            "top_vocabulary_size": num_words - len(reserved_word_list)}
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+    log.info("Saved vocabulary of %d words (%d bytes) to %s" % (num_words, offsets[-1], vocabulary_dir))
+
+
+class MappedVocabulary():
+    """
+    Read-only word to ID mapping backed by memory-mapped files. It can be used in place of word_to_id.
+    When it is sent to a worker process, only the path is pickled and the worker maps the same files.
+    """
+
+    def __init__(self, vocabulary_dir):
+        """
+        Memory-map a vocabulary.
+
+        Parameters
+        ----------
+        vocabulary_dir: pathlib.Path
+            Directory where the vocabulary is saved.
+
+        Raises
+        ------
+        ValueError
+            If the vocabulary does not exist or the version is not supported.
+        """
+        meta_path = vocabulary_dir / META_FILE
+        if meta_path.exists() is False:
+            log.fatal("%s does not exist." % (meta_path))
+            raise ValueError("%s does not exist." % (meta_path))
+
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+
+        if meta["version"] != VOCABULARY_VERSION:
+            raise ValueError("Unsupported vocabulary version %d." % (meta["version"]))
+
+        self.vocabulary_dir = vocabulary_dir
+        self.reserved_word_list = meta["reserved_word_list"]
+        self.top_vocabulary_size = meta["top_vocabulary_size"]
+
+        self.offsets = np.load(vocabulary_dir / STRING_OFFSETS_FILE, mmap_mode="r")
+        self.ids = np.load(vocabulary_dir / IDS_FILE, mmap_mode="r")
+        self.id_to_index = np.load(vocabulary_dir / ID_TO_INDEX_FILE, mmap_mode="r")
+        self.hash_index = np.load(vocabulary_dir / HASH_INDEX_FILE, mmap_mode="r")
+        self.mask = len(self.hash_index) - 1
+
+        if self.offsets[-1] > 0:
+            self.strings = np.memmap(vocabulary_dir / STRINGS_FILE, dtype=np.uint8, mode="r")
+        else:  # Cannot memory-map an empty file
+            self.strings = np.zeros(0, dtype=np.uint8)
+
+    def __reduce__(self):
+        return (MappedVocabulary, (self.vocabulary_dir,))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _get_bytes(self, index):
+        return self.strings[self.offsets[index]:self.offsets[index + 1]].tobytes()
+
+    def _find(self, word):
+        """
+        Find the position of a word in the sorted order.
+
+        Parameters
+        ----------
+        word: str
+            Word
+
+        Returns
+        -------
+        index: int
+            Position of the word, or -1 if the word is not in the vocabulary.
+        """
+        if len(self.hash_index) == 0:
+            return -1
+
+        b = _encode_word(word)
+        slot = hash_word(word) & self.mask
+        while True:
+            index = int(self.hash_index[slot])
+            if index < 0 or self._get_bytes(index) == b:
+                return index
+            slot = (slot + 1) & self.mask
+
+    def __contains__(self, word):
+        return self._find(word) >= 0
+
+    def __getitem__(self, word):
+        index = self._find(word)
+        if index < 0:
+            raise KeyError(word)
+
+        return int(self.ids[index])
+
+    def get(self, word, default=None):
+        """
+        Get the ID of a word.
+
+        Parameters
+        ----------
+        word: str
+            Word
+        default: int
+            Value to return if the word is not in the vocabulary.
+
+        Returns
+        -------
+        id: int
+            ID of the word
+        """
+        index = self._find(word)
+        if index < 0:
+            return default
+
+        return int(self.ids[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._get_bytes(i).decode("utf-8", errors="surrogatepass")
+
+    def items(self):
+        """
+        Generator of words and IDs in the sorted order of words.
+
+        Yields
+        ------
+        (word, id): tuple
+            Word and its ID
+        """
+        for i in range(len(self)):
+            yield self._get_bytes(i).decode("utf-8", errors="surrogatepass"), int(self.ids[i])
+
+    def id_to_word(self, id):
+        """
+        Get the word for an ID.
+
+        Parameters
+        ----------
+        id: int
+            ID of a word
+
+        Returns
+        -------
+        word: str
+            Word
+
+        Raises
+        ------
+        KeyError
+            If no word has the ID.
+        """
+        if id < 0 or id >= len(self.id_to_index) or self.id_to_index[id] < 0:
+            raise KeyError(id)
+
+        return self._get_bytes(self.id_to_index[id]).decode("utf-8", errors="surrogatepass")
+
+    def to_dict(self):
+        """
+        Copy the vocabulary to dictionaries.
+
+        Returns
+        -------
+        word_to_id: dict
+            Word to ID mapping in the order of ID
+        id_to_word: dict
+            ID to word mapping in the order of ID
+        """
+        word_to_id = dict(sorted(self.items(), key=lambda x: x[1]))
+        id_to_word = {id: w for w, id in word_to_id.items()}
+
+        return word_to_id, id_to_word
+
+
+def load_vocabulary(vocabulary_dir):
+    """
+    Memory-map a vocabulary saved with save_vocabulary.
+
+    Parameters
+    ----------
+    vocabulary_dir: pathlib.Path
+        Directory where the vocabulary is saved.
+
+    Returns
+    -------
+    vocabulary: MappedVocabulary
+        Read-only word to ID mapping
+
+    Raises
+    ------
+    ValueError
+        If the vocabulary does not exist or the version is not supported.
+    """
+    return MappedVocabulary(vocabulary_dir)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import random
+import collections
+
+from project.text_to_id import map_text_list_to_word_list
+from project.text_to_id import map_word_list_to_vocabulary
+from project.approximate_vocabulary import SpaceSavingCounter
+from project.approximate_vocabulary import build_approximate_vocabulary
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+class TestApproximateVocabulary(unittest.TestCase):
+
+    def test_exact_when_capacity_is_enough(self):
+        """
+        Test that the result matches map_word_list_to_vocabulary when all distinct words fit in capacity
+        """
+        random.seed(0)
+        words = ["apple", "banana", "coconut", "date", "fig", "grape", "kiwi", "lemon"]
+        text_list = [" ".join(random.choice(words) for _ in range(random.randint(0, 10))) for _ in range(100)]
+
+        expected = map_word_list_to_vocabulary(map_text_list_to_word_list(text_list), 5)
+        actual = build_approximate_vocabulary(text_list, 5, capacity=len(words) + 1)  # Empty text yields ""
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_error_bound(self):
+        """
+        Test that estimated counts stay within the error bound and frequent words are found
+        """
+        random.seed(0)
+        word_list = ["w%d" % (int(random.paretovariate(1.0))) for _ in range(20000)]
+        true_count = collections.Counter(word_list)
+
+        counter = SpaceSavingCounter(50)
+        counter.update(word_list)
+
+        expected = 50
+        actual = len(counter)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        for w, count in counter.word_count().items():
+            result = counter.guaranteed_count(w) <= true_count[w] <= count <= true_count[w] + counter.error_bound
+            self.assertTrue(result, "Count of %s is out of bounds" % (w))
+
+        for w, count in true_count.items():
+            if count > counter.error_bound:
+                self.assertTrue(w in counter.counts, "Frequent word %s is not monitored" % (w))
+
+        expected = [w for w, _ in true_count.most_common(5)]
+        actual = build_approximate_vocabulary([" ".join(word_list)], 5, error_rate=0.02)[2][:5]
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_invalid_capacity(self):
+        """
+        Test that capacity smaller than the top vocabulary size is rejected
+        """
+        with self.assertRaises(ValueError):
+            build_approximate_vocabulary(["apple"], 10, capacity=5)
+
+        with self.assertRaises(ValueError):
+            build_approximate_vocabulary(["apple"], 10, error_rate=0)
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+
+import numpy as np
+from project.corpus import build_corpus
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+TEXT_LIST = ["Granny Smith apples are green.",
+             "",
+             "Café au lait",
+             "Bananas are good for breakfast."]
+
+
+class TestCorpus(unittest.TestCase):
+
+    def test_build_corpus(self):
+        """
+        Test building a corpus and accessing documents
+        """
+        corpus = build_corpus(TEXT_LIST, [0, 0, 1, 2])
+
+        expected = 4
+        actual = len(corpus)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        expected = TEXT_LIST
+        actual = list(corpus)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        expected = "Café au lait"
+        actual = corpus[2]
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        expected = sum([len(t.encode("utf-8")) for t in TEXT_LIST])
+        actual = corpus.nbytes
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_slice_corpus(self):
+        """
+        Test slicing and indexing a corpus
+        """
+        corpus = build_corpus(TEXT_LIST, [0, 0, 1, 2])
+
+        subset = corpus[1:3]
+        expected = TEXT_LIST[1:3]
+        actual = list(subset)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        result = subset.buffer is corpus.buffer
+        self.assertTrue(result, "Buffer is not shared.")
+
+        subset = corpus[[3, 0]]
+        expected = [TEXT_LIST[3], TEXT_LIST[0]]
+        actual = list(subset)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        expected = [2, 0]
+        actual = list(subset.labels)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        compacted = subset.compact()
+        expected = [TEXT_LIST[3], TEXT_LIST[0]]
+        actual = list(compacted)
+        result = actual == expected and len(compacted.buffer) == compacted.nbytes
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_empty_corpus(self):
+        """
+        Test an empty corpus
+        """
+        corpus = build_corpus([])
+
+        expected = []
+        actual = list(corpus)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
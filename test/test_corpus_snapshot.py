@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from project.load_text_data import load_text_and_label_id_from_files
+from project.corpus_snapshot import load_text_and_label_id_from_files_with_snapshot
+from project.corpus_snapshot import load_snapshot
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+def create_test_files(root_dir):
+    """
+    Create test files under root_dir.
+    """
+    files = {"apple/granny_smith_apple.txt": "Granny Smith apples are green.",
+             "apple/fuji_apple.txt": "Fuji apples are red.",
+             "apple/golden_delicious.txt": "I love Golden Delicious apples.",
+             "banana/banana.txt": "Bananas are good for breakfast.",
+             "cherry/bing_cherry.txt": "Bing cherries are popular.",
+             "cherry/rainier_cherry.txt": "Rainer cherries are in season right now. é"}
+
+    for f, text in files.items():
+        text_path = root_dir / Path(f)
+        text_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(text_path, "w") as fh:
+            fh.write(text)
+
+
+class TestCorpusSnapshot(unittest.TestCase):
+
+    def assert_dataset_equal(self, actual, expected):
+        """
+        Assert that two datasets returned by the loaders are the same.
+        """
+        result = actual[0][0] == expected[0][0] and actual[1][0] == expected[1][0]
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        result = np.array_equal(actual[0][1], expected[0][1]) and np.array_equal(actual[1][1], expected[1][1])
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        result = actual[2] == expected[2]
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_load_with_snapshot(self):
+        """
+        Test loading text through a snapshot
+        """
+        with tempfile.TemporaryDirectory() as d:
+            root_dir = Path(d) / "data"
+            snapshot_dir = Path(d) / "snapshot"
+            create_test_files(root_dir)
+
+            expected = load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2)
+
+            # First call creates the snapshot
+            actual = load_text_and_label_id_from_files_with_snapshot(root_dir, snapshot_dir, test_dataset_ratio=0.2)
+            self.assert_dataset_equal(actual, expected)
+
+            actual = load_snapshot(snapshot_dir)
+            self.assert_dataset_equal(actual, expected)
+
+            # Second call loads from the snapshot
+            actual = load_text_and_label_id_from_files_with_snapshot(root_dir, snapshot_dir, test_dataset_ratio=0.2)
+            self.assert_dataset_equal(actual, expected)
+
+            # Load as Corpus backed by the snapshot
+            (x_train, y_train), (x_test, y_test), _ = load_text_and_label_id_from_files_with_snapshot(
+                root_dir, snapshot_dir, test_dataset_ratio=0.2, return_corpus=True)
+            result = tuple(x_train) == expected[0][0] and tuple(x_test) == expected[1][0]
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                list(x_train), expected[0][0]))
+
+    def test_snapshot_invalidation(self):
+        """
+        Test that the snapshot is invalidated when a file is added
+        """
+        with tempfile.TemporaryDirectory() as d:
+            root_dir = Path(d) / "data"
+            snapshot_dir = Path(d) / "snapshot"
+            create_test_files(root_dir)
+
+            load_text_and_label_id_from_files_with_snapshot(root_dir, snapshot_dir, test_dataset_ratio=0.2)
+
+            with open(root_dir / "banana" / "cavendish.txt", "w") as fh:
+                fh.write("Cavendish is the most common banana.")
+
+            expected = load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2)
+            actual = load_text_and_label_id_from_files_with_snapshot(root_dir, snapshot_dir, test_dataset_ratio=0.2)
+            self.assert_dataset_equal(actual, expected)
+
+            # Different split parameter must not use the snapshot
+            expected = load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0)
+            actual = load_text_and_label_id_from_files_with_snapshot(root_dir, snapshot_dir, test_dataset_ratio=0)
+            self.assert_dataset_equal(actual, expected)
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
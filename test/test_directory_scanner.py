@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import tempfile
+from pathlib import Path
+
+from project.directory_scanner import scan_label_dirs
+from project.directory_scanner import scan_label_dirs_for_roots
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+def create_test_files(root_dir):
+    """
+    Create test files under root_dir.
+    """
+    files = {"apple/granny_smith_apple.txt": "Granny Smith apples are green.",
+             "apple/fuji_apple.txt": "Fuji apples are red.",
+             "apple/.hidden": "Hidden file",
+             "banana/banana.txt": "Bananas are good for breakfast."}
+
+    for f, text in files.items():
+        text_path = root_dir / Path(f)
+        text_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(text_path, "w") as fh:
+            fh.write(text)
+
+    (root_dir / "apple" / "subdir").mkdir()
+    with open(root_dir / "README", "w") as fh:
+        fh.write("Not a label directory")
+
+
+class TestDirectoryScanner(unittest.TestCase):
+
+    def test_scan_label_dirs(self):
+        """
+        Test scanning label directories in the same order as iterdir and glob
+        """
+        with tempfile.TemporaryDirectory() as d:
+            root_dir = Path(d)
+            create_test_files(root_dir)
+
+            expected = [(label_dir.name, [f for f in label_dir.glob("*") if f.is_dir() is False])
+                        for label_dir in root_dir.iterdir() if label_dir.is_dir()]
+
+            for num_workers in [None, 2]:
+                actual = [(label, [e.path for e in entries])
+                          for label, entries in scan_label_dirs(root_dir, num_workers=num_workers)]
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+            actual = {e.path.name: e.size for _, entries in scan_label_dirs(root_dir, with_stat=True)
+                      for e in entries}
+            expected = {"granny_smith_apple.txt": 30, "fuji_apple.txt": 20, ".hidden": 11, "banana.txt": 31}
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+    def test_scan_label_dirs_for_roots(self):
+        """
+        Test scanning multiple roots concurrently
+        """
+        with tempfile.TemporaryDirectory() as d:
+            root_dirs = [Path(d) / "training", Path(d) / "test"]
+            for root_dir in root_dirs:
+                create_test_files(root_dir)
+
+            expected = [scan_label_dirs(root_dir) for root_dir in root_dirs]
+            actual = scan_label_dirs_for_roots(root_dirs, num_workers=2)
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            with self.assertRaises(ValueError):
+                scan_label_dirs_for_roots([Path(d) / "missing"], num_workers=2)
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
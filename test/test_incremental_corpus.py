@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import tempfile
+from pathlib import Path
+
+from project.load_text_data import load_text_and_label_id_from_files
+from project.incremental_corpus import refresh_corpus
+from project.incremental_corpus import load_corpus
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+def create_test_files(root_dir):
+    """
+    Create test files under root_dir.
+    """
+    files = {"apple/granny_smith_apple.txt": "Granny Smith apples are green.",
+             "apple/fuji_apple.txt": "Fuji apples are red.",
+             "apple/golden_delicious.txt": "I love Golden Delicious apples.",
+             "cherry/bing_cherry.txt": "Bing cherries are popular.",
+             "cherry/rainier_cherry.txt": "Rainer cherries are in season right now."}
+
+    for f, text in files.items():
+        text_path = root_dir / Path(f)
+        text_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(text_path, "w") as fh:
+            fh.write(text)
+
+
+class TestIncrementalCorpus(unittest.TestCase):
+
+    def assert_same_text(self, actual, expected):
+        """
+        Assert that the text and label strings of two datasets are the same.
+        """
+        for i in range(2):
+            actual_samples = [(x, actual[2][1][y]) for x, y in zip(actual[i][0], actual[i][1])]
+            expected_samples = [(x, expected[2][1][y]) for x, y in zip(expected[i][0], expected[i][1])]
+            result = actual_samples == expected_samples
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual_samples, expected_samples))
+
+    def test_refresh_corpus(self):
+        """
+        Test refreshing the corpus after adding, changing and removing files
+        """
+        for use_content_hash in [False, True]:
+            with tempfile.TemporaryDirectory() as d:
+                root_dir = Path(d) / "data"
+                cache_dir = Path(d) / "cache"
+                create_test_files(root_dir)
+
+                added, changed, removed = refresh_corpus(root_dir, cache_dir, use_content_hash=use_content_hash)
+                expected = (5, 0, 0)
+                actual = (len(added), len(changed), len(removed))
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+                self.assert_same_text(load_corpus(cache_dir), load_text_and_label_id_from_files(root_dir))
+                label_to_id = load_corpus(cache_dir)[2][0]
+
+                # Add, change and remove files
+                with open(root_dir / "apple" / "gala.txt", "w") as fh:
+                    fh.write("Gala apples are my favorite.")
+                with open(root_dir / "apple" / "fuji_apple.txt", "w") as fh:
+                    fh.write("Fuji apples are sweet and crisp.")
+                (root_dir / "cherry" / "bing_cherry.txt").unlink()
+                (root_dir / "banana").mkdir()
+                for name in ["banana.txt", "cavendish.txt"]:
+                    with open(root_dir / "banana" / name, "w") as fh:
+                        fh.write("Bananas are good for breakfast.")
+
+                added, changed, removed = refresh_corpus(root_dir, cache_dir, use_content_hash=use_content_hash)
+                expected = ({"apple/gala.txt", "banana/banana.txt", "banana/cavendish.txt"},
+                            ["apple/fuji_apple.txt"], ["cherry/bing_cherry.txt"])
+                actual = (set(added), changed, removed)
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+                actual = load_corpus(cache_dir)
+                self.assert_same_text(actual, load_text_and_label_id_from_files(root_dir))
+
+                # Existing label IDs are kept
+                for label, id in label_to_id.items():
+                    result = actual[2][0][label] == id
+                    self.assertTrue(result, "Label ID for %s changed." % (label))
+
+                # Nothing to do
+                index_mtime_ns = (cache_dir / "index.json").stat().st_mtime_ns
+                added, changed, removed = refresh_corpus(root_dir, cache_dir, use_content_hash=use_content_hash)
+                expected = (0, 0, 0)
+                actual = (len(added), len(changed), len(removed))
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+                result = (cache_dir / "index.json").stat().st_mtime_ns == index_mtime_ns
+                self.assertTrue(result, "Index is saved without changes")
+
+    def test_compact(self):
+        """
+        Test that compaction replaces the text blob with one of the next generation
+        """
+        with tempfile.TemporaryDirectory() as d:
+            root_dir = Path(d) / "data"
+            cache_dir = Path(d) / "cache"
+            create_test_files(root_dir)
+            refresh_corpus(root_dir, cache_dir)
+
+            # Replace text with shorter text so that removed text exceeds live text
+            for text_path in root_dir.glob("*/*.txt"):
+                with open(text_path, "w") as fh:
+                    fh.write("%s." % (text_path.stem))
+                os.utime(text_path, ns=(0, 0))
+            refresh_corpus(root_dir, cache_dir)
+
+            expected = ["text.1.bin"]
+            actual = sorted([p.name for p in cache_dir.glob("text*.bin")])
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            self.assert_same_text(load_corpus(cache_dir), load_text_and_label_id_from_files(root_dir))
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
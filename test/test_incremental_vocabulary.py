@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import tempfile
+from pathlib import Path
+
+from project.text_to_id import map_word_list_to_vocabulary
+from project.incremental_vocabulary import create_incremental_vocabulary
+from project.incremental_vocabulary import load_incremental_vocabulary
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+WORD_LIST = ["apple", "banana", "apple", "coconut", "apple", "banana", "date"]
+NEW_WORD_LIST = ["fig", "grape", "fig", "apple", "kiwi", "grape", "fig"]
+
+
+class TestIncrementalVocabulary(unittest.TestCase):
+
+    def test_update(self):
+        """
+        Test that existing IDs stay the same and new words get new IDs
+        """
+        vocabulary = create_incremental_vocabulary(WORD_LIST, 3, min_count=2)
+
+        expected = map_word_list_to_vocabulary(WORD_LIST, 3)[5]
+        actual = vocabulary.word_to_id
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        old_word_to_id = dict(vocabulary.word_to_id)
+        new_words = vocabulary.update(NEW_WORD_LIST)
+
+        expected = ["fig", "grape"]  # kiwi occurs only once
+        actual = new_words
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        for w, id in old_word_to_id.items():
+            self.assertTrue(vocabulary.word_to_id[w] == id, "ID of %s changed" % (w))
+
+        expected = [6, 7]
+        actual = [vocabulary.word_to_id[w] for w in new_words]
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        new_words = vocabulary.update(["kiwi", "lemon", "lemon"])
+        expected = ["kiwi", "lemon"]
+        actual = new_words
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_default_min_count(self):
+        """
+        Test that words rarer than the top vocabulary are not added by default
+        """
+        vocabulary = create_incremental_vocabulary(WORD_LIST, 2)  # apple (3) and banana (2)
+        new_words = vocabulary.update(["zz", "e", "qq"])
+
+        expected = ([], 5)
+        actual = (new_words, len(vocabulary))
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        new_words = vocabulary.update(["zz", "kiwi"])  # zz reaches the count of banana
+
+        expected = ["zz"]
+        actual = new_words
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_max_vocabulary_size(self):
+        """
+        Test that no word is added beyond the maximum size
+        """
+        vocabulary = create_incremental_vocabulary(WORD_LIST, 3, max_vocabulary_size=7)
+        new_words = vocabulary.update(NEW_WORD_LIST)
+
+        expected = ["fig"]
+        actual = new_words
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_compact(self):
+        """
+        Test that compaction matches rebuilding from all words and remaps old IDs
+        """
+        vocabulary = create_incremental_vocabulary(WORD_LIST, 3)
+        vocabulary.update(NEW_WORD_LIST)
+        old_word_to_id = dict(vocabulary.word_to_id)
+
+        old_id_to_new_id = vocabulary.compact(top_vocabulary_size=4)
+
+        expected = map_word_list_to_vocabulary(WORD_LIST + NEW_WORD_LIST, 4)[5]
+        actual = vocabulary.word_to_id
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        for w, old_id in old_word_to_id.items():
+            new_id = old_id_to_new_id[old_id]
+            expected = vocabulary.word_to_id.get(w, 0)
+            self.assertTrue(new_id == expected, "ID of %s is not remapped" % (w))
+
+    def test_save_and_load(self):
+        """
+        Test saving and loading a vocabulary
+        """
+        vocabulary = create_incremental_vocabulary(WORD_LIST, 3, min_count=2)
+        vocabulary.update(NEW_WORD_LIST)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "vocabulary.json.gz"
+            vocabulary.save(path)
+            loaded = load_incremental_vocabulary(path)
+
+        expected = (vocabulary.word_count, vocabulary.word_to_id, vocabulary.min_count)
+        actual = (loaded.word_count, loaded.word_to_id, loaded.min_count)
+        result = actual == expected and list(actual[0]) == list(expected[0])
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
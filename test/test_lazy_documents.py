@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import tempfile
+from pathlib import Path
+
+from project.lazy_documents import LazyDocumentList
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+class TestLazyDocuments(unittest.TestCase):
+
+    def test_lru_cache(self):
+        """
+        Test that decoded text is cached up to cache_size documents
+        """
+        with tempfile.TemporaryDirectory() as d:
+            paths = list()
+            for i in range(3):
+                path = Path(d) / ("%d.txt" % (i))
+                with open(path, "w") as fh:
+                    fh.write("Document %d" % (i))
+                paths.append(path)
+
+            documents = LazyDocumentList(paths, [0, 1, 2], cache_size=2)
+
+            expected = ["Document 0", "Document 1", "Document 2"]
+            actual = list(documents)
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            expected = [paths[1], paths[2]]
+            actual = list(documents.cache.keys())
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            # A cached document is returned even after the file is removed
+            paths[2].unlink()
+            expected = "Document 2"
+            actual = documents[2]
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            subset = documents[1:]
+            result = subset.cache is documents.cache and subset.handle(0).label == 1
+            self.assertTrue(result, "Slice does not share the cache.")
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import tempfile
+import tarfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+from project.load_text_data import load_text_from_files
+from project.load_text_data import load_text_and_label_id_from_files
+from project.load_text_data import load_text_and_label_id_from_training_and_test_dirs
+from project.load_archive_data import load_text_from_archive
+from project.load_archive_data import load_text_and_label_id_from_archive
+from project.load_archive_data import load_text_and_label_id_from_archive_training_and_test_dirs
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+def create_test_files(root_dir):
+    """
+    Create test files under root_dir.
+
+    Returns
+    -------
+    file_list: list of pathlib.Path
+        List of files in the order the directory loaders read them.
+    """
+    files = {"apple/granny_smith_apple.txt": "Granny Smith apples are green.",
+             "apple/fuji_apple.txt": "Fuji apples are red.\r\nThey are sweet.",
+             "apple/golden_delicious.txt": "I love Golden Delicious apples.",
+             "banana/banana.txt": "Bananas are good for breakfast.",
+             "cherry/bing_cherry.txt": "Bing cherries are popular.",
+             "cherry/rainier_cherry.txt": "Rainer cherries are in season right now."}
+
+    for f, text in files.items():
+        text_path = root_dir / Path(f)
+        text_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(text_path, "w", newline="") as fh:
+            fh.write(text)
+
+    return [f for label_dir in root_dir.iterdir() for f in label_dir.glob("*")]
+
+
+class TestLoadArchiveData(unittest.TestCase):
+
+    def test_load_text_and_label_id_from_archive(self):
+        """
+        Test loading text from tar.gz and zip archives
+        """
+        with tempfile.TemporaryDirectory() as d:
+            root_dir = Path(d) / "20news"
+            file_list = create_test_files(root_dir)
+
+            # Members the directory loaders would skip
+            stray_path = Path(d) / "README"
+            with open(stray_path, "w") as fh:
+                fh.write("Not a sample.")
+            stray_members = [(stray_path, "20news/README"), (stray_path, "20news/apple/nested/README"),
+                             (stray_path, "__MACOSX/20news/apple/._fuji_apple.txt")]
+
+            tar_path = Path(d) / "data.tar.gz"
+            with tarfile.open(tar_path, "w:gz") as tf:
+                for f in file_list:
+                    tf.add(f, arcname=str(f.relative_to(d)))
+                for f, arcname in stray_members:
+                    tf.add(f, arcname=arcname)
+
+            zip_path = Path(d) / "data.zip"
+            with zipfile.ZipFile(zip_path, "w") as zf:
+                for f, arcname in stray_members:
+                    zf.write(f, arcname=arcname)
+                for f in file_list:
+                    zf.write(f, arcname=str(f.relative_to(d)))
+
+            expected = load_text_and_label_id_from_files(root_dir, test_dataset_ratio=0.2)
+            expected_text = load_text_from_files(root_dir, test_dataset_ratio=0.2)
+
+            for archive_path, root in [(tar_path, "20news"), (zip_path, "20news"), (tar_path, None), (zip_path, None)]:
+                actual = load_text_and_label_id_from_archive(archive_path, root=root, test_dataset_ratio=0.2)
+
+                result = actual[0][0] == expected[0][0] and actual[1][0] == expected[1][0]
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+                result = np.array_equal(actual[0][1], expected[0][1]) and np.array_equal(actual[1][1], expected[1][1])
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+                result = actual[2] == expected[2]
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+                actual = load_text_from_archive(archive_path, root=root, test_dataset_ratio=0.2)
+                result = actual == expected_text
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected_text))
+
+    def test_training_and_test_dirs(self):
+        """
+        Test loading training and test trees from one archive
+        """
+        with tempfile.TemporaryDirectory() as d:
+            training_dir = Path(d) / "train"
+            test_dir = Path(d) / "test"
+            file_list = create_test_files(training_dir) + create_test_files(test_dir)
+
+            tar_path = Path(d) / "data.tar"
+            with tarfile.open(tar_path, "w") as tf:
+                for f in file_list:
+                    tf.add(f, arcname=str(f.relative_to(d)))
+
+            expected = load_text_and_label_id_from_training_and_test_dirs(training_dir, test_dir)
+            actual = load_text_and_label_id_from_archive_training_and_test_dirs(tar_path, "train", "test")
+
+            for i in range(2):
+                actual_samples = [(x, actual[2][1][y]) for x, y in zip(actual[i][0], actual[i][1])]
+                expected_samples = [(x, expected[2][1][y]) for x, y in zip(expected[i][0], expected[i][1])]
+                result = sorted(actual_samples) == sorted(expected_samples)
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual_samples, expected_samples))
+
+            # Training and test directories are not label directories, so they are not merged
+            with self.assertRaises(ValueError):
+                load_text_and_label_id_from_archive(tar_path)
+
+    def test_unsupported_archive(self):
+        """
+        Test loading a file that is not an archive
+        """
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "data.txt"
+            with open(path, "w") as fh:
+                fh.write("Not an archive.")
+
+            with self.assertRaises(ValueError):
+                load_text_and_label_id_from_archive(path)
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
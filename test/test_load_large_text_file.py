@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import tempfile
+from pathlib import Path
+
+from project.load_large_text_file import MappedTextFile
+from project.load_large_text_file import split_records
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+class TestLoadLargeTextFile(unittest.TestCase):
+
+    def test_iterate_records_by_line(self):
+        """
+        Test splitting a file into lines
+        """
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "docs.txt"
+            with open(path, "wb") as fh:
+                fh.write("Granny Smith apples are green.\nFuji apples are red.\n\nCafé au lait".encode("utf-8"))
+
+            with MappedTextFile(path) as f:
+                records = list(f.iterate_records(label="fruit"))
+
+                actual = [text for text, _ in f.iterate_text(records)]
+                expected = ["Granny Smith apples are green.", "Fuji apples are red.", "Café au lait"]
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+                actual = records[1]
+                expected = ("fruit", 31, 20)
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+    def test_iterate_records_with_label(self):
+        """
+        Test splitting a file by a delimiter with a label at the beginning of each document
+        """
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "docs.txt"
+            docs = ["apple\tGranny Smith apples are green.",
+                    "apple\tFuji apples are red.\nThey are sweet.",
+                    "apple\tI love Golden Delicious apples.",
+                    "banana\tBananas are good for breakfast.",
+                    "cherry\tBing cherries are popular.",
+                    "cherry\tRainer cherries are in season right now."]
+            with open(path, "wb") as fh:
+                fh.write("\n###\n".join(docs).encode("utf-8"))
+
+            with MappedTextFile(path) as f:
+                records = list(f.iterate_records(delimiter=b"\n###\n", label_separator=b"\t"))
+                (training_records, test_records), (label_to_id, id_to_label) = split_records(records, 0.2)
+
+                actual = [f.read(r) for r in training_records]
+                expected = ["Granny Smith apples are green.", "Fuji apples are red.\nThey are sweet.",
+                            "Bing cherries are popular."]
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+                actual = [(f.read(r), r.label) for r in test_records]
+                expected = [("I love Golden Delicious apples.", "apple"),
+                            ("Rainer cherries are in season right now.", "cherry")]
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+                actual = label_to_id
+                expected = {"apple": 0, "cherry": 1}
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+    def test_empty_file(self):
+        """
+        Test an empty file
+        """
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "docs.txt"
+            path.touch()
+
+            with MappedTextFile(path) as f:
+                actual = list(f.iterate_records())
+                expected = []
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
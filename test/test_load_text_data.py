@@ -16,6 +16,9 @@ import numpy as np
 from project.load_text_data import load_text_from_files
 from project.load_text_data import load_text_and_label_id_from_files
 from project.load_text_data import load_text_and_label_id_from_training_and_test_dirs
+from project.load_text_data import stream_text_and_label_id_from_files
+from project.load_text_data import stream_text_and_label_id_from_training_and_test_dirs
+from project.load_text_data import compute_num_training_samples
 
 from project.text_to_id import map_label_to_id
 
@@ -320,6 +323,144 @@ class TestLoadTextData(unittest.TestCase):
         result = actual == expected
         self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
 
+    def test_load_text_and_label_id_from_files_parallel(self):
+        """
+        Test loading text with a thread pool and a process pool
+        """
+        create_test_files()
+
+        expected = load_text_and_label_id_from_files(TEST_DATA_DIR, test_dataset_ratio=0.2)
+
+        for use_process_pool in [False, True]:
+            actual = load_text_and_label_id_from_files(TEST_DATA_DIR, test_dataset_ratio=0.2, num_workers=4,
+                                                       use_process_pool=use_process_pool)
+
+            result = actual[0][0] == expected[0][0] and actual[1][0] == expected[1][0]
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+            result = np.array_equal(actual[0][1], expected[0][1]) and np.array_equal(actual[1][1], expected[1][1])
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+            result = actual[2] == expected[2]
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_stream_text_and_label_id_from_files(self):
+        """
+        Test streaming text
+        """
+        create_test_files()
+
+        (x_train, y_train), (x_test, y_test), (label_to_id, id_to_label) = load_text_and_label_id_from_files(
+            TEST_DATA_DIR, test_dataset_ratio=0.2)
+
+        (training_stream, test_stream), (label_to_id_stream, _) = stream_text_and_label_id_from_files(
+            TEST_DATA_DIR, test_dataset_ratio=0.2)
+
+        expected = list(zip(x_train, y_train))
+        actual = list(training_stream)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        expected = list(zip(x_test, y_test))
+        actual = list(test_stream)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        result = label_to_id_stream == label_to_id
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+            label_to_id_stream, label_to_id))
+
+    def test_stream_text_and_label_id_from_separate_dirs_batch(self):
+        """
+        Test streaming text in batches
+        """
+        create_test_files_training_test()
+
+        (x_train, y_train), (x_test, y_test), _ = load_text_and_label_id_from_training_and_test_dirs(
+            TEST_DATA_DIR_SEPARATE_TRAINING, TEST_DATA_DIR_SEPARATE_TEST)
+
+        (training_stream, test_stream), _ = stream_text_and_label_id_from_training_and_test_dirs(
+            TEST_DATA_DIR_SEPARATE_TRAINING, TEST_DATA_DIR_SEPARATE_TEST, batch_size=3)
+
+        batches = list(training_stream)
+
+        expected = [3, 3, 2]
+        actual = [len(b[0]) for b in batches]
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        actual = tuple([text for b in batches for text in b[0]])
+        expected = x_train
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        actual = np.concatenate([b[1] for b in batches])
+        expected = y_train
+        result = np.array_equal(actual, expected)
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        actual = tuple([text for b in test_stream for text in b[0]])
+        expected = x_test
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_load_text_and_label_id_from_files_corpus(self):
+        """
+        Test loading text as Corpus
+        """
+        create_test_files()
+
+        (x_train, y_train), (x_test, y_test), _ = load_text_and_label_id_from_files(TEST_DATA_DIR,
+                                                                                  test_dataset_ratio=0.2)
+        (x_train_c, y_train_c), (x_test_c, y_test_c), _ = load_text_and_label_id_from_files(
+            TEST_DATA_DIR, test_dataset_ratio=0.2, return_corpus=True)
+
+        result = tuple(x_train_c) == x_train and tuple(x_test_c) == x_test
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+            list(x_train_c), x_train))
+
+        result = np.array_equal(x_train_c.labels, y_train) and np.array_equal(x_test_c.labels, y_test)
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+            x_train_c.labels, y_train))
+
+        (x_train, y_train), (x_test, y_test) = load_text_from_files(TEST_DATA_DIR, test_dataset_ratio=0.2)
+        (x_train_c, y_train_c), (x_test_c, y_test_c) = load_text_from_files(
+            TEST_DATA_DIR, test_dataset_ratio=0.2, num_workers=2, return_corpus=True)
+
+        result = tuple(x_train_c) == x_train and tuple(x_test_c) == x_test and tuple(x_test_c.labels) == y_test
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+            list(x_test_c), x_test))
+
+    def test_load_text_and_label_id_from_files_lazy(self):
+        """
+        Test loading document handles and reading text on access
+        """
+        create_test_files()
+
+        (x_train, y_train), (x_test, y_test), _ = load_text_and_label_id_from_files(TEST_DATA_DIR,
+                                                                                  test_dataset_ratio=0.2)
+        (x_train_l, y_train_l), (x_test_l, y_test_l), _ = load_text_and_label_id_from_files(
+            TEST_DATA_DIR, test_dataset_ratio=0.2, lazy=True, cache_size=2)
+
+        result = tuple(x_train_l) == x_train and tuple(x_test_l) == x_test
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+            list(x_train_l), x_train))
+
+        handle = x_train_l.handle(0)
+        result = handle.path.exists() and handle.label == y_train[0]
+        self.assertTrue(result, "Invalid handle %s" % (str(handle)))
+
+    def test_compute_num_training_samples(self):
+        """
+        Test the number of training samples for a label
+        """
+        expected = [None, 1, 8, 10, 1]
+        actual = [compute_num_training_samples(1, 0.2), compute_num_training_samples(2, 0.2),
+                  compute_num_training_samples(10, 0.2), compute_num_training_samples(10, 0.0),
+                  compute_num_training_samples(1, 0.0)]
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
 def main():
     """Invoke test function"""
 
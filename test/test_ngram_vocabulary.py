@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import random
+import collections
+
+import numpy as np
+
+from project.text_to_id import map_text_to_word_list
+from project.text_to_id import map_word_list_to_ngram_list
+from project.text_to_id import map_word_list_to_vocabulary
+from project.text_to_id import map_text_to_token_matrix
+from project.ngram_vocabulary import PrunedCounter
+from project.ngram_vocabulary import build_ngram_vocabulary
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+class TestNgramVocabulary(unittest.TestCase):
+
+    def test_ngram_list(self):
+        """
+        Test expanding a word list to n-grams
+        """
+        expected = ["a", "b", "c", "a b", "b c", "a b c"]
+        actual = map_word_list_to_ngram_list(["a", "b", "c"], 3)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_build_ngram_vocabulary(self):
+        """
+        Test that the vocabulary matches the one from all n-grams when nothing is pruned
+        """
+        random.seed(0)
+        words = ["apple", "banana", "coconut", "date"]
+        text_list = [" ".join(random.choice(words) for _ in range(random.randint(1, 10))) for _ in range(50)]
+
+        all_ngrams = list()
+        for text in text_list:
+            all_ngrams += map_word_list_to_ngram_list(map_text_to_word_list(text), 2)
+
+        expected = map_word_list_to_vocabulary(all_ngrams, 10)
+        actual = build_ngram_vocabulary(text_list, 10, max_order=2)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        word_to_id = actual[5]
+        id_to_word = actual[6]
+        x, _ = map_text_to_token_matrix(text_list, ["a"] * len(text_list), 10, 3, 1, {"a": 0}, word_to_id,
+                                        sparse=True, max_ngram_order=2)
+        total_unknown = 0
+        for i, text in enumerate(text_list):
+            ngram_count = collections.Counter(map_word_list_to_ngram_list(map_text_to_word_list(text), 2))
+            for g, id in word_to_id.items():
+                if id == 0:  # Shared with unknown n-grams
+                    continue
+                self.assertTrue(x[i, id] == ngram_count[g], "Count of %s does not match" % (g))
+
+            # Unknown n-grams are counted in ID 0 in the same way as unknown words
+            num_unknown = sum([c for g, c in ngram_count.items() if g not in word_to_id])
+            expected = ngram_count[id_to_word[0]] + num_unknown
+            actual = x[i, 0]
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+            total_unknown += num_unknown
+
+        self.assertTrue(total_unknown > 0, "No unknown n-gram is tested")
+
+    def test_prune(self):
+        """
+        Test that the counter stays within its budget and keeps frequent n-grams
+        """
+        random.seed(0)
+        counter = PrunedCounter(100)
+        true_count = collections.Counter()
+        for _ in range(500):
+            ngram_list = ["g%d" % (int(random.paretovariate(1.0))) for _ in range(10)] + \
+                         ["rare%d" % (random.randint(0, 1000000))]
+            counter.update(ngram_list)
+            true_count.update(ngram_list)
+            self.assertTrue(len(counter) <= 100, "Counter exceeds max_size")
+
+        for g, count in counter.counts.items():
+            result = true_count[g] - counter.error_bound <= count <= true_count[g]
+            self.assertTrue(result, "Count of %s is out of bounds" % (g))
+
+        expected = [g for g, _ in true_count.most_common(3)]
+        actual = sorted(counter.counts, key=lambda g: counter.counts[g], reverse=True)[:3]
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_prune_ties(self):
+        """
+        Test that entries with the same count are kept in the order of first occurrence
+        """
+        counter = PrunedCounter(4)
+        counter.update(list("abcde"))
+
+        expected = ({"a": 1, "b": 1}, 1)
+        actual = (counter.counts, counter.error_bound)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        counter.update(list("aaccddde"))  # a: 3, b: 1, c: 2, d: 3, e: 1
+
+        expected = ({"a": 3, "d": 3}, 3)
+        actual = (counter.counts, counter.error_bound)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from project.split_manifest import create_split
+from project.split_manifest import create_split_from_dir
+from project.split_manifest import compute_split_digest
+from project.split_manifest import save_split_manifest
+from project.split_manifest import load_split_manifest
+from project.split_manifest import load_text_and_label_id_from_split
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+
+class TestSplitManifest(unittest.TestCase):
+
+    def test_split_does_not_depend_on_order(self):
+        """
+        Test that the split is the same regardless of the order of labels and files
+        """
+        file_names = ["%d.txt" % (i) for i in range(10)]
+        label_file_names = [("banana", file_names), ("apple", file_names[:5]), ("cherry", ["only.txt"])]
+        reversed_label_file_names = [(label, list(reversed(f))) for label, f in reversed(label_file_names)]
+
+        split = create_split(label_file_names, test_dataset_ratio=0.2)
+        actual = create_split(reversed_label_file_names, test_dataset_ratio=0.2)
+
+        result = actual == split
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, split))
+
+        expected = (12, 3, {"apple": 0, "banana": 1})
+        actual = (len(split["training"]), len(split["test"]), split["label_to_id"])
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        # A different seed gives a different split with the same sizes
+        other = create_split(label_file_names, test_dataset_ratio=0.2, seed=1)
+        result = compute_split_digest(other) != compute_split_digest(split) and len(other["test"]) == 3
+        self.assertTrue(result, "Seed is not used.")
+
+    def test_save_and_load(self):
+        """
+        Test saving and loading a split manifest, and loading text from it
+        """
+        with tempfile.TemporaryDirectory() as d:
+            root_dir = Path(d) / "data"
+            files = {"apple/granny_smith_apple.txt": "Granny Smith apples are green.",
+                     "apple/fuji_apple.txt": "Fuji apples are red.",
+                     "apple/golden_delicious.txt": "I love Golden Delicious apples.",
+                     "banana/banana.txt": "Bananas are good for breakfast.",
+                     "cherry/bing_cherry.txt": "Bing cherries are popular.",
+                     "cherry/rainier_cherry.txt": "Rainer cherries are in season right now."}
+            for f, text in files.items():
+                text_path = root_dir / Path(f)
+                text_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(text_path, "w") as fh:
+                    fh.write(text)
+
+            split = create_split_from_dir(root_dir, test_dataset_ratio=0.2)
+            path = Path(d) / "split.json.gz"
+            save_split_manifest(path, split)
+            actual = load_split_manifest(path)
+
+            result = compute_split_digest(actual) == compute_split_digest(split)
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, split))
+
+            (x_train, y_train), (x_test, y_test), (label_to_id, id_to_label) = load_text_and_label_id_from_split(
+                root_dir, actual)
+
+            actual = sorted(zip(x_train + x_test, [id_to_label[i] for i in np.concatenate([y_train, y_test])]))
+            expected = sorted([(text, f.split("/")[0]) for f, text in files.items() if f.startswith("banana") is False])
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            result = len(x_test) == 2
+            self.assertTrue(result, "Invalid number of test samples: %d" % (len(x_test)))
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import threading
+import concurrent.futures
+
+import numpy as np
+
+from project.text_to_id import map_text_to_padded_word_id
+from project.corpus import build_corpus
+from project.text_sequence import TextSequence
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+TEXT_LIST = ["apple banana coconut %d" % (i) for i in range(10)] + ["banana", "", "apple fig grape kiwi lemon"]
+LABELS = ["a", "b", "c"] * 4 + ["a"]
+LABEL_TO_ID = {"a": 0, "b": 1, "c": 2}
+WORD_TO_ID = {"apple": 3, "banana": 4, "coconut": 5, "<UNK>": 6, "<EOS>": 7, "<PAD>": 8}
+
+
+class TestTextSequence(unittest.TestCase):
+
+    def test_batches(self):
+        """
+        Test that batches match the padded matrix of all text
+        """
+        x_expected, y_expected = map_text_to_padded_word_id(TEXT_LIST, LABELS, 4, 3, LABEL_TO_ID, WORD_TO_ID,
+                                                            padding="post")
+        label_ids = np.array([LABEL_TO_ID[label] for label in LABELS])
+
+        for text_list in [TEXT_LIST, build_corpus(TEXT_LIST)]:
+            sequence = TextSequence(text_list, label_ids, WORD_TO_ID, 4, batch_size=5, num_labels=3, shuffle=False,
+                                    padding="post")
+
+            expected = 3
+            actual = len(sequence)
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            batches = [sequence[i] for i in range(len(sequence))]
+            x_actual = np.concatenate([x for x, _ in batches])
+            y_actual = np.concatenate([y for _, y in batches])
+            result = np.array_equal(x_actual, x_expected) and np.array_equal(y_actual, y_expected)
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                x_actual, x_expected))
+            sequence.close()
+
+    def test_shuffle(self):
+        """
+        Test that each epoch covers all text in a new order
+        """
+        corpus = build_corpus(TEXT_LIST, [LABEL_TO_ID[label] for label in LABELS])
+        x_all, _ = map_text_to_padded_word_id(TEXT_LIST, LABELS, 4, 3, LABEL_TO_ID, WORD_TO_ID)
+        sequence = TextSequence(corpus, None, WORD_TO_ID, 4, batch_size=4, seed=0)
+
+        orders = list()
+        for epoch in range(2):
+            order = np.array(sequence.order)
+            batches = [sequence[i] for i in range(len(sequence))]
+            x = np.concatenate([x for x, _ in batches])
+            y = np.concatenate([y for _, y in batches])
+
+            result = np.array_equal(x, x_all[order]) and np.array_equal(y, corpus.labels[order])
+            self.assertTrue(result, "Batches do not follow the shuffled order")
+
+            orders.append(order)
+            sequence.on_epoch_end()
+
+        result = np.array_equal(orders[0], orders[1]) is False and sorted(orders[0]) == list(range(len(TEXT_LIST)))
+        self.assertTrue(result, "Order is not shuffled")
+        sequence.close()
+
+    def test_concurrent_access(self):
+        """
+        Test requesting batches from multiple threads and stopping the threads on exit
+        """
+        x_expected, _ = map_text_to_padded_word_id(TEXT_LIST, LABELS, 4, 3, LABEL_TO_ID, WORD_TO_ID)
+        label_ids = np.array([LABEL_TO_ID[label] for label in LABELS])
+
+        with TextSequence(TEXT_LIST, label_ids, WORD_TO_ID, 4, batch_size=2, shuffle=False) as sequence:
+            for _ in range(10):
+                with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                    batches = list(executor.map(sequence.__getitem__, range(len(sequence))))
+
+                x_actual = np.concatenate([x for x, _ in batches])
+                result = np.array_equal(x_actual, x_expected)
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    x_actual, x_expected))
+
+        result = sequence.executor is None and np.array_equal(sequence[0][0], x_expected[:2])
+        self.assertTrue(result, "Background threads are not stopped")
+
+    def test_close_while_waiting(self):
+        """
+        Test that a batch is still returned when close cancels the batch being waited for
+        """
+        x_expected, _ = map_text_to_padded_word_id(TEXT_LIST, LABELS, 4, 3, LABEL_TO_ID, WORD_TO_ID)
+        label_ids = np.array([LABEL_TO_ID[label] for label in LABELS])
+        sequence = TextSequence(TEXT_LIST, label_ids, WORD_TO_ID, 4, batch_size=2, shuffle=False, num_workers=1)
+
+        event = threading.Event()
+        sequence.executor.submit(event.wait)  # Keep the only worker busy so that batches stay queued
+
+        batches = list()
+        thread = threading.Thread(target=lambda: batches.append(sequence[0]))
+        thread.start()
+        while thread.is_alive() and 1 not in sequence.futures:  # Batch 0 is popped and waited for
+            thread.join(0.001)
+
+        closing_thread = threading.Thread(target=sequence.close)
+        closing_thread.start()
+        thread.join(5)
+        event.set()
+        closing_thread.join()
+
+        result = len(batches) == 1 and np.array_equal(batches[0][0], x_expected[:2])
+        self.assertTrue(result, "Batch is not returned after close")
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
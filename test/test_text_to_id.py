@@ -10,18 +10,63 @@ __email__ = "hideyuki@gmail.com"
 import unittest
 import os
 import logging
+import re
+import random
 from pathlib import Path
 
 import numpy as np
 
 from project.text_to_id import map_label_to_id
 from project.text_to_id import map_text_to_word_list
+from project.text_to_id import Tokenizer
+from project.text_to_id import tokenize_text_list
+from project.text_to_id import map_text_list_to_word_list
+from project.text_to_id import map_text_to_word_id
+from project.text_to_id import map_word_list_to_vocabulary
+from project.text_to_id import build_vocabulary
+from project.text_to_id import map_text_to_token_matrix
+from project.text_to_id import map_text_to_padded_word_id
+from project.text_to_id import map_text_to_ragged_word_id
+from project.text_to_id import map_label_list_to_label_id
+from project.text_to_id import hash_word
+from project.text_to_id import map_text_to_hashed_token_matrix
+from project.text_to_id import iterate_hashed_token_matrices
+from project.corpus import build_corpus
 
 log = logging.getLogger(__name__)
 logging.basicConfig(
     level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
 
 
+def map_text_to_word_list_reference(text, filters='!"#$%&()*+,-./:;<=>?@[]^_`{|}~\'', separator_list=None):
+    """
+    Original regex-based implementation of map_text_to_word_list to verify Tokenizer against.
+    """
+    re_special_characters = "-.*+?^$|[]()\\"
+
+    escaped_filter_char_list = list()
+    for c in list(filters):
+        if c in re_special_characters:
+            c = "\\" + c
+        escaped_filter_char_list.append(c)
+
+    adjusted_filter = "[" + "|".join(escaped_filter_char_list) + "]"
+    if separator_list is None:
+        separator_list = ["\n", " "]
+
+    first_separator = separator_list[0]
+
+    for i, s in enumerate(separator_list):
+        if i == 0:
+            continue
+        text = text.replace(s, first_separator)
+
+    text = re.compile(first_separator + "+").sub(first_separator, text)
+    text = re.compile(adjusted_filter).sub("", text)
+
+    return text.split(first_separator)
+
+
 class TestTextToIndex(unittest.TestCase):
 
     def test_label_to_id(self):
@@ -84,6 +129,246 @@ class TestTextToIndex(unittest.TestCase):
                             "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
 
 
+    def test_tokenizer_matches_reference(self):
+        """
+        Test that Tokenizer returns the same word list as the original implementation
+        """
+        random.seed(0)
+        alphabet = "ab \n\t|,.-_[]\\()é" + '!"#$%&*+/:;<=>?@^`{}~\''
+        text_list = ["".join(random.choice(alphabet) for _ in range(random.randint(0, 40))) for _ in range(500)]
+
+        settings = [('!"#$%&()*+,-./:;<=>?@[]^_`{|}~\'', None),
+                    (",.", ["\n", " ", "\t"]),
+                    ("-", [" ", "\n"]),
+                    ("a\\", [" ", "--", "\n"])]
+
+        for filters, separator_list in settings:
+            tokenizer = Tokenizer(filters=filters, separator_list=separator_list)
+            actual = tokenizer.tokenize_batch(text_list)
+            expected = [map_text_to_word_list_reference(text, filters, separator_list) for text in text_list]
+
+            result = actual == expected
+            self.assertTrue(result, "Tokenizer does not match reference for filters %s" % (filters))
+
+    def test_tokenize_text_list_parallel(self):
+        """
+        Test tokenizing text in a process pool
+        """
+        text_list = ["apple banana\ncoconut %d" % (i) for i in range(50)]
+        expected = [map_text_to_word_list(text) for text in text_list]
+
+        actual = tokenize_text_list(text_list, num_workers=2, chunk_size=7)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        word_list, offsets = tokenize_text_list(text_list, num_workers=2, chunk_size=7, flat=True)
+        actual = [word_list[offsets[i]:offsets[i + 1]] for i in range(len(text_list))]
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        actual = map_text_list_to_word_list(text_list, num_workers=2, chunk_size=7)
+        expected = map_text_list_to_word_list(text_list)
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_map_text_to_word_id_parallel(self):
+        """
+        Test mapping text to word IDs with a process pool
+        """
+        text_list = ["apple banana coconut", "banana date apple", "apple fig grape"] * 5
+        labels = ["a", "b", "a"] * 5
+        label_to_id = {"a": 0, "b": 1}
+        word_to_id = {"apple": 3, "banana": 4, "<UNK>": 0}
+
+        x_expected, y_expected = map_text_to_word_id(text_list, labels, 2, 3, 2, label_to_id, word_to_id)
+        x_actual, y_actual = map_text_to_word_id(text_list, labels, 2, 3, 2, label_to_id, word_to_id,
+                                                 num_workers=2, chunk_size=4)
+
+        result = x_actual.tolist() == x_expected.tolist() and np.array_equal(y_actual, y_expected)
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+            x_actual, x_expected))
+
+        x_actual, y_actual = map_text_to_word_id(build_corpus(text_list), labels, 2, 3, 2, label_to_id, word_to_id)
+
+        result = x_actual.tolist() == x_expected.tolist() and np.array_equal(y_actual, y_expected)
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+            x_actual, x_expected))
+
+    def test_tokenize_bytes(self):
+        """
+        Test that tokenizing UTF-8 bytes returns the same word list as tokenizing text
+        """
+        random.seed(0)
+        alphabet = "ab \n\t|,.-_[]\\()éü" + '!"#$%&*+/:;<=>?@^`{}~\''
+        text_list = ["".join(random.choice(alphabet) for _ in range(random.randint(0, 40))) for _ in range(500)]
+        byte_list = [text.encode("utf-8") for text in text_list]
+
+        settings = [('!"#$%&()*+,-./:;<=>?@[]^_`{|}~\'', None),
+                    (",.", ["\n", " ", "\t"]),
+                    ("a\\", [" ", "--", "\n"]),
+                    ("é", None)]  # Non-ASCII filter falls back to decoding
+
+        for filters, separator_list in settings:
+            tokenizer = Tokenizer(filters=filters, separator_list=separator_list)
+            expected = tokenizer.tokenize_batch(text_list)
+
+            actual = tokenizer.tokenize_bytes_batch(byte_list)
+            result = actual == expected
+            self.assertTrue(result, "tokenize_bytes does not match tokenize for filters %s" % (filters))
+
+            actual = tokenizer.tokenize_bytes_batch(byte_list, decode=False)
+            result = actual == [[w.encode("utf-8") for w in words] for words in expected]
+            self.assertTrue(result, "tokenize_bytes does not match tokenize for filters %s" % (filters))
+
+    def test_tokenize_corpus(self):
+        """
+        Test tokenizing a Corpus from its buffer
+        """
+        text_list = ["Café au lait, s'il vous plaît.\n%d" % (i) for i in range(50)]
+        corpus = build_corpus(text_list)
+        expected = [map_text_to_word_list(text) for text in text_list]
+
+        for num_workers in [None, 2]:
+            actual = tokenize_text_list(corpus, num_workers=num_workers, chunk_size=7)
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+    def test_build_vocabulary(self):
+        """
+        Test that building the vocabulary in a process pool matches building it from the word list
+        """
+        random.seed(0)
+        words = ["apple", "banana", "coconut", "date", "fig", "grape", "kiwi", "lemon"]
+        text_list = [" ".join(random.choice(words) for _ in range(random.randint(0, 10))) for _ in range(100)]
+        expected = map_word_list_to_vocabulary(map_text_list_to_word_list(text_list), 5)
+
+        for text in [text_list, build_corpus(text_list)]:
+            for num_workers in [None, 2]:
+                actual = build_vocabulary(text, 5, num_workers=num_workers, chunk_size=7)
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+    def test_sparse_token_matrix(self):
+        """
+        Test that the sparse token matrix matches the dense token matrix
+        """
+        text_list = ["apple banana apple coconut", "", "banana date apple banana", "fig"] * 3
+        labels = ["a", "b", "a", "b"] * 3
+        label_to_id = {"a": 0, "b": 1}
+        word_to_id = {"apple": 3, "banana": 4, "<UNK>": 0}
+
+        x_expected, y_expected = map_text_to_token_matrix(text_list, labels, 2, 3, 2, label_to_id, word_to_id)
+
+        for num_workers in [None, 2]:
+            x_actual, y_actual = map_text_to_token_matrix(text_list, labels, 2, 3, 2, label_to_id, word_to_id,
+                                                          num_workers=num_workers, chunk_size=5, sparse=True)
+
+            result = np.array_equal(x_actual.toarray(), x_expected) and np.array_equal(y_actual, y_expected)
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                x_actual.toarray(), x_expected))
+
+    def test_padded_word_id(self):
+        """
+        Test padding and truncating word IDs against lists padded one at a time
+        """
+        text_list = ["apple banana coconut date fig", "", "banana", "apple fig grape kiwi"]
+        labels = ["a", "b", "a", "b"]
+        label_to_id = {"a": 0, "b": 1}
+        word_to_id = {"apple": 3, "banana": 4, "coconut": 5, "<UNK>": 6, "<EOS>": 7, "<PAD>": 8}
+        word_id_lists = [[word_to_id.get(w, 0) for w in map_text_to_word_list(text)] for text in text_list]
+
+        (values, offsets), y = map_text_to_ragged_word_id(text_list, labels, 2, label_to_id, word_to_id)
+        actual = [values[offsets[i]:offsets[i + 1]].tolist() for i in range(len(text_list))]
+        expected = word_id_lists
+        result = actual == expected and values.dtype == np.int32
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        for padding in ["pre", "post"]:
+            for truncating in ["pre", "post"]:
+                expected = list()
+                for word_ids in word_id_lists:
+                    word_ids = word_ids[-3:] if truncating == "pre" else word_ids[:3]
+                    pad = [8] * (3 - len(word_ids))
+                    expected.append(pad + word_ids if padding == "pre" else word_ids + pad)
+
+                x, y = map_text_to_padded_word_id(text_list, labels, 3, 2, label_to_id, word_to_id,
+                                                  padding=padding, truncating=truncating)
+                actual = x.tolist()
+                result = actual == expected and x.dtype == np.int32
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+                expected = [[1, 0], [0, 1], [1, 0], [0, 1]]
+                actual = y.tolist()
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+    def test_label_id(self):
+        """
+        Test label ID vectors and one-hot matrices
+        """
+        labels = ["b", "a", "c", "a"]
+        label_to_id = {"a": 0, "b": 1, "c": 2}
+
+        expected = [1, 0, 2, 0]
+        actual = map_label_list_to_label_id(labels, 3, label_to_id)
+        result = actual.tolist() == expected and actual.dtype == np.int32
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        expected = np.eye(3, dtype=np.float32)[[1, 0, 2, 0]]
+        actual = map_label_list_to_label_id(labels, 3, label_to_id, one_hot=True)
+        result = np.array_equal(actual, expected) and actual.dtype == np.float32
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        text_list = ["apple banana", "banana", "apple apple", "fig"]
+        word_to_id = {"apple": 3, "banana": 4, "<UNK>": 0}
+        for sparse in [False, True]:
+            _, actual = map_text_to_token_matrix(text_list, labels, 2, 3, 3, label_to_id, word_to_id, sparse=sparse,
+                                                 one_hot_labels=False)
+            expected = [1, 0, 2, 0]
+            result = actual.tolist() == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+    def test_hashed_token_matrix(self):
+        """
+        Test vectorizing text with the hashing trick
+        """
+        text_list = ["apple banana apple coconut", "", "banana date apple banana", "fig"] * 3
+        labels = ["a", "b", "a", "b"] * 3
+        label_to_id = {"a": 0, "b": 1}
+
+        for alternate_sign in [False, True]:
+            expected = np.zeros((len(text_list), 16), dtype=np.float32)
+            for i, text in enumerate(text_list):
+                for w in map_text_to_word_list(text):
+                    h = hash_word(w)
+                    sign = -1.0 if alternate_sign and h >> 31 else 1.0
+                    expected[i, (h & 0x7fffffff) % 16] += sign
+
+            x, y = map_text_to_hashed_token_matrix(text_list, labels, 16, 2, label_to_id,
+                                                   alternate_sign=alternate_sign)
+            actual = x.toarray()
+            result = np.array_equal(actual, expected) and x.dtype == np.float32
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            batches = [text_list[i:i + 5] for i in range(0, len(text_list), 5)]
+            x_list = list(iterate_hashed_token_matrices(iter(batches), 16, alternate_sign=alternate_sign))
+            actual = np.concatenate([x.toarray() for x in x_list])
+            result = np.array_equal(actual, expected)
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+        expected = 2838417488  # CRC-32 of "apple", stable across processes
+        actual = hash_word("apple")
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+
 def main():
     """Invoke test function"""
 
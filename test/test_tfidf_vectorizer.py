@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import math
+
+import numpy as np
+
+from project.text_to_id import RESERVED_WORD_LIST
+from project.text_to_id import map_text_to_word_list
+from project.text_to_id import map_text_list_to_word_list
+from project.text_to_id import map_word_list_to_vocabulary
+from project.tfidf_vectorizer import TfidfVectorizer
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+TRAINING_TEXT_LIST = ["Apple banana apple.", "Banana coconut!", "apple date, fig", "grape apple banana"]
+TEST_TEXT_LIST = ["apple kiwi", "lemon", "banana banana coconut"]
+
+
+def compute_tfidf(text_list, training_text_list, word_to_id):
+    """
+    Compute a dense TF-IDF matrix one element at a time.
+    """
+    training_word_sets = [set(map_text_to_word_list(text)) for text in training_text_list]
+    num_documents = len(training_word_sets)
+
+    x = np.zeros((len(text_list), len(word_to_id)))
+    for i, text in enumerate(text_list):
+        for w in map_text_to_word_list(text):
+            if w in word_to_id:
+                x[i, word_to_id[w]] += 1
+
+        for w, id in word_to_id.items():
+            df = sum([1 for s in training_word_sets if w in s])
+            x[i, id] *= math.log((1 + num_documents) / (1 + df)) + 1
+
+        norm = np.linalg.norm(x[i])
+        if norm > 0:
+            x[i] /= norm
+
+    return x
+
+
+class TestTfidfVectorizer(unittest.TestCase):
+
+    def test_fit_transform(self):
+        """
+        Test TF-IDF of training and test dataset
+        """
+        vectorizer = TfidfVectorizer()
+        x_train = vectorizer.fit_transform(TRAINING_TEXT_LIST)
+        x_test = vectorizer.transform(TEST_TEXT_LIST)
+
+        word_to_id = map_word_list_to_vocabulary(map_text_list_to_word_list(TRAINING_TEXT_LIST), 100)[5]
+        expected = {w: id for w, id in word_to_id.items() if w not in RESERVED_WORD_LIST}  # No column of zeros
+        actual = vectorizer.word_to_id
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        for x, text_list in [(x_train, TRAINING_TEXT_LIST), (x_test, TEST_TEXT_LIST)]:
+            expected = compute_tfidf(text_list, TRAINING_TEXT_LIST, vectorizer.word_to_id)
+            actual = x.toarray()
+            result = np.allclose(actual, expected, atol=1e-6) and x.dtype == np.float32
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+    def test_word_to_id(self):
+        """
+        Test TF-IDF with a given vocabulary
+        """
+        word_to_id = {"apple": 0, "banana": 1, "<UNK>": 2}
+        vectorizer = TfidfVectorizer(word_to_id=word_to_id, num_workers=2, chunk_size=1)
+        x_test = vectorizer.fit(TRAINING_TEXT_LIST).transform(TEST_TEXT_LIST)
+
+        expected = compute_tfidf(TEST_TEXT_LIST, TRAINING_TEXT_LIST, word_to_id)
+        actual = x_test.toarray()
+        result = np.allclose(actual, expected, atol=1e-6)
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_refit(self):
+        """
+        Test that fitting again builds the vocabulary from the new text
+        """
+        text_list = ["cherry durian", "cherry"]
+        vectorizer = TfidfVectorizer()
+        vectorizer.fit(TRAINING_TEXT_LIST)
+        x = vectorizer.fit(text_list).transform(text_list)
+
+        expected = {"cherry": 0, "durian": 1}
+        actual = vectorizer.word_to_id
+        result = actual == expected
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+        expected = compute_tfidf(text_list, text_list, vectorizer.word_to_id)
+        actual = x.toarray()
+        result = np.allclose(actual, expected, atol=1e-6)
+        self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (actual, expected))
+
+    def test_not_fitted(self):
+        """
+        Test that transform before fit is rejected
+        """
+        with self.assertRaises(ValueError):
+            TfidfVectorizer().transform(TEST_TEXT_LIST)
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import tempfile
+import threading
+from pathlib import Path
+
+from project.text_to_id import map_text_to_word_list
+from project.corpus import build_corpus
+from project.tokenization_cache import TokenizationCache
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+TEXT_LIST = ["Granny Smith apples are green.",
+             "",
+             "Café au lait, s'il vous plaît.",
+             "Bananas are good for breakfast."]
+
+
+class TestTokenizationCache(unittest.TestCase):
+
+    def test_words(self):
+        """
+        Test that cached words match the tokenizer across cache instances
+        """
+        expected = [map_text_to_word_list(text) for text in TEXT_LIST]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = TokenizationCache(Path(temp_dir))
+            actual = cache.tokenize_text_list(TEXT_LIST)
+            result = actual == expected and cache.misses == len(TEXT_LIST)
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            cache = TokenizationCache(Path(temp_dir))
+            actual = cache.tokenize_text_list(build_corpus(TEXT_LIST))
+            result = actual == expected and cache.hits == len(TEXT_LIST)
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            # A different configuration does not hit the same entries
+            cache = TokenizationCache(Path(temp_dir), filters=".")
+            cache.tokenize_text_list(TEXT_LIST)
+            result = cache.hits == 0
+            self.assertTrue(result, "Entries of another configuration are used")
+
+    def test_word_ids(self):
+        """
+        Test caching word IDs
+        """
+        word_to_id = {"apples": 3, "are": 4, "<UNK>": 5}
+        expected = [[word_to_id.get(w, 0) for w in map_text_to_word_list(text)] for text in TEXT_LIST]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for _ in range(2):
+                cache = TokenizationCache(Path(temp_dir), word_to_id=word_to_id)
+                actual = [x.tolist() for x in cache.tokenize_text_list(TEXT_LIST)]
+                result = actual == expected
+                self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                    actual, expected))
+
+            result = cache.hits == len(TEXT_LIST)
+            self.assertTrue(result, "Word IDs are not cached")
+
+    def test_eviction(self):
+        """
+        Test that least recently used entries are removed when the cache is full
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = TokenizationCache(Path(temp_dir), max_bytes=100)
+            for t, text in enumerate(["apple banana 0", "apple banana 1", "apple banana 2",
+                                      "apple banana 0"]):  # 28 bytes each. "apple banana 0" is most recently used
+                cache.tokenize(text)
+                path = cache._get_path(text.encode("utf-8"))
+                os.utime(path, ns=(t * 1000000000, t * 1000000000))  # Independent of timestamp resolution
+            cache.tokenize("apple banana 3")  # Exceeds the limit and removes "apple banana 1"
+
+            result = cache.total_bytes <= 100
+            self.assertTrue(result, "Cache exceeds the limit: %d" % (cache.total_bytes))
+
+            cache = TokenizationCache(Path(temp_dir), max_bytes=100)
+            cache.tokenize("apple banana 0")
+            cache.tokenize("apple banana 1")
+
+            expected = (1, 1)
+            actual = (cache.hits, cache.misses)
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+    def test_overwrite(self):
+        """
+        Test that the total size does not grow when an entry is written again
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = TokenizationCache(Path(temp_dir))
+            cache.tokenize("apple banana 0")  # 28 bytes
+            cache._put("apple banana 0".encode("utf-8"), ["apple", "banana", "0"])  # Same entry written again
+
+            expected = 28
+            actual = cache.total_bytes
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+    def test_concurrent_writers(self):
+        """
+        Test that writers of the same entry do not corrupt it and stale temporary files are removed
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            caches = [TokenizationCache(Path(temp_dir)) for _ in range(8)]
+            b = "apple banana 0".encode("utf-8")
+            threads = [threading.Thread(target=lambda c: [c._put(b, ["apple", "banana", "0"]) for _ in range(50)],
+                                        args=(c,)) for c in caches]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            path = caches[0]._get_path(b)
+            stale_path = path.with_name(path.name + ".stale.tmp")
+            with open(stale_path, "wb") as f:
+                f.write(b"partial")
+            os.utime(stale_path, ns=(0, 0))
+
+            cache = TokenizationCache(Path(temp_dir))
+            expected = (["apple", "banana", "0"], 28, False)
+            actual = (cache.tokenize("apple banana 0"), cache.total_bytes, stale_path.exists())
+            result = actual == expected and cache.hits == 1
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Unit test use case of a method that is used in tp.
+
+__author__ = "Hide Inada"
+__copyright__ = "Copyright 2018, Hide Inada"
+__license__ = "The MIT License"
+__email__ = "hideyuki@gmail.com"
+"""
+import unittest
+import os
+import logging
+import tempfile
+import pickle
+from pathlib import Path
+
+import numpy as np
+from project.text_to_id import map_text_list_to_word_list
+from project.text_to_id import map_word_list_to_vocabulary
+from project.text_to_id import map_text_to_padded_word_id
+from project.vocabulary_file import save_vocabulary
+from project.vocabulary_file import load_vocabulary
+
+log = logging.getLogger(__name__)
+logging.basicConfig(
+    level=os.environ.get("LOGLEVEL", "INFO"))  # Change the 2nd arg to INFO to suppress debug logging
+
+TEXT_LIST = ["Granny Smith apples are green.",
+             "Fuji apples are red.",
+             "Café au lait, s'il vous plaît.",
+             "Bananas are good for breakfast."]
+
+
+class TestVocabularyFile(unittest.TestCase):
+
+    def test_save_and_load(self):
+        """
+        Test that a loaded vocabulary maps words in the same way as word_to_id
+        """
+        _, _, _, _, _, word_to_id, id_to_word = \
+            map_word_list_to_vocabulary(map_text_list_to_word_list(TEXT_LIST), 10)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vocabulary_dir = Path(temp_dir) / "vocabulary"
+            save_vocabulary(vocabulary_dir, word_to_id)
+            vocabulary = load_vocabulary(vocabulary_dir)
+
+            expected = len(word_to_id)
+            actual = len(vocabulary)
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            for w, id in word_to_id.items():
+                result = w in vocabulary and vocabulary[w] == id and vocabulary.id_to_word(id) == w
+                self.assertTrue(result, "%s is not mapped to %d" % (w, id))
+
+            result = "kiwi" not in vocabulary and vocabulary.get("kiwi", 0) == 0
+            self.assertTrue(result, "Unknown word is found")
+
+            expected = (word_to_id, id_to_word)
+            actual = vocabulary.to_dict()
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            expected = sorted(word_to_id, key=lambda w: w.encode("utf-8"))
+            actual = list(vocabulary)
+            result = actual == expected
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                actual, expected))
+
+            # Pickled as the path so that a worker maps the same files
+            vocabulary = pickle.loads(pickle.dumps(vocabulary))
+            labels = ["a"] * len(TEXT_LIST)
+            x_expected, _ = map_text_to_padded_word_id(TEXT_LIST, labels, 8, 1, {"a": 0}, word_to_id)
+            x_actual, _ = map_text_to_padded_word_id(TEXT_LIST, labels, 8, 1, {"a": 0}, vocabulary)
+            result = np.array_equal(x_actual, x_expected)
+            self.assertTrue(result, "actual does not match expected. \nActual:\n%s, \nExpected:\n%s" % (
+                x_actual, x_expected))
+
+    def test_load_missing(self):
+        """
+        Test loading a vocabulary which does not exist
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(ValueError):
+                load_vocabulary(Path(temp_dir) / "vocabulary")
+
+
+def main():
+    """Invoke test function"""
+
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()